@@ -15,6 +15,36 @@ class ConfigManager:
         self.config_path = Path(config_path)
         self.config_path.parent.mkdir(parents=True, exist_ok=True)
         self._config = self._load_initial_config()
+        self._mtime = self._current_mtime()
+
+    def _current_mtime(self) -> Optional[tuple]:
+        """Firma (mtime_ns, tamaño) del archivo para detectar cambios externos."""
+        try:
+            stat = self.config_path.stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """
+        Recarga la configuración si otro proceso modificó el archivo.
+
+        Returns:
+            True si se recargó.
+        """
+        mtime = self._current_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        try:
+            with open(self.config_path, "r", encoding="utf-8") as f:
+                self._config = json.load(f)
+        except Exception as e:
+            # Archivo a medio escribir: se reintenta en la siguiente llamada
+            logger.warning(f"No se pudo recargar config: {e}")
+            return False
+        self._mtime = mtime
+        logger.info(f"Configuración recargada desde {self.config_path}")
+        return True
 
     def _load_initial_config(self) -> Dict[str, Any]:
         """Carga la configuración desde el archivo o crea una por defecto."""
@@ -38,10 +68,28 @@ class ConfigManager:
             "Oracle": {
                 "confidence_threshold": 0.70,
                 "n_estimators": 100,
-                "model_path": "oracle/models/proof_oracle.joblib"
+                "n_jobs": -1,
+                "batch_size": 50000,
+                "model_path": "oracle/models/proof_oracle.joblib",
+                "incremental": False,
+                "incremental_trees": 20,
+                "max_trees": 500,
+                "trained_until": None,
+                "registry_capacity": 3,
+                "features": [],
+                "feature_cache_dir": "oracle/cache/features",
+                "use_feature_store": True,
+                "symbol": "BTCUSDT",
+                "interval": "1h"
             },
             "Postprocessor": {
                 "adaptive_sensitivity": 0.1
+            },
+            "Data": {
+                "duckdb_threads": 0,
+                "duckdb_memory_limit": "",
+                "lock_timeout": 30.0,
+                "idle_timeout": 5.0
             }
         }
         self.save_config(default_config)
@@ -82,6 +130,7 @@ class ConfigManager:
             with open(self.config_path, "w", encoding="utf-8") as f:
                 json.dump(config, f, indent=2)
             self._config = config
+            self._mtime = self._current_mtime()
             logger.info(f"Configuración guardada en {self.config_path}")
         except Exception as e:
             logger.error(f"Error guardando config: {e}")
@@ -4,7 +4,7 @@ Define rangos permitidos para todos los parámetros del sistema Aipha.
 """
 
 from pydantic import BaseModel, Field, field_validator, ConfigDict, ValidationError
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -79,6 +79,71 @@ class OracleConfig(BaseModel):
         default="oracle/models/proof_oracle.joblib",
         description="Ruta del modelo entrenado"
     )
+    n_jobs: int = Field(
+        default=-1,
+        ge=-1,
+        description="Workers para entrenamiento e inferencia (-1 = todos los núcleos, 0 no es válido)"
+    )
+    batch_size: int = Field(
+        default=50000,
+        ge=1,
+        description="Filas por bloque en inferencia por lotes"
+    )
+    incremental: bool = Field(
+        default=False,
+        description="Reentrenar añadiendo árboles con los eventos nuevos (warm_start)"
+    )
+    incremental_trees: int = Field(
+        default=20,
+        ge=1,
+        le=1000,
+        description="Árboles añadidos en cada reentrenamiento incremental"
+    )
+    max_trees: int = Field(
+        default=500,
+        ge=10,
+        le=5000,
+        description="Tope de árboles; se retiran los más antiguos"
+    )
+    trained_until: Optional[str] = Field(
+        default=None,
+        description="Último evento entrenado (ISO 8601, informativo; la lista está en <modelo>.events.json)"
+    )
+    registry_capacity: int = Field(
+        default=3,
+        ge=1,
+        le=100,
+        description="Modelos en memoria del registro de modelos (LRU)"
+    )
+    features: Union[List[str], Dict[str, Dict[str, Any]]] = Field(
+        default_factory=list,
+        description="Características adicionales del registro: lista de nombres o {nombre: parámetros}"
+    )
+    feature_cache_dir: str = Field(
+        default="oracle/cache/features",
+        description="Directorio de la caché en disco de características"
+    )
+    use_feature_store: bool = Field(
+        default=True,
+        description="Leer señales, etiquetas y features del FeatureStore (sin características adicionales)"
+    )
+    symbol: str = Field(
+        default="BTCUSDT",
+        min_length=1,
+        description="Símbolo del FeatureStore"
+    )
+    interval: str = Field(
+        default="1h",
+        min_length=1,
+        description="Intervalo de velas del FeatureStore"
+    )
+
+    @field_validator('n_jobs', mode='after')
+    @classmethod
+    def n_jobs_not_zero(cls, v):
+        if v == 0:
+            raise ValueError('n_jobs debe ser -1 (todos los núcleos) o >= 1')
+        return v
 
 
 class PostprocessorConfig(BaseModel):
@@ -93,6 +158,31 @@ class PostprocessorConfig(BaseModel):
     )
 
 
+class DataConfig(BaseModel):
+    """Validador para parámetros de acceso a datos (DuckDB)."""
+    model_config = ConfigDict(extra="allow")
+
+    duckdb_threads: int = Field(
+        default=0,
+        ge=0,
+        description="Hilos de DuckDB por proceso (0 = valor por defecto de DuckDB)"
+    )
+    duckdb_memory_limit: str = Field(
+        default="",
+        description="Límite de memoria de DuckDB por proceso, p. ej. '4GB' (vacío = por defecto)"
+    )
+    lock_timeout: float = Field(
+        default=30.0,
+        ge=0.0,
+        description="Segundos de reintento si otro proceso tiene bloqueado el archivo"
+    )
+    idle_timeout: Optional[float] = Field(
+        default=5.0,
+        ge=0.0,
+        description="Segundos sin lecturas tras los que se libera el archivo (None = mantenerlo abierto)"
+    )
+
+
 class AiphaConfig(BaseModel):
     """Validador completo de la configuración de Aipha."""
     model_config = ConfigDict(extra="allow")
@@ -100,6 +190,7 @@ class AiphaConfig(BaseModel):
     Trading: TradingConfig = Field(default_factory=TradingConfig)
     Oracle: OracleConfig = Field(default_factory=OracleConfig)
     Postprocessor: PostprocessorConfig = Field(default_factory=PostprocessorConfig)
+    Data: DataConfig = Field(default_factory=DataConfig)
 
 
 class ConfigValidator:
@@ -117,10 +208,28 @@ class ConfigValidator:
         "Oracle": {
             "confidence_threshold": {"min": 0.5, "max": 0.99, "type": "float"},
             "n_estimators": {"min": 10, "max": 1000, "type": "int"},
-            "model_path": {"type": "string"}
+            "model_path": {"type": "string"},
+            "n_jobs": {"min": -1, "max": 512, "type": "int", "exclude": [0]},
+            "batch_size": {"min": 1, "max": 10000000, "type": "int"},
+            "incremental_trees": {"min": 1, "max": 1000, "type": "int"},
+            "max_trees": {"min": 10, "max": 5000, "type": "int"},
+            "incremental": {"type": "bool"},
+            "trained_until": {"type": "string"},
+            "registry_capacity": {"min": 1, "max": 100, "type": "int"},
+            "features": {"type": "collection"},
+            "feature_cache_dir": {"type": "string"},
+            "use_feature_store": {"type": "bool"},
+            "symbol": {"type": "string"},
+            "interval": {"type": "string"}
         },
         "Postprocessor": {
             "adaptive_sensitivity": {"min": 0.01, "max": 1.0, "type": "float"}
+        },
+        "Data": {
+            "duckdb_threads": {"min": 0, "max": 512, "type": "int"},
+            "duckdb_memory_limit": {"type": "string"},
+            "lock_timeout": {"min": 0.0, "max": 3600.0, "type": "float"},
+            "idle_timeout": {"min": 0.0, "max": 3600.0, "type": "float"}
         }
     }
 
@@ -180,6 +289,12 @@ class ConfigValidator:
         if param_type == "string" and not isinstance(value, str):
             return False, f"{param_name} debe ser una cadena"
 
+        if param_type == "bool" and not isinstance(value, bool):
+            return False, f"{param_name} debe ser un booleano"
+
+        if param_type == "collection" and not isinstance(value, (list, dict)):
+            return False, f"{param_name} debe ser una lista o un diccionario"
+
         # Validar rango para números
         if param_type in ("int", "float"):
             min_val = param_def.get("min")
@@ -191,6 +306,9 @@ class ConfigValidator:
             if max_val is not None and value > max_val:
                 return False, f"{param_name} no puede ser mayor que {max_val}"
 
+            if value in param_def.get("exclude", ()):
+                return False, f"{param_name} no puede ser {value}"
+
         return True, ""
 
     @staticmethod
@@ -1,3 +1,4 @@
+import argparse
 import logging
 import sys
 import os
@@ -6,39 +7,83 @@ from datetime import date, timedelta
 # Añadir el directorio raíz al path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from data_processor.data_system import ApiClient, BinanceKlinesFetcher, KlinesDataRequestTemplate, save_results_to_duckdb
+from data_processor.data_system import (
+    ApiClient, BinanceKlinesFetcher, KlinesDataRequestTemplate, KlinesResampler, ParquetKlinesLake,
+    sync_klines_to_duckdb, upsert_klines_to_duckdb
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def acquire_historical_data():
+def acquire_historical_data(mode: str = "sync", backend: str = "duckdb", interval: str = "1h"):
+    """Descarga el histórico de la plantilla en la tabla 'btc_<interval>_data'.
+
+    Args:
+        mode: 'sync' descarga e inserta solo los días que faltan en la tabla;
+            'full' descarga todo el rango y hace upsert por Open_Time (sin duplicar filas).
+        backend: 'duckdb' (tabla 'btc_<interval>_data') o 'parquet' (lago particionado,
+            siempre descarga el rango completo y fusiona por Open_Time).
+        interval: Intervalo a descargar. Con '1m' y backend 'duckdb' se materializan
+            además 'btc_5m_data' ... 'btc_1d_data' (ver `KlinesResampler`).
+    """
     db_path = "data_processor/data/aipha_data.duckdb"
-    
+    table_name = f"btc_{interval}_data"
+
     client = ApiClient(timeout=60)
     fetcher = BinanceKlinesFetcher(client, download_dir="data_processor/data/test_downloaded_data")
-    
+
     # Descargar 3 meses de datos (Enero a Marzo 2024)
     start_date = date(2024, 1, 1)
     end_date = date(2024, 3, 31)
-    
+
     template = KlinesDataRequestTemplate(
-        name="BTC_1h_Q1_2024",
+        name=f"BTC_{interval}_Q1_2024",
         symbol="BTCUSDT",
-        interval="1h",
+        interval=interval,
         start_date=start_date,
         end_date=end_date,
         description="Datos para proof_strategy"
     )
-    
+
+    if backend == "parquet":
+        df = fetcher.fetch_klines_by_template(template)
+        if df is None or df.empty:
+            logger.error("No se pudieron obtener los datos.")
+            return
+        lake = ParquetKlinesLake()
+        lake.write([df], template.symbol, template.interval)
+        logger.info(f"Datos guardados en el lago Parquet '{lake.root}'.")
+        return
+
+    if mode == "sync":
+        stats = sync_klines_to_duckdb(fetcher, template, table_name, db_path=db_path)
+        logger.info(
+            f"Sincronización completada: {stats['fetched_days']}/{stats['missing_days']} días ausentes "
+            f"descargados, {stats['inserted_rows']} filas insertadas en {stats['seconds']:.2f}s."
+        )
+        if interval == "1m":
+            KlinesResampler(db_path, table_name).refresh(since=stats['fetched_from'])
+        return
+
     logger.info(f"Descargando datos para {template.symbol} {template.interval}...")
     df = fetcher.fetch_klines_by_template(template)
-    
+
     if df is not None and not df.empty:
         logger.info(f"Éxito: {len(df)} filas obtenidas.")
-        save_results_to_duckdb(df, "btc_1h_data", db_path=db_path)
-        logger.info("Datos guardados en la tabla 'btc_1h_data'.")
+        upsert_klines_to_duckdb([df], table_name, template.symbol, template.interval, db_path=db_path)
+        logger.info(f"Datos guardados en la tabla '{table_name}'.")
+        if interval == "1m":
+            KlinesResampler(db_path, table_name).refresh(since=start_date)
     else:
         logger.error("No se pudieron obtener los datos.")
 
 if __name__ == "__main__":
-    acquire_historical_data()
+    parser = argparse.ArgumentParser(description="Descarga de klines históricas a DuckDB.")
+    parser.add_argument("--mode", choices=["sync", "full"], default="sync",
+                        help="sync: solo los días que faltan (por defecto); full: re-descarga todo el rango")
+    parser.add_argument("--backend", choices=["duckdb", "parquet"], default="duckdb",
+                        help="duckdb: tabla btc_<interval>_data (por defecto); parquet: lago particionado")
+    parser.add_argument("--interval", default="1h",
+                        help="Intervalo a descargar (por defecto 1h); con 1m se materializan 5m/15m/1h/4h/1d")
+    args = parser.parse_args()
+    acquire_historical_data(args.mode, args.backend, args.interval)
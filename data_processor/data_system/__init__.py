@@ -1,7 +1,13 @@
 from .client import ApiClient
 from .fetcher import BinanceKlinesFetcher
 from .templates import KlinesDataRequestTemplate, BaseDataRequestTemplate
-from .storage import save_results_to_duckdb, DataRequestTemplateManager
+from .storage import (
+    save_results_to_duckdb, bulk_upsert_to_duckdb, upsert_klines_to_duckdb, ParquetKlinesLake, DataRequestTemplateManager,
+    DuckDBConnectionManager, get_connection_manager
+)
+from .sync import sync_klines_to_duckdb
+from .market_data import load_klines, OHLCV_COLUMNS
+from .resample import KlinesResampler, RESAMPLE_INTERVALS
 
 __all__ = [
     'ApiClient',
@@ -9,5 +15,15 @@ __all__ = [
     'KlinesDataRequestTemplate',
     'BaseDataRequestTemplate',
     'save_results_to_duckdb',
-    'DataRequestTemplateManager'
+    'bulk_upsert_to_duckdb',
+    'upsert_klines_to_duckdb',
+    'ParquetKlinesLake',
+    'DataRequestTemplateManager',
+    'DuckDBConnectionManager',
+    'get_connection_manager',
+    'sync_klines_to_duckdb',
+    'load_klines',
+    'OHLCV_COLUMNS',
+    'KlinesResampler',
+    'RESAMPLE_INTERVALS'
 ]
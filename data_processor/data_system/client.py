@@ -1,8 +1,11 @@
 import requests
 import os 
 import logging
+import threading
 from typing import Any, Dict, Optional, Union
 
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+
 logger = logging.getLogger(__name__)
 
 class ApiClient:
@@ -14,6 +17,8 @@ class ApiClient:
     def __init__(self, base_headers: Optional[Dict[str, str]] = None, timeout: int = 10):
         self._session = requests.Session()
         self._default_timeout = timeout
+        self._pool_size = DEFAULT_POOLSIZE
+        self._pool_lock = threading.Lock()
         
         if base_headers:
             self._session.headers.update(base_headers)
@@ -23,6 +28,21 @@ class ApiClient:
             f"Cabeceras base de sesión: {self._session.headers}"
         )
 
+    def ensure_pool_size(self, size: int) -> None:
+        """
+        Garantiza que el pool de conexiones de la sesión admite `size`
+        conexiones simultáneas por host, para que varios hilos puedan
+        descargar en paralelo reutilizando conexiones keep-alive.
+        """
+        with self._pool_lock:
+            if size <= self._pool_size:
+                return
+            adapter = HTTPAdapter(pool_connections=DEFAULT_POOLSIZE, pool_maxsize=size)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._pool_size = size
+            logger.debug(f"Pool de conexiones ampliado a {size} conexiones por host.")
+
     def make_request(
         self,
         url: str,
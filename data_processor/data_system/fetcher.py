@@ -1,9 +1,16 @@
+import calendar
+import io
+import itertools
 import os
+import time
 import zipfile
 import logging
-from datetime import date
-from typing import Optional, List, Dict, Any
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple
 
+import numpy as np
 import pandas as pd
 
 from .client import ApiClient
@@ -11,23 +18,122 @@ from .templates import KlinesDataRequestTemplate
 
 logger = logging.getLogger(__name__)
 
+try:
+    from pyarrow import csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Columnas de precio/volumen (float64 por defecto, float32 opcional)
+KLINES_FLOAT_COLUMNS = (
+    "Open", "High", "Low", "Close", "Volume",
+    "Quote_Asset_Volume", "Taker_Buy_Base_Asset_Volume", "Taker_Buy_Quote_Asset_Volume"
+)
+KLINES_TIME_COLUMNS = ("Open_Time", "Close_Time")
+
+# Binance Vision publica los tiempos spot en microsegundos desde 2025; cualquier
+# epoch por encima de este umbral (año ~5138 en ms) está en microsegundos
+_EPOCH_US_THRESHOLD = 10**14
+
+
+@dataclass(frozen=True)
+class ArchiveFile:
+    """Un archivo ZIP de Binance Vision: un mes completo o un único día."""
+    period: str  # 'monthly' o 'daily'
+    start: date  # Día que cubre (día 1 del mes en los archivos mensuales)
+
+    @property
+    def is_monthly(self) -> bool:
+        return self.period == "monthly"
+
+    def days(self) -> List[date]:
+        """Días cubiertos por el archivo."""
+        if not self.is_monthly:
+            return [self.start]
+        n_days = calendar.monthrange(self.start.year, self.start.month)[1]
+        return [self.start.replace(day=d) for d in range(1, n_days + 1)]
+
+
+@dataclass
+class _ArchiveResult:
+    zip_path: Optional[str]
+    downloaded_bytes: int = 0
+    requested: bool = False
+    frame: Optional[pd.DataFrame] = None
+
+
+
+def _load_klines_zip(zip_path: str, engine: str = "auto", price_dtype: str = "float64") -> Optional[pd.DataFrame]:
+    """Lee y parsea el CSV de un ZIP de klines (función de módulo para poder usarse en un pool de procesos)."""
+    csv_filename = BinanceKlinesFetcher._get_csv_filename_from_zip_name(os.path.basename(zip_path))
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zf:
+            # Verificar que el archivo CSV existe en el ZIP
+            if csv_filename not in zf.namelist():
+                logger.error(f"El archivo CSV '{csv_filename}' no se encontró en el ZIP.")
+                return None
+
+            # Leer el archivo CSV desde el ZIP
+            with zf.open(csv_filename) as csv_file:
+                df = BinanceKlinesFetcher._parse_klines_dataframe_from_file(csv_file, engine, price_dtype)
+                if df is not None:
+                    logger.info(f"Datos cargados exitosamente desde '{csv_filename}' ({len(df)} filas)")
+                return df
+
+    except zipfile.BadZipFile:
+        logger.error(f"El archivo ZIP está corrupto: {zip_path}")
+    except FileNotFoundError:
+        logger.error(f"No se encontró el archivo ZIP: {zip_path}")
+    except Exception as e:
+        logger.critical(f"Error al procesar el archivo '{zip_path}': {e}", exc_info=True)
+
+    return None
+
+
 
 class BinanceKlinesFetcher:
     """Se especializa en obtener datos de klines de Binance Vision."""
     
-    BASE_URL = "https://data.binance.vision/data/spot/daily/klines"
+    ROOT_URL = "https://data.binance.vision/data/spot"
+    BASE_URL = f"{ROOT_URL}/daily/klines"
+    MONTHLY_BASE_URL = f"{ROOT_URL}/monthly/klines"
     
-    def __init__(self, api_client: ApiClient, download_dir: str = "downloaded_data"):
+    def __init__(
+        self,
+        api_client: ApiClient,
+        download_dir: str = "downloaded_data",
+        max_workers: int = 8,
+        base_url: Optional[str] = None,
+        csv_engine: str = "auto",
+        price_dtype: str = "float64"
+    ):
         """Inicializa el fetcher de klines de Binance.
         
         Args:
             api_client: Cliente API para realizar las descargas
             download_dir: Directorio donde se guardarán los archivos descargados
+            max_workers: Descargas simultáneas por defecto en `fetch_klines_by_template`
+                (1 = secuencial)
+            base_url: Raíz alternativa de los archivos spot (por defecto `ROOT_URL`),
+                p. ej. un mirror o un servidor local
+            csv_engine: Motor de parseo de los CSV ('pyarrow', 'c' o 'auto')
+            price_dtype: Tipo de precios y volúmenes ('float64' o 'float32')
         """
         if api_client is None:
             raise ValueError("La instancia de api_client no puede ser None.")
+        if max_workers < 1:
+            raise ValueError("max_workers debe ser >= 1.")
         self._api_client = api_client
         self._download_dir = download_dir
+        self.max_workers = max_workers
+        self.csv_engine = csv_engine
+        self.price_dtype = price_dtype
+        if base_url:
+            root = base_url.rstrip("/")
+            self.BASE_URL = f"{root}/daily/klines"
+            self.MONTHLY_BASE_URL = f"{root}/monthly/klines"
+        # Estadísticas de la última llamada a fetch_klines_by_template
+        self.last_fetch_stats: Dict[str, Any] = {}
         os.makedirs(self._download_dir, exist_ok=True)
         logger.debug(f"BinanceKlinesFetcher inicializado con download_dir='{self._download_dir}'")
 
@@ -37,12 +143,25 @@ class BinanceKlinesFetcher:
         date_str = f"{year:04d}-{month:02d}-{day:02d}"
         return f"{self.BASE_URL}/{symbol_upper}/{interval}/{symbol_upper}-{interval}-{date_str}.zip"
 
-    def _get_csv_filename_from_zip_name(self, zip_filename: str) -> str:
+    def _build_monthly_download_url(self, symbol: str, interval: str, year: int, month: int) -> str:
+        """Construye la URL del archivo mensual de un mes completo."""
+        symbol_upper = symbol.upper()
+        return f"{self.MONTHLY_BASE_URL}/{symbol_upper}/{interval}/{symbol_upper}-{interval}-{year:04d}-{month:02d}.zip"
+
+    def _build_archive_url(self, symbol: str, interval: str, archive: ArchiveFile) -> str:
+        if archive.is_monthly:
+            return self._build_monthly_download_url(symbol, interval, archive.start.year, archive.start.month)
+        return self._build_download_url(symbol, interval, archive.start.year, archive.start.month, archive.start.day)
+
+
+    @staticmethod
+    def _get_csv_filename_from_zip_name(zip_filename: str) -> str:
         """Obtiene el nombre del archivo CSV a partir del nombre del ZIP."""
         base_name, _ = os.path.splitext(zip_filename)
         return f"{base_name}.csv"
 
-    def _define_klines_columns(self) -> List[str]:
+    @staticmethod
+    def _define_klines_columns() -> List[str]:
         """Define los nombres de las columnas para los datos de klines."""
         return [
             "Open_Time", "Open", "High", "Low", "Close", "Volume", "Close_Time", 
@@ -50,9 +169,73 @@ class BinanceKlinesFetcher:
             "Taker_Buy_Quote_Asset_Volume", "Ignore"
         ]
 
-    def _parse_klines_dataframe_from_file(self, csv_file_handle: Any) -> Optional[pd.DataFrame]:
-        """Lee un manejador de archivo CSV y lo convierte en un DataFrame de klines procesado."""
-        columns = self._define_klines_columns()
+    @staticmethod
+    def _klines_dtypes(price_dtype: str = "float64") -> Dict[str, str]:
+        """Tipos explícitos de cada columna del CSV (evita la inferencia de pandas)."""
+        dtypes = {col: price_dtype for col in KLINES_FLOAT_COLUMNS}
+        dtypes.update({col: "int64" for col in KLINES_TIME_COLUMNS})
+        dtypes["Number_of_Trades"] = "int32"
+        return dtypes
+
+    @staticmethod
+    def _epoch_to_datetime(values: np.ndarray) -> np.ndarray:
+        """Convierte epochs enteros (ms o µs) a datetime64[ns] en una sola operación vectorizada."""
+        scale = 1_000 if values.size and values.max() >= _EPOCH_US_THRESHOLD else 1_000_000
+        return (values * scale).view("datetime64[ns]")
+
+    @staticmethod
+    def _parse_klines_dataframe_from_file(
+        csv_file_handle: Any,
+        engine: str = "auto",
+        price_dtype: str = "float64"
+    ) -> Optional[pd.DataFrame]:
+        """Lee un manejador de archivo CSV y lo convierte en un DataFrame de klines procesado.
+
+        Los tipos se fijan en la propia lectura (sin inferencia ni conversiones
+        posteriores columna a columna) y la columna 'Ignore' no llega a
+        leerse. Si el CSV contiene valores no numéricos se recurre al parseo
+        tolerante, que los convierte en nulos.
+
+        Args:
+            csv_file_handle: Archivo CSV (sin cabecera) abierto en modo binario
+            engine: 'pyarrow', 'c' o 'auto' (pyarrow si está instalado)
+            price_dtype: 'float64' o 'float32' para precios y volúmenes
+        """
+        columns = BinanceKlinesFetcher._define_klines_columns()
+        if engine == "auto":
+            engine = "pyarrow" if PYARROW_AVAILABLE else "c"
+        dtypes = BinanceKlinesFetcher._klines_dtypes(price_dtype)
+        raw = csv_file_handle.read()
+        try:
+            if engine == "pyarrow":
+                table = pa_csv.read_csv(
+                    io.BytesIO(raw),
+                    read_options=pa_csv.ReadOptions(column_names=columns),
+                    convert_options=pa_csv.ConvertOptions(column_types=dtypes, include_columns=columns[:-1])
+                )
+                df = table.to_pandas()
+            else:
+                df = pd.read_csv(
+                    io.BytesIO(raw), header=None, names=columns, usecols=columns[:-1], dtype=dtypes, engine=engine
+                )
+        except (ValueError, TypeError) as e:
+            logger.warning(f"CSV de klines con valores no numéricos ({e}); usando el parseo tolerante.")
+            return BinanceKlinesFetcher._parse_klines_dataframe_tolerant(io.BytesIO(raw))
+
+        if df.empty:
+            logger.warning("El archivo CSV de klines está vacío.")
+            return df
+
+        # Ambas columnas de tiempo en una única conversión
+        times = BinanceKlinesFetcher._epoch_to_datetime(df[list(KLINES_TIME_COLUMNS)].to_numpy())
+        df["Open_Time"] = times[:, 0]
+        df["Close_Time"] = times[:, 1]
+        return df
+
+    @staticmethod
+    def _parse_klines_dataframe_tolerant(csv_file_handle: Any) -> Optional[pd.DataFrame]:
+        """Parseo con inferencia de tipos y conversión tolerante (valores inválidos -> nulos)."""
+        columns = BinanceKlinesFetcher._define_klines_columns()
         df = pd.read_csv(csv_file_handle, header=None, names=columns)
         
         if df.empty:
@@ -60,8 +243,10 @@ class BinanceKlinesFetcher:
             return df
         
         # Convertir tipos de datos
-        df["Open_Time"] = pd.to_datetime(df["Open_Time"], unit="ms")
-        df["Close_Time"] = pd.to_datetime(df["Close_Time"], unit="ms")
+        for col in KLINES_TIME_COLUMNS:
+            epochs = pd.to_numeric(df[col], errors="coerce")
+            unit = "us" if epochs.max() >= _EPOCH_US_THRESHOLD else "ms"
+            df[col] = pd.to_datetime(epochs, unit=unit)
         
         # Convertir columnas numéricas
         numeric_cols = [
@@ -81,6 +266,61 @@ class BinanceKlinesFetcher:
             df = df.drop(columns=["Ignore"])
         return df
 
+
+    def plan_archives(self, date_range: List[date], today: Optional[date] = None) -> List[ArchiveFile]:
+        """Agrupa un rango de fechas en archivos a descargar.
+
+        Cada mes cubierto por completo y ya cerrado se pide como un único
+        archivo mensual; los meses parciales del rango y el mes en curso se
+        piden día a día.
+
+        Args:
+            date_range: Fechas consecutivas y ordenadas (ver `get_date_range`)
+            today: Fecha de referencia para el mes en curso (por defecto hoy en UTC)
+
+        Returns:
+            Lista de archivos en orden cronológico
+        """
+        current_month = (today or datetime.now(timezone.utc).date()).replace(day=1)
+        plan: List[ArchiveFile] = []
+        for (year, month), days in itertools.groupby(date_range, key=lambda d: (d.year, d.month)):
+            days = list(days)
+            first_day = date(year, month, 1)
+            if first_day < current_month and len(days) == calendar.monthrange(year, month)[1]:
+                plan.append(ArchiveFile("monthly", first_day))
+            else:
+                plan.extend(ArchiveFile("daily", d) for d in days)
+        return plan
+
+    def _ensure_archive(
+        self,
+        symbol: str,
+        interval: str,
+        archive: ArchiveFile,
+        force_download: bool = False
+    ) -> _ArchiveResult:
+        """Descarga (si hace falta) un archivo ZIP.
+
+        Returns:
+            _ArchiveResult con la ruta del ZIP (None si falla la descarga)
+        """
+        symbol_upper = symbol.upper()
+        url = self._build_archive_url(symbol_upper, interval, archive)
+        zip_filename = os.path.basename(url)
+        zip_dir = os.path.join(self._download_dir, symbol_upper, interval)
+        zip_path = os.path.join(zip_dir, zip_filename)
+        os.makedirs(zip_dir, exist_ok=True)
+
+        if not force_download and os.path.exists(zip_path):
+            logger.info(f"Usando archivo ZIP local existente: {zip_path}")
+            return _ArchiveResult(zip_path)
+
+        logger.info(f"Descargando archivo: {zip_filename}")
+        if not self._api_client.download_file(url, zip_path):
+            logger.error(f"Fallo al descargar el archivo ZIP desde {url}")
+            return _ArchiveResult(None, requested=True)
+        return _ArchiveResult(zip_path, os.path.getsize(zip_path), requested=True)
+
     def fetch_klines_as_dataframe(
         self,
         symbol: str,
@@ -103,62 +343,98 @@ class BinanceKlinesFetcher:
         Returns:
             DataFrame con los datos de klines o None si ocurre un error
         """
-        # Preparar variables y rutas
         fetch_date = date(year, month, day)
-        symbol_upper = symbol.upper()
-        logger.info(f"Obteniendo datos de klines para {symbol_upper} {interval} en {fetch_date.isoformat()}")
+        logger.info(f"Obteniendo datos de klines para {symbol.upper()} {interval} en {fetch_date.isoformat()}")
 
-        # Construir URLs y rutas de archivos
-        url = self._build_download_url(symbol_upper, interval, year, month, day)
-        zip_filename = os.path.basename(url)
-        zip_dir = os.path.join(self._download_dir, symbol_upper, interval)
-        zip_path = os.path.join(zip_dir, zip_filename)
-        os.makedirs(zip_dir, exist_ok=True)
-        csv_filename = self._get_csv_filename_from_zip_name(zip_filename)
+        download = self._ensure_archive(symbol, interval, ArchiveFile("daily", fetch_date), force_download)
+        if download.zip_path is None:
+            return None
+        return _load_klines_zip(download.zip_path, self.csv_engine, self.price_dtype)
 
-        # Descargar el archivo si es necesario
-        if force_download or not os.path.exists(zip_path):
-            logger.info(f"Descargando archivo: {zip_filename}")
-            if not self._api_client.download_file(url, zip_path):
-                logger.error(f"Fallo al descargar el archivo ZIP desde {url}")
-                return None
-        else:
-            logger.info(f"Usando archivo ZIP local existente: {zip_path}")
+    def _download_and_parse(
+        self,
+        symbol: str,
+        interval: str,
+        archive: ArchiveFile,
+        force_download: bool
+    ) -> _ArchiveResult:
+        """Tarea de un hilo del pool: descarga y parsea un archivo."""
+        result = self._ensure_archive(symbol, interval, archive, force_download)
+        if result.zip_path is not None:
+            result.frame = _load_klines_zip(result.zip_path, self.csv_engine, self.price_dtype)
+        return result
 
-        # Procesar el archivo ZIP y CSV
-        try:
-            with zipfile.ZipFile(zip_path, 'r') as zf:
-                # Verificar que el archivo CSV existe en el ZIP
-                if csv_filename not in zf.namelist():
-                    logger.error(f"El archivo CSV '{csv_filename}' no se encontró en el ZIP.")
-                    return None
-                
-                # Leer el archivo CSV desde el ZIP
-                with zf.open(csv_filename) as csv_file:
-                    df = self._parse_klines_dataframe_from_file(csv_file)
-                    if df is not None:
-                        logger.info(f"Datos cargados exitosamente desde '{csv_filename}' ({len(df)} filas)")
-                        return df
-
-        except zipfile.BadZipFile:
-            logger.error(f"El archivo ZIP está corrupto: {zip_path}")
-        except FileNotFoundError:
-            logger.error(f"No se encontró el archivo ZIP: {zip_path}")
-        except Exception as e:
-            logger.critical(f"Error al procesar el archivo '{zip_path}': {e}", exc_info=True)
-        
-        return None
+    def _fetch_archives(
+        self,
+        symbol: str,
+        interval: str,
+        archives: List[ArchiveFile],
+        force_download: bool,
+        max_workers: int,
+        parse_workers: int
+    ) -> List[_ArchiveResult]:
+        """Descarga y parsea los archivos, devolviendo los resultados en el orden de `archives`.
+
+        Los hilos comparten la sesión del ApiClient (y por tanto su pool de
+        conexiones). Con parse_workers > 0 los ZIP se parsean en un pool de
+        procesos a medida que terminan las descargas.
+        """
+        if not archives:
+            return []
+        if max_workers <= 1 and parse_workers <= 0:
+            return [self._download_and_parse(symbol, interval, a, force_download) for a in archives]
+
+        self._api_client.ensure_pool_size(max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="klines-download") as downloads:
+            if parse_workers <= 0:
+                futures = [
+                    downloads.submit(self._download_and_parse, symbol, interval, a, force_download)
+                    for a in archives
+                ]
+                return [f.result() for f in futures]
+
+            with ProcessPoolExecutor(max_workers=parse_workers) as parsers:
+                download_futures = [
+                    downloads.submit(self._ensure_archive, symbol, interval, a, force_download)
+                    for a in archives
+                ]
+                # El parseo de cada archivo se encola en cuanto termina su descarga
+                results: List[_ArchiveResult] = []
+                parse_futures: List[Optional[Future]] = []
+                for future in download_futures:
+                    result = future.result()
+                    results.append(result)
+                    parse_futures.append(
+                        parsers.submit(_load_klines_zip, result.zip_path, self.csv_engine, self.price_dtype)
+                        if result.zip_path else None
+                    )
+                for result, future in zip(results, parse_futures):
+                    if future is not None:
+                        result.frame = future.result()
+        return results
 
     def fetch_klines_by_template(
         self, 
         template: KlinesDataRequestTemplate, 
-        force_download_all: bool = False
+        force_download_all: bool = False,
+        max_workers: Optional[int] = None,
+        parse_workers: int = 0,
+        prefer_monthly: bool = True
     ) -> Optional[pd.DataFrame]:
         """Obtiene datos de klines según una plantilla de solicitud.
         
+        Los meses completos se piden como archivo mensual y el resto día a
+        día; si un archivo mensual no está disponible se recurre a sus
+        archivos diarios. Los archivos se descargan en paralelo y se
+        concatenan en orden de fecha; cada archivo ya viene ordenado, por lo
+        que no hace falta reordenar el resultado final.
+
         Args:
             template: Plantilla con los parámetros de la solicitud
             force_download_all: Si es True, fuerza la descarga de todos los archivos
+            max_workers: Descargas simultáneas (por defecto `self.max_workers`; 1 = secuencial)
+            parse_workers: Procesos para parsear los CSV (0 = parsear en los hilos de descarga)
+            prefer_monthly: Si es False, descarga siempre archivos diarios
             
         Returns:
             DataFrame con los datos concatenados o None si ocurre un error
@@ -171,33 +447,77 @@ class BinanceKlinesFetcher:
             logger.warning("Rango de fechas de la plantilla vacío.")
             return pd.DataFrame()
 
-        # Recopilar datos para cada día
-        all_daily_dataframes = []
-        for current_date in date_range:
-            daily_df = self.fetch_klines_as_dataframe(
-                symbol=template.symbol, 
-                interval=template.interval,
-                year=current_date.year, 
-                month=current_date.month, 
-                day=current_date.day,
-                force_download=force_download_all
+        if prefer_monthly:
+            archives = self.plan_archives(date_range)
+        else:
+            archives = [ArchiveFile("daily", d) for d in date_range]
+        workers = max(1, min(max_workers or self.max_workers, len(date_range)))
+        start = time.perf_counter()
+
+        def fetch(files: List[ArchiveFile]) -> List[_ArchiveResult]:
+            return self._fetch_archives(
+                template.symbol, template.interval, files, force_download_all,
+                min(workers, len(files)), parse_workers
             )
-            
-            if daily_df is not None and not daily_df.empty:
-                all_daily_dataframes.append(daily_df)
+
+        results = fetch(archives)
+
+        # Meses sin archivo mensual (aún no publicado o inexistente): día a día
+        failed_months = {a for a, r in zip(archives, results) if a.is_monthly and r.frame is None}
+        fallback = []
+        if failed_months:
+            logger.warning(
+                f"{len(failed_months)} archivos mensuales no disponibles; se descargarán sus archivos diarios."
+            )
+            fallback = fetch([
+                ArchiveFile("daily", d) for a in archives if a in failed_months for d in a.days()
+            ])
+
+        # Reconstruir el orden cronológico sustituyendo cada mes fallido por sus días
+        ordered: List[Tuple[ArchiveFile, _ArchiveResult]] = []
+        fallback_iter = iter(fallback)
+        for archive, result in zip(archives, results):
+            if archive in failed_months:
+                ordered.extend((ArchiveFile("daily", d), next(fallback_iter)) for d in archive.days())
+            else:
+                ordered.append((archive, result))
+
+        elapsed = time.perf_counter() - start
+        loaded = [(a, r.frame) for a, r in ordered if r.frame is not None and not r.frame.empty]
+        all_results = results + fallback
+        downloaded_bytes = sum(r.downloaded_bytes for r in all_results)
+        megabytes = downloaded_bytes / 1e6
+        self.last_fetch_stats = {
+            'days': len(date_range),
+            'days_loaded': sum(len(a.days()) for a, _ in loaded),
+            'monthly_files': sum(1 for a, _ in loaded if a.is_monthly),
+            'daily_files': sum(1 for a, _ in loaded if not a.is_monthly),
+            'requests': sum(1 for r in all_results if r.requested),
+            'downloaded_bytes': downloaded_bytes,
+            'seconds': elapsed,
+            'mb_per_s': megabytes / elapsed if elapsed > 0 else 0.0,
+            'workers': workers,
+        }
+        logger.info(
+            f"{self.last_fetch_stats['days_loaded']}/{len(date_range)} días obtenidos en {elapsed:.2f}s "
+            f"({self.last_fetch_stats['requests']} peticiones, {megabytes:.2f} MB descargados, "
+            f"{self.last_fetch_stats['mb_per_s']:.2f} MB/s, {workers} hilos)"
+        )
 
         # Verificar si se obtuvieron datos
-        if not all_daily_dataframes:
+        all_dataframes = [df for _, df in loaded]
+        if not all_dataframes:
             logger.warning(f"No se obtuvieron datos para el rango de la plantilla '{template.name}'.")
             return None
 
-        # Combinar todos los DataFrames diarios
+        # Combinar todos los DataFrames
         try:
-            logger.info(f"Concatenando {len(all_daily_dataframes)} DataFrames diarios...")
-            final_df = pd.concat(all_daily_dataframes, ignore_index=True)
+            logger.info(f"Concatenando {len(all_dataframes)} DataFrames...")
+            final_df = pd.concat(all_dataframes, ignore_index=True)
             
-            # Ordenar por tiempo si la columna existe
-            if "Open_Time" in final_df.columns:
+            # Los archivos ya están en orden; solo se reordena si alguno viniera desordenado
+            if "Open_Time" in final_df.columns and not final_df["Open_Time"].is_monotonic_increasing:
+                logger.warning("Los datos concatenados no están ordenados por Open_Time; reordenando.")
                 final_df = final_df.sort_values(by="Open_Time").reset_index(drop=True)
             
             logger.info(f"Proceso completado. Total de filas: {len(final_df)}")
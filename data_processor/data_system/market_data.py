@@ -0,0 +1,116 @@
+import logging
+from typing import Any, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from .storage import get_connection_manager, table_columns
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Columnas que usan detectores, etiquetado y features por defecto
+OHLCV_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+TimeBound = Optional[Union[str, pd.Timestamp]]
+
+
+def _partition_filters(columns: List[str], start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> List[str]:
+    """Filtros sobre las columnas year/month de un lago Hive para descartar particiones enteras."""
+    if "year" not in columns or "month" not in columns:
+        return []
+    filters = []
+    if start is not None:
+        filters.append(f"year >= {start.year}")
+    if end is not None:
+        filters.append(f"year <= {end.year}")
+    if start is not None and end is not None and start.year == end.year:
+        filters.append(f"month BETWEEN {start.month} AND {end.month}")
+    return filters
+
+
+def load_klines(
+    source: Union[str, Any],
+    table_name: str,
+    columns: Optional[Sequence[str]] = OHLCV_COLUMNS,
+    start: TimeBound = None,
+    end: TimeBound = None,
+    symbol: Optional[str] = None,
+    interval: Optional[str] = None
+) -> pd.DataFrame:
+    """Carga velas de una tabla o vista de DuckDB con el filtrado hecho en la base de datos.
+
+    El rango temporal, la proyección de columnas y el `ORDER BY` se ejecutan
+    en DuckDB y el resultado se transfiere vía Arrow, de modo que solo se
+    leen y copian las filas y columnas pedidas. Devuelve un DataFrame con
+    índice `Open_Time` (datetime64[ns]) ya ordenado.
+
+    Args:
+        source: Ruta del archivo .duckdb (se lee con el cursor del hilo en la conexión
+            compartida del proceso, ver `get_connection_manager`) o conexión existente
+            (p. ej. la de `ParquetKlinesLake.connect`)
+        table_name: Tabla o vista de klines (ej: 'btc_1h_data')
+        columns: Columnas a cargar además de Open_Time (None = todas)
+        start: Primer Open_Time incluido
+        end: Open_Time límite (excluido)
+        symbol: Filtra por símbolo si la tabla tiene columna `symbol`
+        interval: Filtra por intervalo si la tabla tiene columna `interval`
+
+    Returns:
+        DataFrame indexado por Open_Time y ordenado
+    """
+    if isinstance(source, str):
+        with get_connection_manager(source).reader() as conn:
+            return load_klines(conn, table_name, columns, start, end, symbol, interval)
+
+    conn = source
+    available = table_columns(conn, table_name)
+    if not available:
+        raise ValueError(f"La tabla o vista '{table_name}' no existe.")
+    if columns is None:
+        columns = [c for c in available if c != "Open_Time"]
+    missing = [c for c in columns if c not in available]
+    if missing:
+        raise ValueError(f"Columnas inexistentes en '{table_name}': {missing}")
+
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    where, params = [], []
+    if start is not None:
+        where.append("Open_Time >= ?")
+        params.append(start.to_pydatetime())
+    if end is not None:
+        where.append("Open_Time < ?")
+        params.append(end.to_pydatetime())
+    if symbol is not None and "symbol" in available:
+        where.append("symbol = ?")
+        params.append(symbol.upper())
+    if interval is not None and "interval" in available:
+        where.append('"interval" = ?')
+        params.append(interval)
+    where.extend(_partition_filters(available, start, end))
+
+    projection = ", ".join(f'"{c}"' for c in ["Open_Time", *columns])
+    query = f"SELECT {projection} FROM {table_name}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY Open_Time"
+
+    result = conn.execute(query, params)
+    if PYARROW_AVAILABLE:
+        table = result.arrow()
+        # DuckDB >= 1.4 devuelve un RecordBatchReader en lugar de una tabla
+        if hasattr(table, "read_all"):
+            table = table.read_all()
+        df = table.to_pandas(split_blocks=True, coerce_temporal_nanoseconds=True)
+    else:
+        df = result.df()
+
+    df["Open_Time"] = pd.to_datetime(df["Open_Time"])
+    df = df.set_index("Open_Time")
+    logger.debug(f"Cargadas {len(df)} velas de '{table_name}' ({len(columns)} columnas).")
+    return df
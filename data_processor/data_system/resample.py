@@ -0,0 +1,244 @@
+import logging
+import re
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from .storage import table_columns, get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+# Timeframes que se materializan por defecto a partir de las velas de 1m
+RESAMPLE_INTERVALS = ("5m", "15m", "1h", "4h", "1d")
+
+# Agregación de cada columna de kline dentro de un bucket; las demás (p. ej. Ignore) se descartan
+_AGGREGATIONS = {
+    "Open": 'arg_min("Open", Open_Time)',
+    "High": 'max("High")',
+    "Low": 'min("Low")',
+    "Close": 'arg_max("Close", Open_Time)',
+    "Volume": 'sum("Volume")',
+    "Close_Time": 'max("Close_Time")',
+    "Quote_Asset_Volume": 'sum("Quote_Asset_Volume")',
+    "Number_of_Trades": 'CAST(sum("Number_of_Trades") AS BIGINT)',
+    "Taker_Buy_Base_Asset_Volume": 'sum("Taker_Buy_Base_Asset_Volume")',
+    "Taker_Buy_Quote_Asset_Volume": 'sum("Taker_Buy_Quote_Asset_Volume")',
+}
+
+
+def _interval_pattern(interval: str) -> str:
+    return rf"(^|_){re.escape(interval)}(_|$)"
+
+
+def resampled_table_name(source_table: str, source_interval: str, interval: str) -> str:
+    """Nombre de la tabla de un timeframe: 'btc_1m_data' -> 'btc_1h_data' (o '<tabla>_<intervalo>')."""
+    pattern = _interval_pattern(source_interval)
+    if re.search(pattern, source_table):
+        return re.sub(pattern, rf"\g<1>{interval}\g<2>", source_table, count=1)
+    return f"{source_table}_{interval}"
+
+
+class KlinesResampler:
+    """Materializa velas de mayor timeframe a partir de la tabla de 1m en DuckDB.
+
+    Cada timeframe se calcula en la base de datos con `time_bucket`
+    (open/close del primer/último minuto, máximo, mínimo y sumas de
+    volumen y operaciones) y se guarda en su propia tabla con el esquema
+    de las tablas de klines, así que `load_klines` y los detectores la
+    leen como una descarga más ('btc_1m_data' -> 'btc_1h_data'). Si la tabla
+    tiene columnas `symbol`/`interval` (las de `upsert_klines_to_duckdb`) y
+    su nombre no lleva el intervalo (p. ej. 'klines'), los timeframes se
+    escriben en la misma tabla con su propio `interval`. Una tabla de destino
+    que ya existe conserva su esquema: en las antiguas de un solo par sin
+    `symbol`/`interval` (p. ej. 'btc_1h_data') solo se escriben sus columnas.
+
+    La materialización es incremental: solo se agregan los buckets
+    posteriores al último ya guardado, y solo los cerrados (la tabla de 1m
+    ya tiene el minuto que cierra el bucket). `refresh(since=...)`
+    recalcula desde una fecha, p. ej. tras rellenar huecos antiguos.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        source_table: str,
+        intervals: Sequence[str] = RESAMPLE_INTERVALS,
+        source_interval: str = "1m",
+        target_tables: Optional[Dict[str, str]] = None
+    ):
+        """
+        Args:
+            db_path: Ruta de la base de datos DuckDB
+            source_table: Tabla de velas de origen (ej: 'btc_1m_data')
+            intervals: Timeframes a materializar
+            source_interval: Intervalo de la tabla de origen
+            target_tables: Nombre de tabla por timeframe (por defecto `resampled_table_name`)
+        """
+        self.db_path = db_path
+        self.source_table = source_table
+        self.source_interval = source_interval
+        self.source_step = pd.Timedelta(source_interval)
+        self.intervals = list(intervals)
+        self.target_tables = dict(target_tables or {})
+        for interval in self.intervals:
+            self._step(interval)
+
+    def _step(self, interval: str) -> pd.Timedelta:
+        step = pd.Timedelta(interval)
+        day = pd.Timedelta("1D")
+        if step <= self.source_step or step % self.source_step or step > day or day % step:
+            raise ValueError(
+                f"Timeframe no soportado para remuestrear velas de {self.source_interval}: '{interval}'."
+            )
+        return step
+
+    def target_table(self, interval: str, source_columns: Optional[List[str]] = None) -> str:
+        """Tabla donde se materializa `interval`."""
+        if interval in self.target_tables:
+            return self.target_tables[interval]
+        # Una tabla multi-timeframe sin intervalo en el nombre (p. ej. 'klines') recibe sus propios agregados
+        named = re.search(_interval_pattern(self.source_interval), self.source_table)
+        if not named and source_columns and "interval" in source_columns:
+            return self.source_table
+        return resampled_table_name(self.source_table, self.source_interval, interval)
+
+    def refresh(self, since: Optional[Union[str, date, datetime, pd.Timestamp]] = None) -> Dict[str, Dict[str, Any]]:
+        """Agrega las velas nuevas de la tabla de origen en todos los timeframes.
+
+        Todos los timeframes se actualizan en una sola transacción.
+
+        Args:
+            since: Recalcula también los buckets desde esta fecha (por defecto
+                solo los posteriores al último materializado)
+
+        Returns:
+            Estadísticas por timeframe: tabla, filas escritas y segundos
+        """
+        since = pd.Timestamp(since) if since is not None else None
+        stats: Dict[str, Dict[str, Any]] = {}
+        with get_connection_manager(self.db_path).writer() as conn:
+            source_columns = table_columns(conn, self.source_table)
+            if not source_columns:
+                raise ValueError(f"La tabla '{self.source_table}' no existe.")
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                for interval in self.intervals:
+                    stats[interval] = self._refresh_interval(conn, source_columns, interval, since)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        summary = ", ".join(f"{interval}: {s['rows']}" for interval, s in stats.items())
+        logger.info(f"Remuestreo de '{self.source_table}' ({summary} filas).")
+        return stats
+
+    def _refresh_interval(
+        self, conn: Any, source_columns: List[str], interval: str, since: Optional[pd.Timestamp]
+    ) -> Dict[str, Any]:
+        start = time.perf_counter()
+        step = self._step(interval)
+        target = self.target_table(interval, source_columns)
+        source_keyed = "symbol" in source_columns
+
+        # Una tabla de destino existente conserva su esquema: las antiguas de un
+        # solo par (p. ej. 'btc_1h_data' de save_results_to_duckdb) no tienen symbol/interval
+        target_columns = table_columns(conn, target)
+        target_exists = bool(target_columns)
+        if not target_exists:
+            target_columns = source_columns
+        keyed = "symbol" in target_columns
+        tagged = "interval" in target_columns
+        if keyed and not source_keyed:
+            raise ValueError(f"La tabla '{target}' tiene columna symbol y '{self.source_table}' no.")
+
+        # Filtros de origen/destino comunes (intervalo en tablas multi-timeframe)
+        source_where, source_params = [], []
+        target_where, target_params = [], []
+        if "interval" in source_columns:
+            source_where.append('"interval" = ?')
+            source_params.append(self.source_interval)
+        if tagged:
+            target_where.append('"interval" = ?')
+            target_params.append(interval)
+
+        marks: Dict[Optional[str], Any] = {}
+        if target_exists:
+            group = "symbol, " if keyed else ""
+            query = f"SELECT {group}max(Open_Time) FROM {target}"
+            if target_where:
+                query += " WHERE " + " AND ".join(target_where)
+            if keyed:
+                query += " GROUP BY symbol"
+            for row in conn.execute(query, target_params).fetchall():
+                marks[row[0] if keyed else None] = row[-1]
+
+        if source_keyed:
+            query = f"SELECT DISTINCT symbol FROM {self.source_table}"
+            if source_where:
+                query += " WHERE " + " AND ".join(source_where)
+            symbols = [row[0] for row in conn.execute(query, source_params).fetchall()]
+            if not keyed and len(symbols) > 1:
+                raise ValueError(
+                    f"La tabla '{target}' no tiene columna symbol y '{self.source_table}' tiene {len(symbols)} símbolos."
+                )
+        else:
+            symbols = [None]
+
+        prefix = (["symbol"] if keyed else []) + (['? AS "interval"'] if tagged else [])
+        bucket = f"time_bucket(INTERVAL {int(step.total_seconds() // 60)} MINUTE, Open_Time)"
+        aggregations = [
+            f'{expr} AS "{column}"' for column, expr in _AGGREGATIONS.items()
+            if column in source_columns and column in target_columns
+        ]
+        projection = ", ".join(prefix + [f"{bucket} AS Open_Time"] + aggregations)
+        group_by = ", ".join((["symbol"] if keyed else []) + [str(len(prefix) + 1)])
+        select = f"SELECT {projection} FROM {self.source_table} WHERE {{where}} GROUP BY {group_by} ORDER BY {group_by}"
+        select_params = [interval] if tagged else []
+
+        if not target_exists:
+            conn.execute(f"CREATE TABLE {target} AS " + select.format(where="FALSE"), select_params)
+
+        rows = 0
+        for symbol in symbols:
+            where = list(source_where)
+            params = list(source_params)
+            if source_keyed:
+                where.append("symbol = ?")
+                params.append(symbol)
+
+            last_open = conn.execute(
+                f"SELECT max(Open_Time) FROM {self.source_table} WHERE " + " AND ".join(where or ["TRUE"]), params
+            ).fetchone()[0]
+            if last_open is None:
+                continue
+            # Solo buckets cerrados: el último minuto del bucket ya está en la tabla de origen
+            cutoff = (pd.Timestamp(last_open) + self.source_step).floor(step)
+
+            mark = marks.get(symbol if keyed else None)
+            bucket_from = pd.Timestamp(mark) + step if mark is not None else None
+            if since is not None:
+                floored = since.floor(step)
+                bucket_from = floored if bucket_from is None else min(bucket_from, floored)
+            if bucket_from is not None and bucket_from >= cutoff:
+                continue
+
+            where.append("Open_Time < ?")
+            params.append(cutoff.to_pydatetime())
+            if bucket_from is not None:
+                where.append("Open_Time >= ?")
+                params.append(bucket_from.to_pydatetime())
+                delete = target_where + (["symbol = ?"] if keyed else []) + ["Open_Time >= ?"]
+                conn.execute(
+                    f"DELETE FROM {target} WHERE " + " AND ".join(delete),
+                    target_params + ([symbol] if keyed else []) + [bucket_from.to_pydatetime()]
+                )
+
+            rows += conn.execute(
+                f"INSERT INTO {target} BY NAME " + select.format(where=" AND ".join(where)),
+                select_params + params
+            ).fetchone()[0]
+
+        return {'table': target, 'rows': rows, 'seconds': time.perf_counter() - start}
@@ -1,17 +1,317 @@
+import atexit
+import glob
 import json
 import os
+import threading
+import time
+import uuid
+import weakref
 import logging
+from contextlib import contextmanager
 import duckdb
 import pandas as pd
-from typing import Dict, Optional, List
+from typing import Any, Dict, Iterable, Iterator, Optional, List, Sequence
 from .templates import BaseDataRequestTemplate
 
 logger = logging.getLogger(__name__)
 
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Clave natural de las tablas de klines
+KLINES_KEY_COLUMNS = ("symbol", "interval", "Open_Time")
+
+# Raíz por defecto del histórico de klines en Parquet
+DEFAULT_LAKE_ROOT = "data_processor/data/lake"
+
 # --- DUCKDB PERSISTENCE ---
 
-def get_duckdb_connection(db_path: str = "aipha_data.duckdb"):
-    """Obtiene una conexión a la base de datos DuckDB."""
+class DuckDBConnectionManager:
+    """Acceso a un archivo DuckDB compartido por todos los hilos del proceso.
+
+    DuckDB permite, por archivo, un único proceso en lectura-escritura o
+    varios procesos en solo lectura, y dentro de un proceso no se pueden
+    tener a la vez conexiones al mismo archivo con configuración distinta
+    (solo lectura y lectura-escritura incluidas). El gestor lo resuelve así:
+
+    - `reader()`: cursor propio de cada hilo sobre una conexión de solo
+      lectura compartida, que se reutiliza entre consultas y se cierra tras
+      `idle_timeout` segundos sin lectores para no bloquear a otro proceso
+      que quiera escribir (None = no cerrarla nunca).
+    - `writer()`: conexión de lectura-escritura de corta duración que se
+      cierra al terminar. Las escrituras del proceso van de una en una;
+      cada escritura espera a que terminen las lecturas en curso, cierra la
+      conexión de lectura y las lecturas nuevas esperan a que termine.
+    - `threads` y `memory_limit` se aplican a ambas conexiones (sección 'Data' de la config).
+    - Si otro proceso tiene bloqueado el archivo se reintenta hasta `lock_timeout`.
+
+    Usar `get_connection_manager` para obtener la instancia de cada archivo.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        threads: int = 0,
+        memory_limit: str = "",
+        lock_timeout: float = 30.0,
+        idle_timeout: Optional[float] = 5.0
+    ):
+        self.db_path = os.path.abspath(db_path)
+        self.threads = int(threads or 0)
+        self.memory_limit = memory_limit or ""
+        self.lock_timeout = float(lock_timeout)
+        self.idle_timeout = idle_timeout
+        self.connects = 0
+        self._conn: Optional[duckdb.DuckDBPyConnection] = None
+        self._generation = 0
+        self._local = threading.local()
+        self._state = threading.Condition()
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writing = False
+        self._idle_timer: Optional[threading.Timer] = None
+        self._write_lock = threading.RLock()
+        self._write_conn: Optional[duckdb.DuckDBPyConnection] = None
+        self._write_owner: Optional[int] = None
+        _LIVE_MANAGERS.add(self)
+
+    @classmethod
+    def from_config(cls, db_path: str, config: Any) -> "DuckDBConnectionManager":
+        """Crea el gestor con los parámetros 'Data.*' de un ConfigManager (o cualquier objeto con `get`)."""
+        return cls(
+            db_path,
+            threads=config.get("Data.duckdb_threads", 0),
+            memory_limit=config.get("Data.duckdb_memory_limit", ""),
+            lock_timeout=config.get("Data.lock_timeout", 30.0),
+            idle_timeout=config.get("Data.idle_timeout", 5.0),
+        )
+
+    @property
+    def is_open(self) -> bool:
+        """True si la conexión de lectura compartida está abierta."""
+        return self._conn is not None
+
+    def _settings(self) -> Dict[str, Any]:
+        settings: Dict[str, Any] = {}
+        if self.threads > 0:
+            settings['threads'] = self.threads
+        if self.memory_limit:
+            settings['memory_limit'] = self.memory_limit
+        return settings
+
+    def _connect(self, read_only: bool) -> duckdb.DuckDBPyConnection:
+        """Abre el archivo reintentando mientras otro proceso tenga el bloqueo."""
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.05
+        while True:
+            try:
+                conn = duckdb.connect(self.db_path, read_only=read_only, config=self._settings())
+                self.connects += 1
+                logger.debug(
+                    f"Conexión a DuckDB establecida en '{self.db_path}' "
+                    f"({'solo lectura' if read_only else 'lectura-escritura'})."
+                )
+                return conn
+            except duckdb.IOException as e:
+                if "lock" not in str(e).lower() or time.monotonic() >= deadline:
+                    logger.error(f"Error al conectar con DuckDB en '{self.db_path}': {e}")
+                    raise
+                logger.info(f"'{self.db_path}' bloqueado por otro proceso; reintentando en {delay:.2f}s.")
+                time.sleep(delay)
+                delay = min(delay * 2, 1.0)
+
+    def _close_reader(self) -> None:
+        # Llamar con `_state` adquirido y sin lectores activos
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._generation += 1
+
+    def _close_if_idle(self) -> None:
+        with self._state:
+            if self._readers == 0 and not self._writing:
+                self._close_reader()
+
+    def _release_when_idle(self) -> None:
+        # Llamar con `_state` adquirido cuando sale el último lector
+        if self.idle_timeout is None or self._conn is None:
+            return
+        if self.idle_timeout <= 0:
+            self._close_reader()
+            return
+        self._idle_timer = threading.Timer(self.idle_timeout, self._close_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    @contextmanager
+    def reader(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Cursor de lectura del hilo actual sobre la conexión compartida (no cerrarlo).
+
+        Si el archivo aún no existe se usa una base de datos vacía en memoria;
+        dentro de un `writer()` del mismo hilo se lee con la conexión de escritura.
+        """
+        if self._write_owner == threading.get_ident():
+            # Lectura dentro de una escritura del mismo hilo: se usa la conexión de escritura
+            cursor = self._write_conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+            return
+
+        local = self._local
+        depth = getattr(local, 'depth', 0)
+        with self._state:
+            # Las lecturas anidadas de un hilo no esperan, para no bloquearse con una escritura pendiente
+            while depth == 0 and (self._writing or self._waiting_writers):
+                self._state.wait()
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            if self._conn is None and os.path.exists(self.db_path):
+                self._conn = self._connect(read_only=True)
+                self._generation += 1
+            self._readers += 1
+            conn = self._conn
+            generation = self._generation
+
+        try:
+            if conn is None:
+                with duckdb.connect() as empty:
+                    local.depth = depth + 1
+                    yield empty
+            else:
+                if getattr(local, 'generation', None) != generation:
+                    local.cursor = conn.cursor()
+                    local.generation = generation
+                local.depth = depth + 1
+                yield local.cursor
+        finally:
+            local.depth = depth
+            with self._state:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._state.notify_all()
+                    self._release_when_idle()
+
+    @contextmanager
+    def writer(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Conexión de escritura exclusiva y de corta duración (se cierra al salir).
+
+        No abre transacción; quien escribe decide su `BEGIN`/`COMMIT`. Una
+        escritura anidada en el mismo hilo reutiliza la conexión abierta.
+        """
+        with self._write_lock:
+            if self._write_conn is not None:
+                cursor = self._write_conn.cursor()
+                try:
+                    yield cursor
+                finally:
+                    cursor.close()
+                return
+
+            if getattr(self._local, 'depth', 0):
+                raise RuntimeError("writer() dentro de reader() en el mismo hilo.")
+            with self._state:
+                self._waiting_writers += 1
+                while self._readers:
+                    self._state.wait()
+                self._waiting_writers -= 1
+                self._writing = True
+                # No puede haber a la vez una conexión de solo lectura y otra de escritura
+                self._close_reader()
+            try:
+                self._write_conn = self._connect(read_only=False)
+                self._write_owner = threading.get_ident()
+                try:
+                    yield self._write_conn
+                finally:
+                    self._write_owner = None
+                    self._write_conn.close()
+                    self._write_conn = None
+            finally:
+                with self._state:
+                    self._writing = False
+                    self._state.notify_all()
+
+    def close(self) -> None:
+        """Cierra la conexión de lectura cuando no queda nadie usándola (la siguiente lectura la reabre)."""
+        with self._state:
+            while self._readers or self._writing:
+                self._state.wait()
+            self._close_reader()
+
+
+_MANAGERS: Dict[str, DuckDBConnectionManager] = {}
+_MANAGERS_LOCK = threading.Lock()
+_LIVE_MANAGERS: "weakref.WeakSet[DuckDBConnectionManager]" = weakref.WeakSet()
+
+
+def get_connection_manager(db_path: str = "aipha_data.duckdb", config: Optional[Any] = None) -> DuckDBConnectionManager:
+    """Devuelve el gestor de conexión del archivo (uno por archivo y proceso).
+
+    `config` (ConfigManager) solo se aplica al crear el gestor: los scripts
+    lo pasan al arrancar y el resto del código reutiliza la misma conexión.
+    """
+    key = os.path.abspath(db_path)
+    with _MANAGERS_LOCK:
+        manager = _MANAGERS.get(key)
+        if manager is None:
+            manager = (DuckDBConnectionManager.from_config(key, config) if config is not None
+                       else DuckDBConnectionManager(key))
+            _MANAGERS[key] = manager
+        elif config is not None:
+            logger.debug(f"El gestor de '{key}' ya existe; se ignora la nueva configuración.")
+        return manager
+
+
+def close_all_connections() -> None:
+    """Cierra las conexiones de todos los gestores del proceso."""
+    with _MANAGERS_LOCK:
+        managers = list(_MANAGERS.values())
+        _MANAGERS.clear()
+    for manager in managers:
+        manager.close()
+
+
+def _close_idle_at_exit() -> None:
+    # Los temporizadores de inactividad son hilos daemon: las conexiones se cierran
+    # antes de que el intérprete finalice y no desde un hilo a medio destruir
+    for manager in list(_LIVE_MANAGERS):
+        with manager._state:
+            if manager._readers == 0 and not manager._writing:
+                manager._close_reader()
+
+
+atexit.register(_close_idle_at_exit)
+
+
+def _forget_managers_after_fork() -> None:
+    # Un proceso hijo no debe usar la conexión heredada del padre
+    global _MANAGERS_LOCK
+    _MANAGERS.clear()
+    _MANAGERS_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_managers_after_fork)
+
+
+def get_duckdb_connection(db_path: str = "aipha_data.duckdb") -> duckdb.DuckDBPyConnection:
+    """Obtiene una conexión propia de lectura-escritura a la base de datos DuckDB.
+
+    La conexión no pasa por el gestor del archivo: el llamador la cierra y,
+    mientras esté abierta, el proceso retiene el bloqueo exclusivo. Dentro
+    de un proceso que ya lee con `get_connection_manager(db_path)` usar
+    `manager.reader()`/`manager.writer()`, ya que DuckDB no permite abrir el
+    mismo archivo a la vez en solo lectura y en lectura-escritura.
+    """
     try:
         conn = duckdb.connect(db_path)
         logger.debug(f"Conexión a DuckDB establecida en '{db_path}'")
@@ -20,16 +320,28 @@ def get_duckdb_connection(db_path: str = "aipha_data.duckdb"):
         logger.error(f"Error al conectar con DuckDB: {e}")
         raise
 
-def save_results_to_duckdb(df: pd.DataFrame, table_name: str, db_path: str = "aipha_data.duckdb"):
-    """Guarda un DataFrame en una tabla de DuckDB."""
+def save_results_to_duckdb(
+    df: pd.DataFrame,
+    table_name: str,
+    db_path: str = "aipha_data.duckdb",
+    key_columns: Optional[Sequence[str]] = None
+):
+    """Guarda un DataFrame en una tabla de DuckDB.
+
+    Sin `key_columns` las filas se añaden tal cual; con `key_columns` se
+    hace un upsert idempotente (ver `bulk_upsert_to_duckdb`).
+    """
     if df is None or df.empty:
         logger.warning(f"DataFrame vacío o None. No se guardará nada en '{table_name}'.")
         return
 
+    if key_columns:
+        return bulk_upsert_to_duckdb([df], table_name, key_columns, db_path=db_path)
+
     logger.info(f"Guardando {len(df)} filas en la tabla '{table_name}' de DuckDB...")
     
     try:
-        with get_duckdb_connection(db_path) as conn:
+        with get_connection_manager(db_path).writer() as conn:
             # DuckDB puede registrar un DataFrame de pandas directamente
             conn.register("df_tmp", df)
             conn.execute(f"CREATE TABLE IF NOT EXISTS {table_name} AS SELECT * FROM df_tmp WHERE 1=0")
@@ -41,6 +353,263 @@ def save_results_to_duckdb(df: pd.DataFrame, table_name: str, db_path: str = "ai
         logger.error(f"Error al guardar en DuckDB (tabla '{table_name}'): {e}", exc_info=True)
         raise
 
+def table_columns(conn: Any, table_name: str) -> List[str]:
+    """Columnas de una tabla o vista en orden (vacío si no existe)."""
+    rows = conn.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_name = ? ORDER BY ordinal_position",
+        [table_name]
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def _has_primary_key(conn: Any, table_name: str) -> bool:
+    return conn.execute(
+        "SELECT count(*) FROM duckdb_constraints() WHERE table_name = ? AND constraint_type = 'PRIMARY KEY'",
+        [table_name]
+    ).fetchone()[0] > 0
+
+
+def _as_batch(df: pd.DataFrame) -> Any:
+    """Lote a registrar en DuckDB: tabla Arrow (escaneo sin copia) si pyarrow está disponible."""
+    if PYARROW_AVAILABLE:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    return df
+
+
+def bulk_upsert_to_duckdb(
+    frames: Iterable[pd.DataFrame],
+    table_name: str,
+    key_columns: Sequence[str],
+    db_path: str = "aipha_data.duckdb",
+    conn: Optional[Any] = None
+) -> Dict[str, Any]:
+    """Inserta o reemplaza filas por clave en una sola transacción.
+
+    Si la tabla no existe se crea con PRIMARY KEY sobre `key_columns` y cada
+    lote se escribe con `INSERT OR REPLACE`. En tablas antiguas sin clave
+    primaria se borran primero las filas con la misma clave (anti-join) y
+    después se insertan. Repetir la misma carga deja la tabla igual.
+
+    Args:
+        frames: DataFrames a escribir (cada uno se envía como un lote Arrow)
+        table_name: Tabla de destino
+        key_columns: Columnas que identifican una fila
+        db_path: Ruta de la base de datos (si no se pasa `conn`)
+        conn: Conexión existente a reutilizar
+
+    Returns:
+        Estadísticas: lotes, filas, segundos y filas por segundo
+    """
+    if conn is None:
+        with get_connection_manager(db_path).writer() as writer:
+            return bulk_upsert_to_duckdb(frames, table_name, key_columns, conn=writer)
+
+    key_columns = list(key_columns)
+    start = time.perf_counter()
+    stats = {'batches': 0, 'rows': 0}
+    try:
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            table_exists = bool(table_columns(conn, table_name))
+            has_pk = table_exists and _has_primary_key(conn, table_name)
+            for df in frames:
+                if df is None or df.empty:
+                    continue
+                # Dentro de un mismo lote gana la última fila de cada clave
+                df = df.drop_duplicates(subset=key_columns, keep="last")
+                conn.register("upsert_batch", _as_batch(df))
+                try:
+                    if not table_exists:
+                        schema = conn.execute("DESCRIBE SELECT * FROM upsert_batch").fetchall()
+                        columns = ", ".join(f'"{name}" {dtype}' for name, dtype, *_ in schema)
+                        keys = ", ".join(f'"{c}"' for c in key_columns)
+                        conn.execute(f"CREATE TABLE {table_name} ({columns}, PRIMARY KEY ({keys}))")
+                        table_exists = has_pk = True
+
+                    if has_pk:
+                        conn.execute(f"INSERT OR REPLACE INTO {table_name} BY NAME SELECT * FROM upsert_batch")
+                    else:
+                        match = " AND ".join(f'{table_name}."{c}" = b."{c}"' for c in key_columns)
+                        conn.execute(f"DELETE FROM {table_name} USING upsert_batch AS b WHERE {match}")
+                        conn.execute(f"INSERT INTO {table_name} BY NAME SELECT * FROM upsert_batch")
+                finally:
+                    conn.unregister("upsert_batch")
+                stats['batches'] += 1
+                stats['rows'] += len(df)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    except Exception as e:
+        logger.error(f"Error en el upsert a DuckDB (tabla '{table_name}'): {e}", exc_info=True)
+        raise
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['rows_per_s'] = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+    logger.info(
+        f"Upsert en '{table_name}': {stats['rows']} filas en {stats['batches']} lotes, "
+        f"{stats['seconds']:.2f}s ({stats['rows_per_s']:,.0f} filas/s)."
+    )
+    return stats
+
+
+def _tag_klines(df: pd.DataFrame, symbol: str, interval: str, key_columns: List[str]) -> pd.DataFrame:
+    """Añade (al principio) las columnas symbol/interval que forman parte de la clave."""
+    tags = {c: v for c, v in (("symbol", symbol.upper()), ("interval", interval)) if c in key_columns}
+    if not tags:
+        return df
+    return df.assign(**tags)[list(tags) + [c for c in df.columns if c not in tags]]
+
+
+def upsert_klines_to_duckdb(
+    frames: Iterable[pd.DataFrame],
+    table_name: str,
+    symbol: str,
+    interval: str,
+    db_path: str = "aipha_data.duckdb",
+    conn: Optional[Any] = None
+) -> Dict[str, Any]:
+    """Upsert de klines con clave (symbol, interval, Open_Time).
+
+    Añade las columnas `symbol` e `interval` a cada lote. Las tablas
+    antiguas de un solo par sin esas columnas (p. ej. 'btc_1h_data') se
+    mantienen con su esquema y usan solo `Open_Time` como clave.
+    """
+    if conn is None:
+        with get_connection_manager(db_path).writer() as writer:
+            return upsert_klines_to_duckdb(frames, table_name, symbol, interval, conn=writer)
+
+    existing = table_columns(conn, table_name)
+    key_columns = [c for c in KLINES_KEY_COLUMNS if not existing or c in existing]
+    tagged = (_tag_klines(df, symbol, interval, key_columns) for df in frames if df is not None)
+    return bulk_upsert_to_duckdb(tagged, table_name, key_columns, conn=conn)
+
+
+# --- PARQUET LAKE ---
+
+def _sql_identifier(name: str) -> str:
+    """Identificador entre comillas dobles para DDL (no admite parámetros)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_literal(value: str) -> str:
+    """Literal de texto con las comillas simples escapadas."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+class ParquetKlinesLake:
+    """
+    Histórico de klines en Parquet particionado estilo Hive
+    (`symbol=/interval=/year=/month=`) con compresión zstd.
+
+    Cada partición es un único archivo que se reescribe de forma atómica
+    (archivo temporal + `os.replace`): los lectores ven siempre la versión
+    anterior o la nueva completa y nunca toman locks, por lo que pueden leer
+    mientras corre la ingesta. Las consultas se hacen con DuckDB sobre vistas
+    `read_parquet(..., hive_partitioning=true)`; los filtros por symbol,
+    interval, year y month descartan directorios sin leerlos.
+    """
+
+    FILE_NAME = "data.parquet"
+    PARTITION_COLUMNS = ("symbol", "interval", "year", "month")
+
+    def __init__(self, root: str = DEFAULT_LAKE_ROOT, compression: str = "zstd"):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("ParquetKlinesLake requiere pyarrow (pip install pyarrow).")
+        self.root = root
+        self.compression = compression
+        os.makedirs(self.root, exist_ok=True)
+
+    def partition_path(self, symbol: str, interval: str, year: int, month: int) -> str:
+        return os.path.join(
+            self.root, f"symbol={symbol.upper()}", f"interval={interval}", f"year={year}", f"month={month}",
+            self.FILE_NAME
+        )
+
+    def glob(self) -> str:
+        return os.path.join(self.root, "*", "*", "*", "*", "*.parquet")
+
+    def write(self, frames: Iterable[pd.DataFrame], symbol: str, interval: str) -> Dict[str, Any]:
+        """Escribe klines fusionándolas con las particiones existentes.
+
+        Las filas con un Open_Time ya presente reemplazan a las anteriores, así
+        que repetir una escritura deja el lago igual.
+
+        Returns:
+            Estadísticas: filas escritas, particiones reescritas y segundos
+        """
+        start = time.perf_counter()
+        frames = [df for df in frames if df is not None and not df.empty]
+        stats: Dict[str, Any] = {'rows': 0, 'partitions': 0}
+        if not frames:
+            stats['seconds'] = time.perf_counter() - start
+            return stats
+
+        new_rows = pd.concat(frames, ignore_index=True)
+        new_rows = new_rows.drop(columns=[c for c in self.PARTITION_COLUMNS if c in new_rows.columns])
+        open_time = pd.to_datetime(new_rows["Open_Time"])
+        for (year, month), part in new_rows.groupby([open_time.dt.year, open_time.dt.month], sort=True):
+            path = self.partition_path(symbol, interval, int(year), int(month))
+            if os.path.exists(path):
+                part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+            part = part.drop_duplicates(subset=["Open_Time"], keep="last").sort_values("Open_Time")
+            self._write_atomic(part, path)
+            stats['rows'] += len(part)
+            stats['partitions'] += 1
+
+        stats['seconds'] = time.perf_counter() - start
+        logger.info(
+            f"Lago Parquet: {stats['partitions']} particiones de {symbol.upper()} {interval} reescritas "
+            f"({stats['rows']} filas) en {stats['seconds']:.2f}s."
+        )
+        return stats
+
+    def _write_atomic(self, df: pd.DataFrame, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = os.path.join(os.path.dirname(path), f".{uuid.uuid4().hex}.tmp")
+        try:
+            df.to_parquet(tmp_path, engine="pyarrow", compression=self.compression, index=False)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def create_views(
+        self,
+        conn: Any,
+        view_name: str = "klines_lake",
+        symbol_views: Optional[Dict[str, Sequence[str]]] = None
+    ) -> None:
+        """Crea vistas temporales de DuckDB sobre el lago.
+
+        Args:
+            conn: Conexión de DuckDB (basta una en memoria: las vistas son TEMP
+                y no escriben en ningún archivo .duckdb)
+            view_name: Vista con todo el histórico y las columnas de partición
+            symbol_views: {nombre_vista: (symbol, interval)} para exponer un par
+                con el esquema de las tablas antiguas, p. ej.
+                {'btc_1h_data': ('BTCUSDT', '1h')}
+        """
+        if not glob.glob(self.glob()):
+            logger.warning(f"El lago Parquet en '{self.root}' está vacío; no se crean vistas.")
+            return
+        # DuckDB no acepta parámetros en CREATE VIEW: se escapan ruta y nombres
+        source = f"read_parquet({_sql_literal(self.glob())}, hive_partitioning = true)"
+        conn.execute(f"CREATE OR REPLACE TEMP VIEW {_sql_identifier(view_name)} AS SELECT * FROM {source}")
+        for name, (symbol, interval) in (symbol_views or {}).items():
+            conn.execute(
+                f"""CREATE OR REPLACE TEMP VIEW {_sql_identifier(name)} AS
+                    SELECT * EXCLUDE (symbol, "interval", year, month) FROM {source}
+                    WHERE symbol = {_sql_literal(symbol.upper())} AND "interval" = {_sql_literal(interval)}"""
+            )
+
+    def connect(self, symbol_views: Optional[Dict[str, Sequence[str]]] = None) -> Any:
+        """Conexión de DuckDB en memoria con las vistas del lago ya creadas."""
+        conn = duckdb.connect()
+        self.create_views(conn, symbol_views=symbol_views)
+        return conn
+
+
 # --- TEMPLATE MANAGEMENT ---
 
 class DataRequestTemplateManager:
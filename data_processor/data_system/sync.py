@@ -0,0 +1,162 @@
+import logging
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .fetcher import BinanceKlinesFetcher
+from .storage import get_connection_manager, table_columns, upsert_klines_to_duckdb
+from .templates import KlinesDataRequestTemplate
+
+logger = logging.getLogger(__name__)
+
+
+def bars_per_day(interval: str) -> int:
+    """Número de velas de un día completo para un intervalo de Binance (ej: '1m' -> 1440)."""
+    step = pd.Timedelta(interval)
+    if step <= pd.Timedelta(0) or step > pd.Timedelta("1D"):
+        raise ValueError(f"Intervalo no soportado para sincronización diaria: '{interval}'.")
+    return int(pd.Timedelta("1D") // step)
+
+
+def get_daily_coverage(
+    conn: Any,
+    table_name: str,
+    symbol: Optional[str] = None,
+    interval: Optional[str] = None
+) -> Dict[date, int]:
+    """Devuelve {día: número de velas} de una tabla de klines (vacío si la tabla no existe).
+
+    En tablas con columnas `symbol`/`interval` solo cuenta las velas del par pedido.
+    """
+    columns = table_columns(conn, table_name)
+    if not columns:
+        return {}
+    where, params = [], []
+    if symbol is not None and "symbol" in columns:
+        where.append("symbol = ?")
+        params.append(symbol.upper())
+    if interval is not None and "interval" in columns:
+        where.append('"interval" = ?')
+        params.append(interval)
+    query = f"SELECT CAST(Open_Time AS DATE) AS day, count(*) FROM {table_name}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    rows = conn.execute(query + " GROUP BY day", params).fetchall()
+    return {day: count for day, count in rows}
+
+
+def find_missing_days(
+    date_range: List[date],
+    coverage: Dict[date, int],
+    expected_bars: int,
+    refetch_partial: bool = False
+) -> List[date]:
+    """Días del rango sin velas en la tabla (o incompletos si refetch_partial)."""
+    missing = []
+    for day in date_range:
+        count = coverage.get(day, 0)
+        if count == 0 or (refetch_partial and count < expected_bars):
+            missing.append(day)
+    return missing
+
+
+def _contiguous_runs(days: List[date]) -> List[List[date]]:
+    """Agrupa días ordenados en tramos consecutivos."""
+    runs: List[List[date]] = []
+    for day in days:
+        if runs and day - runs[-1][-1] == timedelta(days=1):
+            runs[-1].append(day)
+        else:
+            runs.append([day])
+    return runs
+
+
+def sync_klines_to_duckdb(
+    fetcher: BinanceKlinesFetcher,
+    template: KlinesDataRequestTemplate,
+    table_name: str,
+    db_path: str = "aipha_data.duckdb",
+    refetch_partial: bool = False,
+    today: Optional[date] = None
+) -> Dict[str, Any]:
+    """Sincroniza una tabla de klines con el rango de una plantilla descargando solo lo que falta.
+
+    Consulta qué días del rango ya tienen velas del par en la tabla,
+    descarga únicamente los ausentes (agrupados en tramos consecutivos) y
+    los escribe con `upsert_klines_to_duckdb` en una sola transacción, igual
+    que una descarga completa: la tabla tiene el mismo esquema con
+    cualquiera de los dos modos y repetir la sincronización no duplica
+    filas. Los días a partir de hoy (UTC) se ignoran: Binance Vision publica
+    cada archivo diario al terminar el día.
+
+    Args:
+        fetcher: Fetcher configurado para las descargas
+        template: Plantilla con símbolo, intervalo y rango de fechas
+        table_name: Tabla de destino (ej: 'btc_1h_data')
+        db_path: Ruta de la base de datos DuckDB
+        refetch_partial: Si es True, también se re-descargan los días incompletos
+        today: Fecha de referencia (por defecto hoy en UTC)
+
+    Returns:
+        Estadísticas: días del rango, días ausentes, días descargados, filas insertadas,
+        primer día descargado (`fetched_from`, para recalcular derivados),
+        primer/último Open_Time en la tabla antes de sincronizar y segundos
+    """
+    start = time.perf_counter()
+    today = today or datetime.now(timezone.utc).date()
+    expected_bars = bars_per_day(template.interval)
+    date_range = [d for d in template.get_date_range() if d < today]
+
+    manager = get_connection_manager(db_path)
+    with manager.reader() as conn:
+        coverage = get_daily_coverage(conn, table_name, template.symbol, template.interval)
+    missing = find_missing_days(date_range, coverage, expected_bars, refetch_partial)
+    stats: Dict[str, Any] = {
+        'days': len(date_range),
+        'missing_days': len(missing),
+        'fetched_days': 0,
+        'inserted_rows': 0,
+        'fetched_from': None,
+        'first_day': min(coverage) if coverage else None,
+        'last_day': max(coverage) if coverage else None,
+    }
+    if not missing:
+        stats['seconds'] = time.perf_counter() - start
+        logger.info(f"'{table_name}' ya está al día para '{template.name}' ({len(date_range)} días).")
+        return stats
+
+    logger.info(f"Sincronizando '{table_name}': faltan {len(missing)} de {len(date_range)} días.")
+    frames = []
+    for i, run in enumerate(_contiguous_runs(missing)):
+        gap = KlinesDataRequestTemplate(
+            name=f"{template.name}_gap_{i}",
+            symbol=template.symbol,
+            interval=template.interval,
+            start_date=run[0],
+            end_date=run[-1],
+        )
+        df = fetcher.fetch_klines_by_template(gap)
+        if df is not None and not df.empty:
+            frames.append(df)
+
+    if not frames:
+        logger.warning(f"No se pudo descargar ninguno de los {len(missing)} días ausentes.")
+        stats['seconds'] = time.perf_counter() - start
+        return stats
+
+    # Misma escritura que `--mode full`: upsert por (symbol, interval, Open_Time),
+    # o solo por Open_Time en tablas antiguas sin esas columnas
+    new_rows = pd.concat(frames, ignore_index=True)
+    upsert_klines_to_duckdb([new_rows], table_name, template.symbol, template.interval, db_path=db_path)
+
+    stats['fetched_days'] = int(new_rows["Open_Time"].dt.normalize().nunique())
+    stats['inserted_rows'] = len(new_rows)
+    stats['fetched_from'] = new_rows["Open_Time"].min().date()
+    stats['seconds'] = time.perf_counter() - start
+    logger.info(
+        f"'{table_name}' sincronizada: {stats['fetched_days']} días, {stats['inserted_rows']} filas "
+        f"en {stats['seconds']:.2f}s."
+    )
+    return stats
@@ -50,6 +50,11 @@ def main():
             # 0. Verificar prioridad: Procesar tareas de usuario pendientes antes de nada
             orchestrator.process_pending_requests()
 
+            # Intercambio en caliente del modelo si cambió Oracle.model_path
+            refresh_oracle = getattr(orchestrator.oracle_manager, "refresh", None)
+            if callable(refresh_oracle):
+                refresh_oracle()
+
             # 1. Ejecutar un ciclo de mejora automático
             asyncio.run(orchestrator.run_improvement_cycle(CycleType.AUTO))
             
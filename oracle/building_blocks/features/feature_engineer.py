@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
 import logging
+from typing import Optional
+
+from oracle.building_blocks.features.feature_registry import FeatureRegistry, FeatureRequest, default_registry
 
 logger = logging.getLogger(__name__)
 
@@ -8,38 +11,119 @@ class FeatureEngineer:
     """Extrae características (features) para el entrenamiento del Oráculo."""
 
     @staticmethod
-    def extract_features(df: pd.DataFrame, t_events: pd.Index) -> pd.DataFrame:
+    def locate_events(df: pd.DataFrame, t_events: pd.Index) -> np.ndarray:
+        """
+        Traduce timestamps de eventos a posiciones enteras en `df`.
+
+        Con índices duplicados se usa la primera aparición; los eventos que no
+        existen en el índice reciben -1. El resultado puede reutilizarse en
+        `extract_features(positions=...)` para no repetir la búsqueda.
+        """
+        index = df.index
+        if index.is_unique:
+            return index.get_indexer(t_events)
+        first = ~index.duplicated(keep='first')
+        lookup = index[first].get_indexer(t_events)
+        return np.where(lookup >= 0, np.flatnonzero(first)[lookup], -1)
+
+    @staticmethod
+    def extract_features(
+        df: pd.DataFrame,
+        t_events: pd.Index,
+        positions: Optional[np.ndarray] = None
+    ) -> pd.DataFrame:
         """
         Extrae un conjunto de características para cada evento detectado.
-        
+
+        Las características se calculan columna a columna sobre las filas de
+        los eventos, sin recorrerlos uno a uno.
+
         Args:
             df: DataFrame OHLCV con las columnas calculadas por el detector.
             t_events: Índice de timestamps donde ocurrió una señal.
-            
+            positions: Posiciones enteras de cada evento en `df` (ver
+                `locate_events`). Si se proporcionan, se omite la búsqueda
+                por timestamp.
+
+        Returns:
+            DataFrame con las características para cada evento.
+        """
+        if t_events.empty:
+            return pd.DataFrame()
+
+        if positions is None:
+            positions = FeatureEngineer.locate_events(df, t_events)
+        positions = np.asarray(positions, dtype=np.int64)
+
+        found = positions >= 0
+        if not found.all():
+            logger.warning(f"{(~found).sum()} eventos no encontrados en el DataFrame. Se omiten.")
+            t_events = t_events[found]
+            positions = positions[found]
+
+        def column(name: str) -> np.ndarray:
+            return df[name].to_numpy()[positions]
+
+        volume = column('Volume').astype(np.float64)
+        high = column('High').astype(np.float64)
+        low = column('Low').astype(np.float64)
+        close = column('Close').astype(np.float64)
+
+        # Características sugeridas
+        if 'body_percentage' in df.columns:
+            body_percentage = column('body_percentage')
+        else:
+            body_percentage = np.zeros(len(positions), dtype=np.int64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if 'volume_threshold' in df.columns:
+                threshold = column('volume_threshold').astype(np.float64)
+                volume_ratio = np.where(threshold > 0, volume / threshold, 1.0)
+            else:
+                volume_ratio = np.ones(len(positions))
+            relative_range = np.where(close > 0, (high - low) / close, 0)
+
+        return pd.DataFrame({
+            'body_percentage': body_percentage,
+            'volume_ratio': volume_ratio,
+            'relative_range': relative_range,
+            'hour_of_day': np.asarray(t_events.hour, dtype=np.int64)
+        }, index=t_events)
+
+    @staticmethod
+    def extract_registered_features(
+        df: pd.DataFrame,
+        t_events: pd.Index,
+        features: Optional[FeatureRequest] = None,
+        positions: Optional[np.ndarray] = None,
+        registry: FeatureRegistry = default_registry
+    ) -> pd.DataFrame:
+        """
+        Extrae características del registro para cada evento.
+
+        Cada característica se calcula vectorizada sobre toda la serie (solo
+        si se pide) y se cachea en el registro, de modo que ejecuciones
+        repetidas sobre los mismos datos la reutilizan.
+
+        Args:
+            df: DataFrame OHLCV.
+            t_events: Índice de timestamps donde ocurrió una señal.
+            features: Lista de nombres o {nombre: parámetros}. None = todas.
+            positions: Posiciones enteras precalculadas de los eventos.
+            registry: Registro de características a usar.
+
         Returns:
             DataFrame con las características para cada evento.
         """
         if t_events.empty:
             return pd.DataFrame()
 
-        features_list = []
-        
-        for timestamp in t_events:
-            if timestamp not in df.index:
-                continue
-            
-            row = df.loc[timestamp]
-            if isinstance(row, pd.DataFrame):
-                row = row.iloc[0]
-            
-            # Características sugeridas
-            features = {
-                'body_percentage': row.get('body_percentage', 0),
-                'volume_ratio': row['Volume'] / row['volume_threshold'] if 'volume_threshold' in row and row['volume_threshold'] > 0 else 1.0,
-                'relative_range': (row['High'] - row['Low']) / row['Close'] if row['Close'] > 0 else 0,
-                'hour_of_day': timestamp.hour
-            }
-            
-            features_list.append(features)
-
-        return pd.DataFrame(features_list, index=t_events)
+        if positions is None:
+            positions = FeatureEngineer.locate_events(df, t_events)
+        positions = np.asarray(positions, dtype=np.int64)
+        found = positions >= 0
+        if not found.all():
+            logger.warning(f"{(~found).sum()} eventos no encontrados en el DataFrame. Se omiten.")
+            t_events, positions = t_events[found], positions[found]
+
+        return registry.compute(df, features, positions=positions, index=t_events)
@@ -0,0 +1,315 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FeatureRequest = Union[Sequence[str], Mapping[str, Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """
+    Definición de una característica del Oráculo.
+
+    Attributes:
+        name: Nombre de la característica.
+        func: Función vectorizada (df, **params) -> array/Series con un valor
+            por vela de la serie completa.
+        inputs: Columnas de `df` que necesita.
+        lookback: Velas de histórico que necesita cada valor (warm-up).
+        defaults: Parámetros por defecto.
+        version: Versión del cálculo; se incrementa al cambiar su resultado
+            para invalidar la caché en disco.
+    """
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...]
+    lookback: int = 0
+    defaults: Dict[str, Any] = field(default_factory=dict)
+    version: int = 1
+
+    @cached_property
+    def source_hash(self) -> str:
+        """Huella del código de la función (cambia al editarla aunque no se suba `version`)."""
+        try:
+            source = inspect.getsource(self.func).encode()
+        except (OSError, TypeError):
+            source = self.func.__code__.co_code
+        return hashlib.sha1(source).hexdigest()[:8]
+
+    def cache_tag(self) -> str:
+        """Parte de la clave de caché que identifica la versión del cálculo."""
+        return f"v{self.version}-{self.source_hash}"
+
+    def resolve_params(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        resolved = dict(self.defaults)
+        if params:
+            unknown = set(params) - set(self.defaults)
+            if unknown:
+                raise ValueError(f"Parámetros desconocidos para '{self.name}': {sorted(unknown)}")
+            resolved.update(params)
+        return resolved
+
+    def column_name(self, params: Dict[str, Any]) -> str:
+        """Nombre de columna: el nombre base, con sufijo si los parámetros no son los por defecto."""
+        if params == self.defaults:
+            return self.name
+        return self.name + "_" + "_".join(str(params[k]) for k in sorted(params))
+
+    def lookback_for(self, params: Dict[str, Any]) -> int:
+        """Lookback efectivo: el declarado o el mayor parámetro de ventana."""
+        windows = [v for k, v in params.items() if k in ("window", "period") and isinstance(v, int)]
+        return max([self.lookback] + windows)
+
+
+class FeatureRegistry:
+    """
+    Registro de características calculadas de forma perezosa y cacheada.
+
+    Cada característica se calcula vectorizada sobre la serie completa solo
+    cuando se pide, y el resultado se memoriza por (huella del dataset,
+    nombre, versión, parámetros). La huella se obtiene solo de las columnas
+    de entrada de la característica, por lo que añadir columnas nuevas a
+    `df` no invalida la caché. La caché en memoria es LRU y no supera
+    `max_cache_bytes`. Con `cache_dir` los resultados se guardan además en
+    disco (.npy) y se reutilizan entre ejecuciones; la versión (la declarada
+    en `register` y una huella del código de la función) evita reutilizar
+    valores de una definición anterior.
+    """
+
+    DEFAULT_MAX_CACHE_BYTES = 256 * 1024 ** 2
+
+    def __init__(self, cache_dir: Optional[str] = None, max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        """
+        Args:
+            cache_dir: Directorio de la caché en disco (None = solo en memoria).
+            max_cache_bytes: Tope de la caché en memoria; se expulsan primero
+                los resultados usados hace más tiempo.
+        """
+        self._specs: Dict[str, FeatureSpec] = {}
+        self._memory_cache: "OrderedDict[Tuple[str, str, str], np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_bytes = 0
+        self.max_cache_bytes = max_cache_bytes
+        self.cache_dir = cache_dir
+
+    def register(
+        self, name: str, inputs: Iterable[str], lookback: int = 0, version: int = 1, **defaults
+    ) -> Callable:
+        """Decorador que registra una función de característica."""
+        def decorator(func: Callable) -> Callable:
+            self._specs[name] = FeatureSpec(name, func, tuple(inputs), lookback, dict(defaults), version)
+            return func
+        return decorator
+
+    def copy(self, cache_dir: Optional[str] = None) -> 'FeatureRegistry':
+        """Nuevo registro con las mismas definiciones y caché vacía."""
+        clone = FeatureRegistry(cache_dir=cache_dir, max_cache_bytes=self.max_cache_bytes)
+        clone._specs = dict(self._specs)
+        return clone
+
+    def get(self, name: str) -> FeatureSpec:
+        if name not in self._specs:
+            raise KeyError(f"Característica no registrada: '{name}'")
+        return self._specs[name]
+
+    def list_features(self) -> List[str]:
+        return sorted(self._specs)
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._memory_cache.clear()
+            self.cache_bytes = 0
+
+    def _cached(self, key: Tuple[str, str, str]) -> Optional[np.ndarray]:
+        with self._cache_lock:
+            values = self._memory_cache.get(key)
+            if values is not None:
+                self._memory_cache.move_to_end(key)
+            return values
+
+    def _remember(self, key: Tuple[str, str, str], values: np.ndarray) -> None:
+        with self._cache_lock:
+            previous = self._memory_cache.pop(key, None)
+            if previous is not None:
+                self.cache_bytes -= previous.nbytes
+            self._memory_cache[key] = values
+            self.cache_bytes += values.nbytes
+            # Se expulsan los más antiguos; el recién calculado se conserva aunque supere el tope
+            while self.cache_bytes > self.max_cache_bytes and len(self._memory_cache) > 1:
+                _, evicted = self._memory_cache.popitem(last=False)
+                self.cache_bytes -= evicted.nbytes
+
+    @staticmethod
+    def _normalize_request(features: Optional[FeatureRequest], available: Iterable[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        if features is None:
+            return [(name, {}) for name in available]
+        if isinstance(features, Mapping):
+            return [(name, dict(params or {})) for name, params in features.items()]
+        return [(name, {}) for name in features]
+
+    def required_inputs(self, features: Optional[FeatureRequest] = None) -> List[str]:
+        """Columnas de `df` que necesitan las características pedidas."""
+        request = self._normalize_request(features, self._specs)
+        return sorted({column for name, _ in request for column in self.get(name).inputs})
+
+    def max_lookback(self, features: Optional[FeatureRequest] = None) -> int:
+        """Mayor lookback entre las características pedidas."""
+        request = self._normalize_request(features, self._specs)
+        return max((self.get(n).lookback_for(self.get(n).resolve_params(p)) for n, p in request), default=0)
+
+    @staticmethod
+    def fingerprint(df: pd.DataFrame, columns: Iterable[str]) -> str:
+        """Huella estable del índice y las columnas indicadas de `df`."""
+        digest = hashlib.sha1(pd.util.hash_pandas_object(df.index).to_numpy().tobytes())
+        for column in columns:
+            digest.update(pd.util.hash_pandas_object(df[column], index=False).to_numpy().tobytes())
+        digest.update(",".join(columns).encode())
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def _params_key(params: Dict[str, Any]) -> str:
+        return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+    def _disk_path(self, fingerprint: str, name: str, params_key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, fingerprint, f"{name}-{params_key}.npy")
+
+    def compute_series(
+        self,
+        df: pd.DataFrame,
+        name: str,
+        params: Optional[Dict[str, Any]] = None,
+        fingerprints: Optional[Dict[Tuple[str, ...], str]] = None
+    ) -> np.ndarray:
+        """
+        Devuelve la característica sobre toda la serie (cacheada).
+
+        Args:
+            fingerprints: Diccionario opcional {columnas: huella} para no
+                recalcular la huella de las mismas columnas varias veces.
+        """
+        spec = self.get(name)
+        resolved = spec.resolve_params(params)
+        missing = [c for c in spec.inputs if c not in df.columns]
+        if missing:
+            raise KeyError(f"Faltan columnas para '{name}': {missing}")
+
+        if fingerprints is None:
+            fingerprints = {}
+        if spec.inputs not in fingerprints:
+            fingerprints[spec.inputs] = self.fingerprint(df, spec.inputs)
+        key = (fingerprints[spec.inputs], name, f"{spec.cache_tag()}-{self._params_key(resolved)}")
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        path = self._disk_path(*key)
+        if path and os.path.exists(path):
+            values = np.load(path)
+            logger.debug(f"Característica '{name}' cargada de caché en disco: {path}")
+        else:
+            values = np.asarray(spec.func(df, **resolved), dtype=np.float64)
+            if len(values) != len(df):
+                raise ValueError(f"La característica '{name}' devolvió {len(values)} valores para {len(df)} velas.")
+            if path:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                np.save(path, values)
+        self._remember(key, values)
+        return values
+
+    def compute(
+        self,
+        df: pd.DataFrame,
+        features: Optional[FeatureRequest] = None,
+        positions: Optional[np.ndarray] = None,
+        index: Optional[pd.Index] = None
+    ) -> pd.DataFrame:
+        """
+        Calcula las características pedidas y las devuelve como DataFrame.
+
+        Args:
+            df: DataFrame OHLCV.
+            features: Lista de nombres o {nombre: parámetros}. None = todas.
+            positions: Si se indica, solo se devuelven esas filas (posiciones enteras).
+            index: Índice del resultado; por defecto el de las filas devueltas.
+
+        Returns:
+            DataFrame con una columna por característica.
+        """
+        request = self._normalize_request(features, self.list_features())
+        if positions is not None:
+            positions = np.asarray(positions, dtype=np.int64)
+        if index is None:
+            index = df.index if positions is None else df.index[positions]
+
+        columns = {}
+        fingerprints: Dict[Tuple[str, ...], str] = {}
+        for name, params in request:
+            spec = self.get(name)
+            values = self.compute_series(df, name, params, fingerprints)
+            columns[spec.column_name(spec.resolve_params(params))] = values if positions is None else values[positions]
+        return pd.DataFrame(columns, index=index)
+
+
+# --- REGISTRO POR DEFECTO ---
+
+default_registry = FeatureRegistry()
+
+
+@default_registry.register("body_percentage", inputs=("Open", "High", "Low", "Close"))
+def _body_percentage(df: pd.DataFrame) -> np.ndarray:
+    body = np.abs(df['Close'].to_numpy(dtype=np.float64) - df['Open'].to_numpy(dtype=np.float64))
+    candle_range = df['High'].to_numpy(dtype=np.float64) - df['Low'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(candle_range > 0, (body / candle_range) * 100, 100)
+
+
+@default_registry.register("relative_range", inputs=("High", "Low", "Close"))
+def _relative_range(df: pd.DataFrame) -> np.ndarray:
+    close = df['Close'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(close > 0, (df['High'].to_numpy(dtype=np.float64) - df['Low'].to_numpy(dtype=np.float64)) / close, 0)
+
+
+@default_registry.register("hour_of_day", inputs=())
+def _hour_of_day(df: pd.DataFrame) -> np.ndarray:
+    return np.asarray(df.index.hour, dtype=np.float64)
+
+
+@default_registry.register("returns", inputs=("Close",), window=1)
+def _returns(df: pd.DataFrame, window: int) -> np.ndarray:
+    """Retorno logarítmico a `window` velas."""
+    return np.log(df['Close']).diff(window).to_numpy()
+
+
+@default_registry.register("volatility", inputs=("Close",), window=24)
+def _volatility(df: pd.DataFrame, window: int) -> np.ndarray:
+    """Desviación típica móvil de los retornos logarítmicos."""
+    return np.log(df['Close']).diff().rolling(window).std().to_numpy()
+
+
+@default_registry.register("volume_zscore", inputs=("Volume",), window=50)
+def _volume_zscore(df: pd.DataFrame, window: int) -> np.ndarray:
+    """Z-score del volumen respecto a su media/desviación móviles."""
+    rolling = df['Volume'].rolling(window)
+    return ((df['Volume'] - rolling.mean()) / rolling.std()).to_numpy()
+
+
+@default_registry.register("ema_distance", inputs=("Close",), period=200)
+def _ema_distance(df: pd.DataFrame, period: int) -> np.ndarray:
+    """Distancia relativa del cierre a su EMA."""
+    ema = df['Close'].ewm(span=period, adjust=False).mean()
+    return (df['Close'] / ema - 1).to_numpy()
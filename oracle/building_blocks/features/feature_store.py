@@ -0,0 +1,409 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_processor.data_system.market_data import OHLCV_COLUMNS, load_klines
+from data_processor.data_system.storage import get_connection_manager
+from oracle.building_blocks.features.feature_engineer import FeatureEngineer
+from oracle.building_blocks.features.feature_registry import FeatureRequest, default_registry
+from trading_manager.building_blocks.detectors.key_candle_detector import SignalDetector, StreamingKeyCandleDetector
+from trading_manager.building_blocks.labelers.potential_capture_engine import get_atr_labels
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureStore:
+    """
+    Almacén persistente de características y etiquetas de eventos en DuckDB.
+
+    Cada combinación de parámetros de detección y etiquetado define una
+    versión (`feature_version`) con su propia tabla `oracle_features_<versión>`,
+    cuyas filas se identifican por (symbol, interval, Open_Time). La tabla
+    `oracle_feature_catalog` guarda, por versión/símbolo/intervalo, la última
+    vela procesada y el estado del detector en streaming.
+
+    `sync` procesa solo las velas añadidas desde la última ejecución: el
+    detector continúa desde su estado guardado (mismo resultado que
+    recalcular el histórico completo) y se re-etiquetan los eventos cuya
+    ventana futura aún no estaba completa. Esos eventos quedan con
+    label NULL hasta que se resuelven y `load_training_set` los excluye.
+    """
+
+    CATALOG_TABLE = "oracle_feature_catalog"
+    SCHEMA_VERSION = 1
+    FEATURE_COLUMNS = ('body_percentage', 'volume_ratio', 'relative_range', 'hour_of_day')
+    PRICE_COLUMNS = ('Open_Time', 'Open', 'High', 'Low', 'Close', 'Volume')
+
+    DEFAULT_DETECTOR_PARAMS = {
+        'volume_lookback': 50,
+        'volume_percentile_threshold': 80,
+        'body_percentile_threshold': 30,
+        'ema_period': 200,
+        'reversal_mode': True,
+    }
+    DEFAULT_LABEL_PARAMS = {
+        'atr_period': 14,
+        'tp_factor': 2.0,
+        'sl_factor': 1.0,
+        'time_limit': 24,
+        'use_sides': True,
+    }
+
+    def __init__(
+        self,
+        db_path: str = "data_processor/data/aipha_data.duckdb",
+        detector_params: Optional[Dict[str, Any]] = None,
+        label_params: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            db_path: Base de datos DuckDB (la misma que contiene las velas).
+            detector_params: Parámetros de `StreamingKeyCandleDetector`.
+            label_params: Parámetros de `get_atr_labels` más `use_sides`
+                (False etiqueta todos los eventos como Long).
+        """
+        self.db_path = db_path
+        self.detector_params = self._merge(self.DEFAULT_DETECTOR_PARAMS, detector_params)
+        self.label_params = self._merge(self.DEFAULT_LABEL_PARAMS, label_params)
+
+    @staticmethod
+    def _merge(defaults: Dict[str, Any], params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        merged = dict(defaults)
+        if params:
+            unknown = set(params) - set(defaults)
+            if unknown:
+                raise ValueError(f"Parámetros desconocidos: {sorted(unknown)}")
+            merged.update(params)
+        return merged
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return {
+            'schema': self.SCHEMA_VERSION,
+            'detector': self.detector_params,
+            'labels': self.label_params,
+        }
+
+    @property
+    def feature_version(self) -> str:
+        """Versión estable derivada del esquema y los parámetros."""
+        digest = hashlib.sha1(json.dumps(self.params, sort_keys=True).encode()).hexdigest()[:10]
+        return f"v{self.SCHEMA_VERSION}_{digest}"
+
+    @property
+    def table_name(self) -> str:
+        return f"oracle_features_{self.feature_version}"
+
+    # --- ESQUEMA ---
+
+    def _ensure_tables(self, conn) -> None:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.CATALOG_TABLE} (
+                feature_version VARCHAR,
+                symbol VARCHAR,
+                "interval" VARCHAR,
+                source_table VARCHAR,
+                params VARCHAR,
+                detector_state VARCHAR,
+                last_open_time TIMESTAMP,
+                n_bars BIGINT,
+                updated_at TIMESTAMP,
+                PRIMARY KEY (feature_version, symbol, "interval")
+            )
+        """)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
+                symbol VARCHAR,
+                "interval" VARCHAR,
+                Open_Time TIMESTAMP,
+                signal_side TINYINT,
+                body_percentage DOUBLE,
+                volume_ratio DOUBLE,
+                relative_range DOUBLE,
+                hour_of_day INTEGER,
+                label TINYINT,
+                PRIMARY KEY (symbol, "interval", Open_Time)
+            )
+        """)
+
+    def _read_catalog(self, conn, symbol: str, interval: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute(
+            f"""SELECT detector_state, last_open_time, n_bars FROM {self.CATALOG_TABLE}
+                WHERE feature_version = ? AND symbol = ? AND "interval" = ?""",
+            [self.feature_version, symbol, interval]
+        ).fetchone()
+        if row is None:
+            return None
+        return {'detector_state': json.loads(row[0]), 'last_open_time': pd.Timestamp(row[1]), 'n_bars': row[2]}
+
+    # --- CARGA DE VELAS ---
+
+    def _load_bars(self, conn, source_table: str, cursor: Optional[pd.Timestamp], inclusive: bool, warmup: int) -> pd.DataFrame:
+        """
+        Carga las velas desde `cursor` más `warmup` velas anteriores (para el ATR).
+        Sin cursor se carga la tabla completa.
+        """
+        columns = ", ".join(self.PRICE_COLUMNS)
+        if cursor is None:
+            df = conn.execute(f"SELECT {columns} FROM {source_table} ORDER BY Open_Time").df()
+        else:
+            op = ">=" if inclusive else ">"
+            df = conn.execute(f"""
+                SELECT * FROM (
+                    SELECT {columns} FROM {source_table} WHERE NOT (Open_Time {op} ?)
+                    ORDER BY Open_Time DESC LIMIT {int(warmup)}
+                )
+                UNION ALL
+                SELECT {columns} FROM {source_table} WHERE Open_Time {op} ?
+                ORDER BY Open_Time
+            """, [cursor.to_pydatetime(), cursor.to_pydatetime()]).df()
+
+        df['Open_Time'] = pd.to_datetime(df['Open_Time'])
+        df = df.sort_values('Open_Time', kind='stable')
+        duplicated = df['Open_Time'].duplicated(keep='first')
+        if duplicated.any():
+            logger.warning(f"{duplicated.sum()} velas con Open_Time duplicado. Se usa la primera aparición.")
+            df = df[~duplicated]
+        return df.set_index('Open_Time')
+
+    # --- SINCRONIZACIÓN ---
+
+    def _detect(self, detector: StreamingKeyCandleDetector, bars: pd.DataFrame) -> pd.DataFrame:
+        """Pasa las velas nuevas por el detector y devuelve sus columnas de señal."""
+        n = len(bars)
+        is_key = np.zeros(n, dtype=bool)
+        side = np.zeros(n, dtype=np.int8)
+        volume_threshold = np.empty(n)
+        body_percentage = np.empty(n)
+        update = detector.update
+        columns = [bars[c].to_numpy(dtype=np.float64) for c in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        for i, (o, h, l, c, v) in enumerate(zip(*columns)):
+            result = update({'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v})
+            is_key[i] = result['is_key_candle']
+            side[i] = result['signal_side']
+            volume_threshold[i] = result['volume_threshold']
+            body_percentage[i] = result['body_percentage']
+        return pd.DataFrame({
+            'is_key_candle': is_key,
+            'signal_side': side,
+            'volume_threshold': volume_threshold,
+            'body_percentage': body_percentage,
+        }, index=bars.index)
+
+    def _label(self, bars: pd.DataFrame, t_events: pd.Index, sides: pd.Series) -> pd.Series:
+        """Etiqueta eventos; NaN si el resultado aún depende de velas futuras."""
+        params = self.label_params
+        labels = get_atr_labels(
+            bars, t_events,
+            sides=sides if params['use_sides'] else None,
+            atr_period=params['atr_period'],
+            tp_factor=params['tp_factor'],
+            sl_factor=params['sl_factor'],
+            time_limit=params['time_limit']
+        ).astype('float64')
+        positions = FeatureEngineer.locate_events(bars, labels.index)
+        incomplete = positions + params['time_limit'] > len(bars) - 1
+        labels[(labels.to_numpy() == 0) & incomplete] = np.nan
+        return labels
+
+    def sync(self, source_table: str, symbol: str, interval: str) -> Dict[str, Any]:
+        """
+        Procesa las velas nuevas de `source_table` y actualiza el almacén.
+
+        Args:
+            source_table: Tabla de velas OHLCV (ej: 'btc_1h_data').
+            symbol: Símbolo (ej: 'BTCUSDT').
+            interval: Intervalo (ej: '1h').
+
+        Returns:
+            Diccionario con new_bars, new_events, resolved y pending.
+        """
+        warmup = self.label_params['atr_period'] + 1
+        with get_connection_manager(self.db_path).writer() as conn:
+            self._ensure_tables(conn)
+            catalog = self._read_catalog(conn, symbol, interval)
+
+            pending = conn.execute(
+                f"""SELECT Open_Time, signal_side FROM {self.table_name}
+                    WHERE symbol = ? AND "interval" = ? AND label IS NULL ORDER BY Open_Time""",
+                [symbol, interval]
+            ).df()
+            pending['Open_Time'] = pd.to_datetime(pending['Open_Time'])
+
+            if catalog is None:
+                detector = StreamingKeyCandleDetector(**self.detector_params)
+                last_open_time, n_bars = None, 0
+                bars = self._load_bars(conn, source_table, None, True, warmup)
+            else:
+                detector = StreamingKeyCandleDetector.from_state(catalog['detector_state'])
+                last_open_time, n_bars = catalog['last_open_time'], catalog['n_bars']
+                if pending.empty:
+                    bars = self._load_bars(conn, source_table, last_open_time, False, warmup)
+                else:
+                    bars = self._load_bars(conn, source_table, pending['Open_Time'].iloc[0], True, warmup)
+
+            new_mask = np.ones(len(bars), dtype=bool) if last_open_time is None else (bars.index > last_open_time)
+            new_bars = bars[new_mask]
+            stats = {'new_bars': len(new_bars), 'new_events': 0, 'resolved': 0, 'pending': len(pending)}
+            if new_bars.empty:
+                logger.info(f"FeatureStore {self.feature_version}: sin velas nuevas para {symbol} {interval}.")
+                return stats
+
+            signals = self._detect(detector, new_bars)
+            frame = bars.join(signals)
+            event_mask = frame['is_key_candle'].eq(True).to_numpy()
+            t_events = frame.index[event_mask]
+            features = FeatureEngineer.extract_features(frame, t_events, positions=np.flatnonzero(event_mask))
+
+            # Eventos a etiquetar: los pendientes de ejecuciones anteriores y los nuevos
+            target_events = pd.DatetimeIndex(np.concatenate([
+                pending['Open_Time'].to_numpy(dtype='datetime64[ns]'), t_events.to_numpy(dtype='datetime64[ns]')
+            ]))
+            target_sides = pd.Series(
+                np.concatenate([pending['signal_side'].to_numpy(dtype=np.int64),
+                                frame['signal_side'].to_numpy()[event_mask].astype(np.int64)]),
+                index=target_events
+            )
+            labels = self._label(frame, target_events, target_sides) if len(target_events) else pd.Series(dtype='float64')
+
+            new_rows = pd.DataFrame({
+                'symbol': symbol,
+                'interval': interval,
+                'Open_Time': t_events,
+                'signal_side': frame['signal_side'].to_numpy()[event_mask].astype(np.int8),
+            })
+            for column in self.FEATURE_COLUMNS:
+                new_rows[column] = features[column].to_numpy() if len(t_events) else []
+            new_rows['label'] = labels.reindex(t_events).to_numpy()
+
+            resolved = pd.DataFrame({'Open_Time': pending['Open_Time'],
+                                     'label': labels.reindex(pd.DatetimeIndex(pending['Open_Time'])).to_numpy()})
+            resolved = resolved[resolved['label'].notna()]
+
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                if not new_rows.empty:
+                    conn.register("new_rows_tmp", new_rows)
+                    conn.execute(f"INSERT INTO {self.table_name} SELECT * FROM new_rows_tmp")
+                    conn.unregister("new_rows_tmp")
+                if not resolved.empty:
+                    conn.register("resolved_tmp", resolved)
+                    conn.execute(f"""
+                        UPDATE {self.table_name} AS t SET label = r.label
+                        FROM resolved_tmp AS r
+                        WHERE t.symbol = ? AND t."interval" = ? AND t.Open_Time = r.Open_Time
+                    """, [symbol, interval])
+                    conn.unregister("resolved_tmp")
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.CATALOG_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [self.feature_version, symbol, interval, source_table,
+                     json.dumps(self.params, sort_keys=True), json.dumps(detector.get_state()),
+                     new_bars.index[-1].to_pydatetime(), n_bars + len(new_bars), datetime.now()]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        stats.update({
+            'new_events': len(new_rows),
+            'resolved': len(resolved),
+            'pending': int(labels.isna().sum()),
+        })
+        logger.info(f"FeatureStore {self.feature_version} ({symbol} {interval}): {stats}")
+        return stats
+
+    # --- LECTURA ---
+
+    def load_training_set(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        include_pending: bool = False
+    ) -> pd.DataFrame:
+        """
+        Devuelve los eventos almacenados con una única consulta columnar.
+
+        Returns:
+            DataFrame indexado por Open_Time con signal_side, las
+            características y label.
+        """
+        columns = ", ".join(('Open_Time', 'signal_side') + self.FEATURE_COLUMNS + ('label',))
+        query = f'SELECT {columns} FROM {self.table_name} WHERE symbol = ? AND "interval" = ?'
+        params: list = [symbol, interval]
+        if not include_pending:
+            query += " AND label IS NOT NULL"
+        if start is not None:
+            query += " AND Open_Time >= ?"
+            params.append(pd.Timestamp(start).to_pydatetime())
+        if end is not None:
+            query += " AND Open_Time <= ?"
+            params.append(pd.Timestamp(end).to_pydatetime())
+        query += " ORDER BY Open_Time"
+
+        with get_connection_manager(self.db_path).reader() as conn:
+            exists = conn.execute(
+                "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", [self.table_name]
+            ).fetchone()[0]
+            if not exists:
+                logger.warning(f"La versión {self.feature_version} no tiene datos. Ejecute sync() primero.")
+                return pd.DataFrame(columns=list(('signal_side',) + self.FEATURE_COLUMNS + ('label',)))
+            df = conn.execute(query, params).df()
+
+        df['Open_Time'] = pd.to_datetime(df['Open_Time'])
+        return df.set_index('Open_Time')
+
+
+def build_training_set(
+    db_path: str,
+    table_name: str,
+    detector_params: Optional[Dict[str, Any]] = None,
+    label_params: Optional[Dict[str, Any]] = None,
+    extra_features: Optional[FeatureRequest] = None,
+    cache_dir: Optional[str] = None,
+    min_events: int = 10
+) -> Tuple[Optional[pd.DataFrame], Optional[pd.Series]]:
+    """
+    Recalcula detección, etiquetas y features sobre el histórico completo.
+
+    Es la alternativa sin estado a `FeatureStore` (mismos `detector_params`
+    y `label_params`, incluido `use_sides`), necesaria cuando se piden
+    características del registro (`extra_features`), que se cachean en
+    `cache_dir`.
+
+    Returns:
+        (features, labels) de los eventos, o (None, None) si hay menos de
+        `min_events`.
+    """
+    label_params = dict(label_params or {})
+    use_sides = label_params.pop('use_sides', True)
+
+    # Solo las columnas que usan detector, etiquetado y features, ya ordenadas en DuckDB
+    registry = default_registry.copy(cache_dir=cache_dir)
+    columns = sorted(set(OHLCV_COLUMNS) | set(registry.required_inputs(extra_features) if extra_features else ()))
+    df = load_klines(db_path, table_name, columns=columns)
+
+    df = SignalDetector.detect_key_candles(df, **(detector_params or {}))
+    key_candles = df[df['is_key_candle']]
+    t_events = key_candles.index
+    event_positions = np.flatnonzero(df['is_key_candle'].to_numpy())
+    if len(t_events) < min_events:
+        return None, None
+
+    sides = key_candles['signal_side'] if use_sides else None
+    labels = get_atr_labels(df, t_events, sides=sides, **label_params)
+    features = FeatureEngineer.extract_features(df, t_events, positions=event_positions)
+
+    # Características adicionales del registro (cacheadas en disco entre ejecuciones)
+    if extra_features:
+        features = features.join(FeatureEngineer.extract_registered_features(
+            df, t_events, extra_features, positions=event_positions, registry=registry
+        ))
+    return features, labels
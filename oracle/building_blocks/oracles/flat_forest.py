@@ -0,0 +1,195 @@
+import logging
+import os
+from dataclasses import dataclass, fields
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FlatForest:
+    """
+    Bosque de árboles de decisión aplanado en arrays contiguos de NumPy.
+
+    Los nodos de todos los árboles se concatenan; `left`/`right` son índices
+    globales y `roots` el nodo raíz de cada árbol. Las hojas apuntan a sí
+    mismas. El recorrido avanza todos los pares (árbol, fila) a la vez, un
+    nivel por paso, y descarta periódicamente los que ya llegaron a una hoja.
+    `value` guarda la probabilidad normalizada de cada nodo.
+
+    `predict_proba` reproduce a `RandomForestClassifier.predict_proba` bit a
+    bit: las filas se convierten a float32 como en sklearn y las
+    probabilidades se acumulan árbol a árbol en el mismo orden.
+
+    Attributes:
+        feature: Característica evaluada en cada nodo (int32; 0 en hojas).
+        threshold: Umbral de cada nodo (float64; +inf en hojas).
+        left: Hijo izquierdo (x <= umbral) de cada nodo.
+        right: Hijo derecho de cada nodo.
+        value: Probabilidad por clase de cada nodo (n_nodes x n_classes).
+        roots: Nodo raíz de cada árbol.
+        max_depth: Profundidad máxima del bosque.
+        classes: Etiquetas de clase del modelo original.
+        missing_left: Si existe, dirección de los NaN en cada nodo.
+        feature_names: Orden de columnas esperado si se entrenó con DataFrame.
+    """
+    COMPACT_EVERY = 4
+
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    value: np.ndarray
+    roots: np.ndarray
+    max_depth: int
+    classes: np.ndarray
+    missing_left: Optional[np.ndarray] = None
+    feature_names: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> 'FlatForest':
+        """Exporta un RandomForest/ExtraTrees o DecisionTree clasificador ya entrenado."""
+        estimators = getattr(model, "estimators_", None)
+        if estimators is None:
+            estimators = [model]
+        if not hasattr(estimators[0], "tree_") or getattr(model, "n_outputs_", 1) != 1:
+            raise TypeError(f"Modelo no soportado para exportación plana: {type(model).__name__}")
+
+        n_classes = len(model.classes_)
+        features, thresholds, lefts, rights, values, missing, roots = [], [], [], [], [], [], []
+        offset, max_depth, has_missing = 0, 0, False
+        for estimator in estimators:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            nodes = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+
+            # Misma normalización que DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+
+            node_missing = getattr(tree, "missing_go_to_left", None)
+            if node_missing is not None:
+                has_missing = has_missing or bool(np.any(node_missing[~is_leaf]))
+                missing.append(np.asarray(node_missing, dtype=bool) & ~is_leaf)
+            else:
+                missing.append(np.zeros(n_nodes, dtype=bool))
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.int64),
+            right=np.concatenate(rights).astype(np.int64),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int64),
+            max_depth=int(max_depth),
+            classes=np.asarray(model.classes_),
+            missing_left=np.concatenate(missing) if has_missing else None,
+            feature_names=getattr(model, "feature_names_in_", None),
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def _as_matrix(self, features: Any) -> np.ndarray:
+        if hasattr(features, "columns") and self.feature_names is not None:
+            features = features[self.feature_names]
+        X = np.asarray(features, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return np.ascontiguousarray(X)
+
+    def __post_init__(self):
+        # Tabla de hijos intercalada: children[2 * nodo + va_a_la_derecha]
+        self._children = np.empty(2 * len(self.left), dtype=np.int64)
+        self._children[0::2] = self.left
+        self._children[1::2] = self.right
+        self._is_leaf = self.left == np.arange(len(self.left))
+
+    def save(self, filepath: str) -> None:
+        """
+        Guarda los arrays sin comprimir para poder cargarlos con `mmap_mode`.
+        Se escribe a un temporal y se renombra, así un lector nunca ve un
+        archivo a medias.
+        """
+        state = {f.name: getattr(self, f.name) for f in fields(self)}
+        state["_children"] = self._children
+        state["_is_leaf"] = self._is_leaf
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{filepath}.tmp{os.getpid()}"
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, filepath)
+
+    @classmethod
+    def load(cls, filepath: str, mmap_mode: Optional[str] = "r") -> 'FlatForest':
+        """
+        Carga un bosque guardado con `save`. Con `mmap_mode` los arrays se
+        proyectan en memoria y varios procesos comparten las mismas páginas.
+        """
+        state = joblib.load(filepath, mmap_mode=mmap_mode)
+        forest = cls.__new__(cls)
+        for name, value in state.items():
+            setattr(forest, name, value)
+        return forest
+
+    def apply(self, features: Any) -> np.ndarray:
+        """Nodo hoja alcanzado por cada fila en cada árbol (n_trees x n_samples)."""
+        X = self._as_matrix(features)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        nodes = np.repeat(self.roots, n_samples)
+        row_offsets = np.tile(np.arange(n_samples, dtype=np.int64) * n_features, self.n_trees)
+        check_missing = self.missing_left is not None and np.isnan(flat_X).any()
+
+        # Las hojas se apuntan a sí mismas, así que los pares que ya llegaron a
+        # una hoja pueden seguir avanzando sin cambiar; cada pocos niveles se
+        # descartan para no recorrerlos hasta max_depth.
+        active = np.arange(len(nodes))
+        current = nodes
+        offsets = row_offsets
+        depth = 0
+        while len(active):
+            x = flat_X[offsets + self.feature[current]]
+            go_right = ~(x <= self.threshold[current])
+            if check_missing:
+                go_right = np.where(np.isnan(x), ~self.missing_left[current], go_right)
+            current = self._children[2 * current + go_right]
+            depth += 1
+            if depth % self.COMPACT_EVERY == 0 or depth >= self.max_depth:
+                pending = ~self._is_leaf[current]
+                nodes[active] = current
+                active, current, offsets = active[pending], current[pending], offsets[pending]
+        return nodes.reshape(self.n_trees, n_samples)
+
+    def predict_proba(self, features: Any) -> np.ndarray:
+        """Probabilidades por clase, idénticas a las del modelo sklearn original."""
+        leaf_proba = self.value[self.apply(features)]
+        # cumsum acumula árbol a árbol en orden, igual que el bucle de sklearn
+        proba = np.cumsum(leaf_proba, axis=0)[-1]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, features: Any) -> np.ndarray:
+        """Clase con mayor probabilidad."""
+        return self.classes[np.argmax(self.predict_proba(features), axis=1)]
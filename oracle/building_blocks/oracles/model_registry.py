@@ -0,0 +1,139 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from oracle.building_blocks.oracles.flat_forest import FlatForest
+from oracle.building_blocks.oracles.oracle_engine import OracleEngine
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Registro en proceso de modelos del Oráculo con expulsión LRU.
+
+    Mantiene en memoria los `capacity` modelos usados más recientemente,
+    indexados por ruta. Si el archivo cambia en disco (otro mtime) se vuelve
+    a cargar en el siguiente `get`.
+
+    Los bosques de sklearn copian sus árboles al deserializarse, así que
+    `mmap_mode` no basta para compartirlos entre procesos. Por eso, al cargar
+    un bosque se guarda junto al modelo su versión compilada
+    (`<modelo>.flat`, ver `FlatForest`) y se proyecta en memoria con
+    `mmap_mode`: todos los procesos que puntúan con ella comparten las mismas
+    páginas del page cache. Si el `.flat` está al día solo se carga este; el
+    modelo de sklearn (memoria privada de cada proceso) se deserializa la
+    primera vez que un lote supera `OracleEngine.FLAT_MAX_ROWS` filas.
+    """
+
+    FLAT_SUFFIX = ".flat"
+
+    def __init__(
+        self,
+        capacity: int = 3,
+        mmap_mode: Optional[str] = "r",
+        compile_models: bool = True,
+        engine_kwargs: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            capacity: Número máximo de modelos en memoria.
+            mmap_mode: Modo de proyección en memoria (None = carga completa).
+            compile_models: Si es True, exporta/carga el bosque compilado.
+            engine_kwargs: Argumentos para `OracleEngine` (n_jobs, batch_size, memory).
+        """
+        if capacity < 1:
+            raise ValueError("capacity debe ser >= 1.")
+        self.capacity = capacity
+        self.mmap_mode = mmap_mode
+        self.compile_models = compile_models
+        self.engine_kwargs = dict(engine_kwargs or {})
+        self._entries: "OrderedDict[str, Tuple[int, OracleEngine]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, filepath: str) -> bool:
+        return os.path.abspath(filepath) in self._entries
+
+    def cached_paths(self) -> List[str]:
+        """Rutas en memoria, de la menos a la más recientemente usada."""
+        with self._lock:
+            return list(self._entries)
+
+    def _current_flat(self, filepath: str, model_mtime: int) -> Optional[FlatForest]:
+        """Bosque compilado guardado junto al modelo, si no es anterior a él."""
+        flat_path = filepath + self.FLAT_SUFFIX
+        try:
+            if os.stat(flat_path).st_mtime_ns < model_mtime:
+                return None
+            return FlatForest.load(flat_path, mmap_mode=self.mmap_mode)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, EOFError) as e:
+            logger.warning(f"No se pudo cargar el bosque compilado {flat_path} ({e}). Se vuelve a exportar.")
+            return None
+
+    def _load_flat(self, engine: OracleEngine, filepath: str, model_mtime: int) -> None:
+        flat_path = filepath + self.FLAT_SUFFIX
+        try:
+            if not os.path.exists(flat_path) or os.stat(flat_path).st_mtime_ns < model_mtime:
+                engine.export_flat().save(flat_path)
+                logger.info(f"Bosque compilado guardado en {flat_path}")
+            engine.flat_model = FlatForest.load(flat_path, mmap_mode=self.mmap_mode)
+        except TypeError:
+            logger.debug(f"El modelo {filepath} no es un bosque de árboles; se usa sin compilar.")
+        except OSError as e:
+            # Directorio de solo lectura: se compila en memoria sin compartir
+            logger.warning(f"No se pudo guardar el bosque compilado ({e}). Se compila en memoria.")
+            engine.compile()
+
+    def _load(self, filepath: str, mtime: int) -> OracleEngine:
+        flat = self._current_flat(filepath, mtime) if self.compile_models else None
+        if flat is not None:
+            # Solo el bosque compartido: sklearn se carga si un lote lo necesita
+            return OracleEngine.load(filepath, mmap_mode=self.mmap_mode, flat_model=flat, **self.engine_kwargs)
+        engine = OracleEngine.load(filepath, mmap_mode=self.mmap_mode, **self.engine_kwargs)
+        if self.compile_models:
+            self._load_flat(engine, filepath, mtime)
+        return engine
+
+    def get(self, filepath: str) -> OracleEngine:
+        """
+        Devuelve el motor del modelo en `filepath`, cargándolo si no está en
+        memoria o si el archivo cambió desde la última carga.
+        """
+        key = os.path.abspath(filepath)
+        if not os.path.exists(key):
+            raise FileNotFoundError(f"No se encontró el modelo en {filepath}")
+        mtime = os.stat(key).st_mtime_ns
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == mtime:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            engine = self._load(key, mtime)
+            self._entries[key] = (mtime, engine)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                evicted, _ = self._entries.popitem(last=False)
+                logger.info(f"Modelo expulsado del registro (LRU): {evicted}")
+            return engine
+
+    def evict(self, filepath: str) -> bool:
+        """Elimina un modelo del registro. Devuelve True si estaba cargado."""
+        with self._lock:
+            return self._entries.pop(os.path.abspath(filepath), None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
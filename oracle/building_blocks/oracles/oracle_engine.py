@@ -1,33 +1,286 @@
+import copy
 import joblib
 import logging
 import os
+import threading
+import time
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier
-from typing import Any, Optional
+from sklearn.tree._tree import Tree
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from oracle.building_blocks.oracles.flat_forest import FlatForest
 
 logger = logging.getLogger(__name__)
 
 class OracleEngine:
     """Motor del Oráculo basado en Machine Learning."""
 
-    def __init__(self, model: Optional[Any] = None):
+    DEFAULT_BATCH_SIZE = 50_000
+    # Lotes pequeños: el bosque compilado gana; en lotes de ~1000 filas sklearn
+    # vuelve a ser más rápido (scripts/benchmark_oracle_inference.py)
+    FLAT_MAX_ROWS = 256
+
+    def __init__(
+        self,
+        model: Optional[Any] = None,
+        n_jobs: int = -1,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        memory: Optional[Any] = None,
+        model_loader: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Args:
+            model: Modelo de scikit-learn. Por defecto un RandomForest.
+            n_jobs: Workers para entrenar y puntuar (-1 = todos los núcleos).
+            batch_size: Filas por bloque en inferencia; matrices mayores se
+                dividen en bloques que se puntúan en paralelo.
+            memory: `MemoryManager` opcional donde registrar los tiempos de
+                entrenamiento y predicción (`record_metric`).
+            model_loader: Carga diferida del modelo si `model` es None: se
+                llama la primera vez que se accede a `model`.
+        """
+        self.n_jobs = n_jobs
+        self.batch_size = max(int(batch_size), 1)
+        self.memory = memory
+        self.last_timings: Dict[str, float] = {}
+        self.flat_model: Optional[FlatForest] = None
+        self._model_lock = threading.Lock()
+        self._model_loader = model_loader if model is None else None
+        self._model: Optional[Any] = None
         if model is not None:
             self.model = model
-        else:
+        elif model_loader is None:
             self.model = RandomForestClassifier(n_estimators=100, random_state=42)
 
+    @property
+    def model(self) -> Any:
+        """Modelo de scikit-learn (se carga aquí si la carga es diferida)."""
+        if self._model is None and self._model_loader is not None:
+            with self._model_lock:
+                if self._model is None:
+                    model = self._model_loader()
+                    self._apply_n_jobs(model)
+                    self._model = model
+                    self._model_loader = None
+        return self._model
+
+    @model.setter
+    def model(self, model: Any) -> None:
+        self._apply_n_jobs(model)
+        self._model = model
+        self._model_loader = None
+
+    @property
+    def model_loaded(self) -> bool:
+        """False mientras el modelo de carga diferida no se haya deserializado."""
+        return self._model is not None
+
+    @classmethod
+    def from_config(cls, config: Any, model: Optional[Any] = None, memory: Optional[Any] = None) -> 'OracleEngine':
+        """Crea el motor con `Oracle.n_jobs`, `Oracle.batch_size` y `Oracle.n_estimators` del ConfigManager."""
+        if model is None:
+            model = RandomForestClassifier(n_estimators=config.get("Oracle.n_estimators", 100), random_state=42)
+        return cls(
+            model=model,
+            n_jobs=config.get("Oracle.n_jobs", -1),
+            batch_size=config.get("Oracle.batch_size", cls.DEFAULT_BATCH_SIZE),
+            memory=memory
+        )
+
+    def _apply_n_jobs(self, model: Any) -> None:
+        """Propaga n_jobs al modelo si lo admite (RandomForest, ExtraTrees, ...)."""
+        if hasattr(model, "n_jobs"):
+            model.n_jobs = self.n_jobs
+
+    def _record_timing(self, metric_name: str, seconds: float, n_samples: int) -> None:
+        self.last_timings[metric_name] = seconds
+        logger.debug(f"{metric_name}: {seconds:.4f}s ({n_samples} muestras)")
+        if self.memory is not None:
+            self.memory.record_metric(
+                component="Oracle",
+                metric_name=metric_name,
+                value=seconds,
+                metadata={"samples": n_samples, "n_jobs": self.n_jobs, "batch_size": self.batch_size}
+            )
+
     def train(self, features: Any, targets: Any):
         """Entrena el modelo con las características y etiquetas proporcionadas."""
         logger.info(f"Entrenando Oráculo con {len(features)} muestras...")
+        start = time.perf_counter()
         self.model.fit(features, targets)
+        self.flat_model = None
+        self._record_timing("fit_seconds", time.perf_counter() - start, len(features))
         logger.info("Entrenamiento completado.")
 
+    def train_incremental(
+        self,
+        features: Any,
+        targets: Any,
+        n_new_trees: int = 20,
+        max_trees: Optional[int] = None
+    ) -> int:
+        """
+        Añade al bosque `n_new_trees` árboles entrenados solo con los datos
+        nuevos (warm_start) y, si se supera `max_trees`, retira los más
+        antiguos. El coste depende de los datos nuevos, no del histórico.
+
+        Si a los datos nuevos les falta alguna clase del modelo, los árboles
+        nuevos se entrenan aparte y sus probabilidades se reordenan sobre
+        `classes_` (probabilidad 0 para las clases ausentes).
+
+        Si el modelo aún no está entrenado se hace un entrenamiento normal.
+
+        Args:
+            features: Features de los eventos nuevos.
+            targets: Etiquetas de los eventos nuevos.
+            n_new_trees: Árboles a añadir.
+            max_trees: Tope de árboles en el bosque (None = sin tope).
+
+        Returns:
+            Número de árboles añadidos (0 si se omite el reentrenamiento:
+            una clase que el modelo no conoce o `max_trees` menor que
+            `n_new_trees`).
+        """
+        estimators = getattr(self.model, "estimators_", None)
+        if estimators is None:
+            self.train(features, targets)
+            return len(getattr(self.model, "estimators_", []))
+        if not hasattr(self.model, "warm_start"):
+            raise TypeError(f"El modelo {type(self.model).__name__} no admite warm_start.")
+
+        # Los árboles nuevos no pueden predecir clases que el modelo no conoce
+        new_classes = np.unique(np.asarray(targets))
+        unknown = np.setdiff1d(new_classes, self.model.classes_)
+        if unknown.size:
+            logger.warning(
+                f"Los datos nuevos tienen clases {list(unknown)} que el modelo {list(self.model.classes_)} no conoce. "
+                "Se omite el reentrenamiento incremental."
+            )
+            return 0
+        # Con un tope menor que los árboles nuevos se retirarían árboles recién entrenados
+        if max_trees is not None and max_trees < n_new_trees:
+            logger.warning(
+                f"El tope de {max_trees} árboles no admite {n_new_trees} árboles nuevos. "
+                "Se omite el reentrenamiento incremental."
+            )
+            return 0
+
+        logger.info(f"Reentrenamiento incremental: +{n_new_trees} árboles con {len(features)} muestras nuevas...")
+        start = time.perf_counter()
+        if np.array_equal(new_classes, self.model.classes_):
+            self.model.warm_start = True
+            self.model.n_estimators = len(estimators) + n_new_trees
+            try:
+                self.model.fit(features, targets)
+            finally:
+                self.model.warm_start = False
+        else:
+            self._add_remapped_trees(features, targets, n_new_trees)
+
+        if max_trees is not None and len(self.model.estimators_) > max_trees:
+            retired = len(self.model.estimators_) - max_trees
+            self.model.estimators_ = self.model.estimators_[retired:]
+            self.model.n_estimators = max_trees
+            logger.info(f"Retirados los {retired} árboles más antiguos (tope {max_trees}).")
+
+        self.flat_model = None
+        self._record_timing("fit_incremental_seconds", time.perf_counter() - start, len(features))
+        return n_new_trees
+
+    def _add_remapped_trees(self, features: Any, targets: Any, n_new_trees: int) -> None:
+        """Entrena `n_new_trees` árboles con un subconjunto de las clases y los añade al bosque."""
+        extra = clone(self.model).set_params(n_estimators=n_new_trees, warm_start=False)
+        random_state = getattr(self.model, "random_state", None)
+        if isinstance(random_state, (int, np.integer)):
+            # Semillas distintas de las de los árboles existentes
+            extra.set_params(random_state=int(random_state) + len(self.model.estimators_))
+        extra.fit(features, targets)
+
+        # Los árboles de un bosque trabajan con las clases codificadas 0..n-1
+        n_classes = len(self.model.classes_)
+        columns = np.searchsorted(self.model.classes_, extra.classes_)
+        encoded = self.model.estimators_[0].classes_
+        for tree in extra.estimators_:
+            state = tree.tree_.__getstate__()
+            values = state["values"]
+            remapped = np.zeros(values.shape[:2] + (n_classes,), dtype=values.dtype)
+            remapped[:, :, columns] = values[:, :, :len(columns)]
+            state["values"] = remapped
+            tree.tree_ = Tree(tree.n_features_in_, np.array([n_classes], dtype=np.intp), 1)
+            tree.tree_.__setstate__(state)
+            tree.classes_ = encoded.copy()
+            tree.n_classes_ = n_classes
+        self.model.estimators_ = list(self.model.estimators_) + list(extra.estimators_)
+        self.model.n_estimators = len(self.model.estimators_)
+
+    def _sequential_model(self) -> Any:
+        """
+        Copia superficial del modelo sin paralelismo interno para puntuar por
+        bloques. Comparte los árboles y no modifica el modelo, que otros hilos
+        pueden estar usando (ver `ModelRegistry`).
+        """
+        if not hasattr(self.model, "n_jobs"):
+            return self.model
+        model = copy.copy(self.model)
+        model.n_jobs = 1
+        return model
+
+    def _score(self, method: str, features: Any) -> Any:
+        """
+        Aplica `method` del modelo sobre `features`, en bloques de
+        `batch_size` filas puntuados en paralelo si la matriz es grande.
+        """
+        start = time.perf_counter()
+        n_samples = len(features)
+        if n_samples <= self.batch_size or self.n_jobs == 1:
+            result = getattr(self.model, method)(features)
+        else:
+            bounds = range(0, n_samples, self.batch_size)
+            if hasattr(features, "iloc"):
+                chunks = [features.iloc[i:i + self.batch_size] for i in bounds]
+            else:
+                chunks = [features[i:i + self.batch_size] for i in bounds]
+            # Los árboles de sklearn liberan el GIL: hilos sin copiar la matriz
+            score = getattr(self._sequential_model(), method)
+            parts = joblib.Parallel(n_jobs=self.n_jobs, prefer="threads")(
+                joblib.delayed(score)(chunk) for chunk in chunks
+            )
+            result = np.concatenate(parts)
+
+        self._record_timing(f"{method}_seconds", time.perf_counter() - start, n_samples)
+        return result
+
+    def export_flat(self) -> FlatForest:
+        """Exporta el bosque entrenado a arrays planos de NumPy (ver `FlatForest`)."""
+        return FlatForest.from_sklearn(self.model)
+
+    def compile(self) -> FlatForest:
+        """
+        Exporta el bosque y lo usa en `predict`/`predict_proba` para lotes de
+        hasta `FLAT_MAX_ROWS` filas, evitando la validación y el despacho de
+        sklearn en cada llamada. Las probabilidades son idénticas.
+        """
+        self.flat_model = self.export_flat()
+        logger.info(f"Oráculo compilado: {self.flat_model.n_trees} árboles, {self.flat_model.n_nodes} nodos.")
+        return self.flat_model
+
+    def _use_flat(self, features: Any) -> bool:
+        return self.flat_model is not None and len(features) <= self.FLAT_MAX_ROWS
+
     def predict(self, features: Any) -> Any:
         """Realiza predicciones sobre nuevas características."""
-        return self.model.predict(features)
+        if self._use_flat(features):
+            return self.flat_model.predict(features)
+        return self._score("predict", features)
 
     def predict_proba(self, features: Any) -> Any:
         """Devuelve las probabilidades de cada clase."""
-        return self.model.predict_proba(features)
+        if self._use_flat(features):
+            return self.flat_model.predict_proba(features)
+        return self._score("predict_proba", features)
 
     def save(self, filepath: str):
         """Persiste el modelo en un archivo."""
@@ -36,10 +289,33 @@ class OracleEngine:
         logger.info(f"Modelo guardado en {filepath}")
 
     @classmethod
-    def load(cls, filepath: str) -> 'OracleEngine':
-        """Carga un modelo desde un archivo."""
+    def load(
+        cls,
+        filepath: str,
+        mmap_mode: Optional[str] = None,
+        flat_model: Optional[FlatForest] = None,
+        **kwargs
+    ) -> 'OracleEngine':
+        """
+        Carga un modelo desde un archivo (kwargs: n_jobs, batch_size, memory).
+
+        Args:
+            mmap_mode: Modo de `joblib.load` para proyectar en memoria los
+                arrays de NumPy del modelo (ej: 'r').
+            flat_model: Bosque compilado del mismo modelo. Si se indica, el
+                modelo de sklearn solo se deserializa cuando hace falta
+                (lotes de más de `FLAT_MAX_ROWS` filas o reentrenamiento).
+        """
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"No se encontró el modelo en {filepath}")
-        model = joblib.load(filepath)
-        logger.info(f"Modelo cargado desde {filepath}")
-        return cls(model=model)
+
+        def load_model() -> Any:
+            model = joblib.load(filepath, mmap_mode=mmap_mode)
+            logger.info(f"Modelo cargado desde {filepath}")
+            return model
+
+        if flat_model is None:
+            return cls(model=load_model(), **kwargs)
+        engine = cls(model_loader=load_model, **kwargs)
+        engine.flat_model = flat_model
+        return engine
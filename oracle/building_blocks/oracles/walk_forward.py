@@ -0,0 +1,239 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import (
+    accuracy_score, balanced_accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+)
+
+from oracle.building_blocks.oracles.oracle_engine import OracleEngine
+
+logger = logging.getLogger(__name__)
+
+Split = Tuple[np.ndarray, np.ndarray]
+
+
+# --- GENERADORES DE FOLDS ---
+
+def walk_forward_splits(
+    starts: Sequence,
+    ends: Sequence,
+    n_splits: int = 5,
+    max_train_size: Optional[int] = None
+) -> List[Split]:
+    """
+    Folds walk-forward: cada bloque de test se evalúa con un modelo entrenado
+    solo con muestras anteriores.
+
+    La serie se divide en n_splits + 1 bloques consecutivos y el bloque k
+    (k >= 1) es el test del fold k. Se purgan las muestras de train cuya
+    etiqueta termina dentro del test (ends >= inicio del test), que de otro
+    modo verían precios futuros.
+
+    Args:
+        starts: Inicio de cada muestra (timestamp o posición), ordenado.
+        ends: Fin de la ventana de etiquetado de cada muestra.
+        n_splits: Número de folds.
+        max_train_size: Si se indica, ventana móvil con como mucho ese número
+            de muestras de train (por defecto ventana expansiva).
+
+    Returns:
+        Lista de tuplas (train_idx, test_idx).
+    """
+    starts, ends = np.asarray(starts), np.asarray(ends)
+    blocks = np.array_split(np.arange(len(starts)), n_splits + 1)
+    splits = []
+    for test_idx in blocks[1:]:
+        if len(test_idx) == 0:
+            continue
+        candidates = np.arange(test_idx[0])
+        train_idx = candidates[ends[candidates] < starts[test_idx[0]]]
+        if max_train_size is not None:
+            train_idx = train_idx[-max_train_size:]
+        splits.append((train_idx, test_idx))
+    return splits
+
+
+def purged_kfold_splits(
+    starts: Sequence,
+    ends: Sequence,
+    n_splits: int = 5,
+    embargo: Any = 0
+) -> List[Split]:
+    """
+    K-fold purgado (López de Prado): los folds de test son bloques
+    consecutivos y de train se eliminan las muestras cuya ventana
+    [start, end] se solapa con la del test, más un embargo tras el test.
+
+    Args:
+        starts: Inicio de cada muestra (timestamp o posición), ordenado.
+        ends: Fin de la ventana de etiquetado de cada muestra.
+        n_splits: Número de folds.
+        embargo: Periodo tras el final del test excluido de train (mismas
+            unidades que `starts`: Timedelta o número de velas).
+
+    Returns:
+        Lista de tuplas (train_idx, test_idx).
+    """
+    starts, ends = np.asarray(starts), np.asarray(ends)
+    splits = []
+    for test_idx in np.array_split(np.arange(len(starts)), n_splits):
+        if len(test_idx) == 0:
+            continue
+        test_start, test_end = starts[test_idx[0]], ends[test_idx].max()
+        overlaps = (starts <= test_end) & (ends >= test_start)
+        embargoed = (starts > test_end) & (starts <= test_end + embargo)
+        train_mask = ~(overlaps | embargoed)
+        train_mask[test_idx] = False
+        splits.append((np.flatnonzero(train_mask), test_idx))
+    return splits
+
+
+# --- MEMORIA COMPARTIDA ---
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """Lo necesario para que otro proceso se adjunte a un array compartido."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def _share_array(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, SharedArraySpec]:
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, SharedArraySpec(shm.name, array.shape, array.dtype.str)
+
+
+# Arrays adjuntados en cada worker (una vez por proceso, ver _init_worker)
+_WORKER_ARRAYS: Dict[str, np.ndarray] = {}
+_WORKER_SEGMENTS: List[shared_memory.SharedMemory] = []
+
+
+def _init_worker(specs: Dict[str, SharedArraySpec]) -> None:
+    for key, spec in specs.items():
+        shm = shared_memory.SharedMemory(name=spec.name)
+        _WORKER_SEGMENTS.append(shm)
+        _WORKER_ARRAYS[key] = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf)
+
+
+# --- EVALUACIÓN DE UN FOLD ---
+
+def _fold_metrics(y_true: np.ndarray, y_pred: np.ndarray, proba: np.ndarray, classes: np.ndarray) -> Dict[str, float]:
+    metrics = {
+        'accuracy': accuracy_score(y_true, y_pred),
+        'balanced_accuracy': balanced_accuracy_score(y_true, y_pred),
+        'precision': precision_score(y_true, y_pred, average='macro', zero_division=0),
+        'recall': recall_score(y_true, y_pred, average='macro', zero_division=0),
+        'f1': f1_score(y_true, y_pred, average='macro', zero_division=0),
+    }
+    if len(classes) == 2 and len(np.unique(y_true)) == 2:
+        metrics['roc_auc'] = roc_auc_score(y_true, proba[:, 1])
+    return metrics
+
+
+def _run_fold(fold: int, train_idx: np.ndarray, test_idx: np.ndarray, estimator: Any,
+              X: Optional[np.ndarray] = None, y: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Entrena y evalúa un fold. En los workers X e y son vistas de la memoria compartida."""
+    if X is None:
+        X, y = _WORKER_ARRAYS['X'], _WORKER_ARRAYS['y']
+    start = time.perf_counter()
+    oracle = OracleEngine(model=clone(estimator), n_jobs=1)
+    oracle.train(X[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    proba = oracle.predict_proba(X[test_idx])
+    classes = oracle.model.classes_
+    y_pred = classes[np.argmax(proba, axis=1)]
+    result = {
+        'fold': fold,
+        'n_train': len(train_idx),
+        'n_test': len(test_idx),
+        'fit_seconds': fit_seconds,
+        'fold_seconds': time.perf_counter() - start,
+    }
+    result.update(_fold_metrics(y[test_idx], y_pred, proba, classes))
+    return result
+
+
+# --- RUNNER ---
+
+@dataclass
+class CrossValidationReport:
+    """Resultado de una validación: métricas por fold y tiempo total."""
+    folds: pd.DataFrame
+    wall_seconds: float
+
+    def summary(self) -> pd.Series:
+        """Media de cada métrica entre folds."""
+        return self.folds.drop(columns=['fold']).mean()
+
+
+class WalkForwardValidator:
+    """
+    Ejecuta validación walk-forward / k-fold purgado del Oráculo con los
+    folds en paralelo en un pool de procesos.
+
+    La matriz de features y las etiquetas se copian una sola vez a memoria
+    compartida; cada worker se adjunta al arrancar y trabaja sobre vistas sin
+    copiar, de modo que a cada fold solo se le envían sus índices.
+    """
+
+    def __init__(self, estimator: Optional[Any] = None, n_jobs: Optional[int] = None):
+        """
+        Args:
+            estimator: Modelo sklearn sin entrenar (se clona en cada fold).
+                Por defecto el RandomForest del Oráculo.
+            n_jobs: Procesos del pool (None = núcleos disponibles, 1 = secuencial).
+        """
+        self.estimator = estimator if estimator is not None else RandomForestClassifier(n_estimators=100, random_state=42)
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+
+    def run(self, features: Any, labels: Any, splits: Sequence[Split]) -> CrossValidationReport:
+        """
+        Evalúa el modelo en cada fold.
+
+        Args:
+            features: Matriz (DataFrame o array) de features, en orden temporal.
+            labels: Etiquetas de cada muestra.
+            splits: Folds (ver `walk_forward_splits` / `purged_kfold_splits`).
+
+        Returns:
+            CrossValidationReport con una fila de métricas por fold.
+        """
+        X = np.asarray(features, dtype=np.float64)
+        y = np.asarray(labels)
+        splits = [(np.asarray(tr), np.asarray(te)) for tr, te in splits if len(tr) and len(te)]
+        start = time.perf_counter()
+
+        workers = min(self.n_jobs, len(splits))
+        if workers <= 1:
+            results = [_run_fold(i, tr, te, self.estimator, X, y) for i, (tr, te) in enumerate(splits)]
+        else:
+            segments = []
+            try:
+                specs = {}
+                for key, array in (('X', X), ('y', y)):
+                    shm, specs[key] = _share_array(array)
+                    segments.append(shm)
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(specs,)) as pool:
+                    futures = [pool.submit(_run_fold, i, tr, te, self.estimator) for i, (tr, te) in enumerate(splits)]
+                    results = [f.result() for f in futures]
+            finally:
+                for shm in segments:
+                    shm.close()
+                    shm.unlink()
+
+        wall_seconds = time.perf_counter() - start
+        report = CrossValidationReport(pd.DataFrame(results), wall_seconds)
+        logger.info(f"Validación: {len(results)} folds en {wall_seconds:.2f}s ({workers} procesos)")
+        return report
@@ -0,0 +1,111 @@
+"""
+Oracle Manager - Modelo activo del Oráculo para el daemon de Aipha.
+
+El orquestador (`core/orchestrator_hardened.py`, arrancado por `life_cycle.py`)
+instancia `OracleManagerWithHealthCheck`. El gestor sigue `Oracle.model_path`
+en la configuración: cuando un entrenamiento escribe una ruta nueva, el
+siguiente acceso carga ese modelo desde el `ModelRegistry` y lo sustituye sin
+reiniciar el proceso.
+"""
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from core.config_manager import ConfigManager
+from oracle.building_blocks.oracles.model_registry import ModelRegistry
+from oracle.building_blocks.oracles.oracle_engine import OracleEngine
+
+logger = logging.getLogger(__name__)
+
+
+class OracleManagerWithHealthCheck:
+    """Mantiene el modelo activo del Oráculo y lo intercambia en caliente."""
+
+    def __init__(
+        self,
+        config: Optional[ConfigManager] = None,
+        registry: Optional[ModelRegistry] = None,
+        check_interval: float = 5.0
+    ):
+        """
+        Args:
+            config: ConfigManager del que se lee `Oracle.model_path`.
+            registry: Registro de modelos. Por defecto uno con
+                `Oracle.registry_capacity` modelos (3) y mmap.
+            check_interval: Segundos mínimos entre comprobaciones del archivo
+                de configuración (0 = comprobar en cada acceso).
+        """
+        self.config = config or ConfigManager()
+        self.registry = registry or ModelRegistry(
+            capacity=self.config.get("Oracle.registry_capacity", 3),
+            engine_kwargs={
+                "n_jobs": self.config.get("Oracle.n_jobs", -1),
+                "batch_size": self.config.get("Oracle.batch_size", OracleEngine.DEFAULT_BATCH_SIZE),
+            }
+        )
+        self.check_interval = check_interval
+        self.model_path: Optional[str] = None
+        self._engine: Optional[OracleEngine] = None
+        self._last_check = float("-inf")
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Relee la configuración y, si `Oracle.model_path` cambió (o el archivo
+        del modelo se reescribió), carga el nuevo modelo y lo activa.
+        Si la carga falla se mantiene el modelo anterior.
+
+        Returns:
+            True si se activó un modelo distinto.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+
+        with self._lock:
+            self._last_check = now
+            self.config.reload_if_changed()
+            path = self.config.get("Oracle.model_path")
+            if not path:
+                return False
+            try:
+                engine = self.registry.get(path)
+            except Exception as e:
+                logger.error(f"No se pudo cargar el modelo '{path}': {e}. Se mantiene el actual ({self.model_path}).")
+                return False
+
+            if engine is self._engine:
+                return False
+            previous = self.model_path
+            # Una sola asignación: los lectores ven el modelo anterior o el nuevo
+            self._engine, self.model_path = engine, path
+            if previous is not None:
+                logger.info(f"🔄 Modelo del Oráculo intercambiado en caliente: {previous} -> {path}")
+            else:
+                logger.info(f"Modelo del Oráculo activo: {path}")
+            return True
+
+    @property
+    def engine(self) -> Optional[OracleEngine]:
+        """Motor activo (comprueba antes si hay un modelo nuevo)."""
+        self.refresh()
+        return self._engine
+
+    def predict_proba(self, features: Any) -> Any:
+        engine = self.engine
+        if engine is None:
+            raise RuntimeError("No hay ningún modelo del Oráculo cargado.")
+        return engine.predict_proba(features)
+
+    def predict(self, features: Any) -> Any:
+        engine = self.engine
+        if engine is None:
+            raise RuntimeError("No hay ningún modelo del Oráculo cargado.")
+        return engine.predict(features)
+
+    def health_check(self) -> bool:
+        """True si hay un modelo cargado y utilizable."""
+        self.refresh(force=True)
+        return self._engine is not None
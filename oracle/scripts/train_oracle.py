@@ -1,5 +1,5 @@
 import pandas as pd
-import duckdb
+import numpy as np
 import logging
 import sys
 import os
@@ -8,15 +8,41 @@ from joblib import dump
 # Añadir el directorio raíz al path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from trading_manager.building_blocks.detectors.key_candle_detector import SignalDetector
-from trading_manager.building_blocks.labelers.potential_capture_engine import get_atr_labels
-from oracle.building_blocks.features.feature_engineer import FeatureEngineer
+from data_processor.data_system.storage import get_connection_manager
+from oracle.building_blocks.features.feature_store import FeatureStore, build_training_set
 from oracle.building_blocks.oracles.oracle_engine import OracleEngine
 from core.config_manager import ConfigManager
+from core.memory_manager import MemoryManager
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+def _detector_params(config: ConfigManager) -> dict:
+    return {
+        'volume_percentile_threshold': config.get("Trading.volume_percentile_threshold", 90),
+        'body_percentile_threshold': config.get("Trading.body_percentile_threshold", 25),
+        'reversal_mode': config.get("Trading.reversal_mode", True),
+    }
+
+
+def _label_params(config: ConfigManager) -> dict:
+    return {
+        'tp_factor': config.get("Trading.tp_factor", 1.5),
+        'sl_factor': config.get("Trading.sl_factor", 1.0),
+        'time_limit': config.get("Trading.time_limit", 24),
+    }
+
+
+def _dataset_from_store(config: ConfigManager, db_path: str, table_name: str):
+    """Lee features y labels del FeatureStore procesando solo las velas nuevas."""
+    store = FeatureStore(db_path, detector_params=_detector_params(config), label_params=_label_params(config))
+    symbol = config.get("Oracle.symbol", "BTCUSDT")
+    interval = config.get("Oracle.interval", "1h")
+    store.sync(table_name, symbol, interval)
+    dataset = store.load_training_set(symbol, interval)
+    return dataset[list(FeatureStore.FEATURE_COLUMNS)], dataset['label'].astype(int)
+
+
 def train_new_oracle():
     config = ConfigManager()
     db_path = "data_processor/data/aipha_data.duckdb"
@@ -28,42 +54,22 @@ def train_new_oracle():
     if not os.path.exists(db_path):
         logger.error("No se encontró la base de datos.")
         return
+    # Conexión compartida del proceso con los pragmas de la sección 'Data'
+    get_connection_manager(db_path, config)
 
-    conn = duckdb.connect(db_path)
-    df = conn.execute(f"SELECT * FROM {table_name}").df()
-    conn.close()
-    
-    df['Open_Time'] = pd.to_datetime(df['Open_Time'])
-    df = df.sort_values('Open_Time').set_index('Open_Time')
+    # 2-4. Dataset: desde el FeatureStore, salvo que se pidan características del registro
+    extra_features = config.get("Oracle.features")
+    if config.get("Oracle.use_feature_store", True) and not extra_features:
+        features, labels = _dataset_from_store(config, db_path, table_name)
+    else:
+        features, labels = build_training_set(
+            db_path, table_name, _detector_params(config), _label_params(config), extra_features,
+            cache_dir=config.get("Oracle.feature_cache_dir", "oracle/cache/features"), min_events=100
+        )
 
-    # 2. Generar Dataset (Usando la lógica de Reversión actual)
-    df = SignalDetector.detect_key_candles(
-        df, 
-        volume_percentile_threshold=config.get("Trading.volume_percentile_threshold", 90),
-        body_percentile_threshold=config.get("Trading.body_percentile_threshold", 25),
-        reversal_mode=config.get("Trading.reversal_mode", True)
-    )
-    
-    key_candles = df[df['is_key_candle']]
-    t_events = key_candles.index
-    sides = key_candles['signal_side']
-    
-    if len(t_events) < 100:
-        logger.warning(f"Dataset muy pequeño para entrenar: {len(t_events)} señales.")
+    if features is None or len(features) < 100:
+        logger.warning(f"Dataset muy pequeño para entrenar: {0 if features is None else len(features)} señales.")
         return
-
-    # 3. Obtener Labels (Ground Truth de Reversión)
-    labels = get_atr_labels(
-        df, 
-        t_events, 
-        sides=sides,
-        tp_factor=config.get("Trading.tp_factor", 1.5), 
-        sl_factor=config.get("Trading.sl_factor", 1.0), 
-        time_limit=config.get("Trading.time_limit", 24)
-    )
-    
-    # 4. Extraer Features
-    features = FeatureEngineer.extract_features(df, t_events)
     
     # 5. Entrenar Modelo
     # Usamos solo señales con label 1 (éxito) o -1 (fracaso) para entrenamiento binario
@@ -73,9 +79,7 @@ def train_new_oracle():
     
     logger.info(f"Entrenando con {len(X)} muestras (Éxitos: {y.sum()}, Fracasos: {len(y)-y.sum()})")
     
-    from sklearn.ensemble import RandomForestClassifier
-    rf_model = RandomForestClassifier(n_estimators=config.get("Oracle.n_estimators", 100), random_state=42)
-    oracle = OracleEngine(model=rf_model)
+    oracle = OracleEngine.from_config(config, memory=MemoryManager())
     oracle.train(X, y)
     
     # 6. Guardar Modelo (Auto-corrección: Nueva versión)
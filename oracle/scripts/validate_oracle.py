@@ -0,0 +1,98 @@
+"""
+Validación temporal del Oráculo (walk-forward o k-fold purgado).
+
+Usa el mismo dataset que `train_oracle.py` (FeatureStore) y evalúa el modelo
+configurado fold a fold, en paralelo, sin fuga de datos futuros.
+
+Uso:
+    python oracle/scripts/validate_oracle.py --mode walk-forward --splits 5
+    python oracle/scripts/validate_oracle.py --mode purged --splits 8 --embargo 24 --jobs 4
+"""
+import argparse
+import logging
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sklearn.ensemble import RandomForestClassifier
+from oracle.building_blocks.features.feature_store import FeatureStore
+from oracle.building_blocks.oracles.walk_forward import WalkForwardValidator, purged_kfold_splits, walk_forward_splits
+from core.config_manager import ConfigManager
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def validate_oracle(mode: str, n_splits: int, n_jobs: int, embargo_bars: int):
+    config = ConfigManager()
+    db_path = "data_processor/data/aipha_data.duckdb"
+    table_name = "btc_1h_data"
+    symbol = config.get("Oracle.symbol", "BTCUSDT")
+    interval = config.get("Oracle.interval", "1h")
+    time_limit = config.get("Trading.time_limit", 24)
+
+    if not os.path.exists(db_path):
+        logger.error("No se encontró la base de datos.")
+        return None
+
+    # Mismo dataset que train_oracle.py
+    store = FeatureStore(
+        db_path,
+        detector_params={
+            'volume_percentile_threshold': config.get("Trading.volume_percentile_threshold", 90),
+            'body_percentile_threshold': config.get("Trading.body_percentile_threshold", 25),
+            'reversal_mode': config.get("Trading.reversal_mode", True),
+        },
+        label_params={
+            'tp_factor': config.get("Trading.tp_factor", 1.5),
+            'sl_factor': config.get("Trading.sl_factor", 1.0),
+            'time_limit': time_limit,
+        }
+    )
+    store.sync(table_name, symbol, interval)
+    dataset = store.load_training_set(symbol, interval)
+    dataset = dataset[dataset['label'] != 0]
+    if len(dataset) < 100:
+        logger.warning(f"Dataset muy pequeño para validar: {len(dataset)} señales.")
+        return None
+
+    X = dataset[list(FeatureStore.FEATURE_COLUMNS)]
+    y = (dataset['label'] == 1).astype(int)
+
+    # Cada etiqueta depende de las `time_limit` velas siguientes al evento
+    bar = pd.Timedelta(interval)
+    starts = dataset.index.to_numpy()
+    ends = (dataset.index + bar * time_limit).to_numpy()
+    if mode == "purged":
+        splits = purged_kfold_splits(starts, ends, n_splits=n_splits, embargo=np.timedelta64(bar * embargo_bars))
+    else:
+        splits = walk_forward_splits(starts, ends, n_splits=n_splits)
+
+    estimator = RandomForestClassifier(n_estimators=config.get("Oracle.n_estimators", 100), random_state=42)
+    report = WalkForwardValidator(estimator, n_jobs=n_jobs).run(X, y, splits)
+
+    pd.set_option('display.width', 160)
+    print(report.folds.round(4).to_string(index=False))
+    print("\nMedia por fold:")
+    print(report.summary().round(4).to_string())
+    print(f"\nTiempo total: {report.wall_seconds:.2f}s")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["walk-forward", "purged"], default="walk-forward")
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=None, help="Procesos (por defecto todos los núcleos)")
+    parser.add_argument("--embargo", type=int, default=0, help="Velas de embargo tras cada fold de test (purged)")
+    args = parser.parse_args()
+    validate_oracle(args.mode, args.splits, args.jobs, args.embargo)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,100 @@
 import pandas as pd
-import duckdb
+import numpy as np
+import json
 import logging
 import sys
 import os
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
+from typing import Optional
 
 # Añadir el directorio raíz al path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from trading_manager.building_blocks.detectors.key_candle_detector import SignalDetector
-from trading_manager.building_blocks.labelers.potential_capture_engine import get_atr_labels
-from oracle.building_blocks.features.feature_engineer import FeatureEngineer
+from data_processor.data_system.storage import get_connection_manager
+from oracle.building_blocks.features.feature_store import FeatureStore, build_training_set
 from oracle.building_blocks.oracles.oracle_engine import OracleEngine
+from core.config_manager import ConfigManager
+from core.memory_manager import MemoryManager
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# Detección y etiquetado del oráculo de prueba (FeatureStore y recálculo completo)
+DETECTOR_PARAMS = {'volume_percentile_threshold': 80}
+LABEL_PARAMS = {'tp_factor': 2.0, 'sl_factor': 1.0, 'time_limit': 24, 'use_sides': False}
+
+# Eventos con los que se ha entrenado el modelo, junto al modelo
+TRAINED_EVENTS_SUFFIX = ".events.json"
+
+
+def _load_trained_events(model_path: str) -> Optional[pd.DatetimeIndex]:
+    path = model_path + TRAINED_EVENTS_SUFFIX
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return pd.DatetimeIndex(json.load(f))
+
+
+def _save_trained_events(config: ConfigManager, model_path: str, events: pd.Index) -> None:
+    """Guarda los eventos entrenados (escritura atómica) y el último en 'Oracle.trained_until'."""
+    path = model_path + TRAINED_EVENTS_SUFFIX
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    events = pd.DatetimeIndex(events).unique().sort_values()
+    with open(tmp_path, "w") as f:
+        json.dump([ts.isoformat() for ts in events], f)
+    os.replace(tmp_path, path)
+    config.set("Oracle.trained_until", events.max().isoformat() if len(events) else None)
+
+
+def _train_incremental(config: ConfigManager, X: pd.DataFrame, y: pd.Series, model_path: str) -> bool:
+    """Añade árboles con los eventos resueltos que el modelo aún no ha visto.
+
+    Los eventos entrenados se guardan junto al modelo (`<modelo>.events.json`):
+    los que estaban pendientes en la ejecución anterior entran ahora aunque
+    sean anteriores a otros ya entrenados, y ninguno se entrena dos veces.
+
+    Devuelve False si hay que reentrenar desde cero: sin modelo o eventos
+    previos, con otras características, o si el modelo no admite los
+    eventos nuevos (no se guarda el modelo ni los eventos).
+    """
+    trained = _load_trained_events(model_path)
+    if trained is None or not os.path.exists(model_path):
+        return False
+    new_rows = ~X.index.isin(trained)
+    if not new_rows.any():
+        logger.info("No hay eventos nuevos desde el último entrenamiento.")
+        return True
+    oracle = OracleEngine.load(
+        model_path,
+        n_jobs=config.get("Oracle.n_jobs", -1),
+        batch_size=config.get("Oracle.batch_size", OracleEngine.DEFAULT_BATCH_SIZE),
+        memory=MemoryManager()
+    )
+    trained_columns = list(getattr(oracle.model, "feature_names_in_", X.columns))
+    if trained_columns != list(X.columns):
+        logger.warning("El modelo previo usa otras características; se reentrena el modelo completo.")
+        return False
+    # El modelo previo no ha visto estos eventos: evaluación fuera de muestra
+    logger.info(f"--- EVALUACIÓN DEL MODELO PREVIO SOBRE {new_rows.sum()} EVENTOS NUEVOS ---")
+    print(f"Accuracy: {accuracy_score(y[new_rows], oracle.predict(X[new_rows])):.2f}")
+    added = oracle.train_incremental(
+        X[new_rows], y[new_rows],
+        n_new_trees=config.get("Oracle.incremental_trees", 20),
+        max_trees=config.get("Oracle.max_trees", 500)
+    )
+    if added == 0:
+        logger.warning("Reentrenamiento incremental omitido; se reentrena el modelo completo.")
+        return False
+    oracle.save(model_path)
+    _save_trained_events(config, model_path, trained.append(X.index[new_rows]))
+    logger.info("Reentrenamiento incremental completado.")
+    return True
+
+
 def train_oracle():
+    config = ConfigManager()
     db_path = "data_processor/data/aipha_data.duckdb"
     table_name = "btc_1h_data"
     model_path = "oracle/models/proof_oracle.joblib"
@@ -29,27 +105,33 @@ def train_oracle():
     if not os.path.exists(db_path):
         logger.error(f"Base de datos no encontrada en {db_path}")
         return
+    # Conexión compartida del proceso con los pragmas de la sección 'Data'
+    get_connection_manager(db_path, config)
 
-    conn = duckdb.connect(db_path)
-    df = conn.execute(f"SELECT * FROM {table_name}").df()
-    conn.close()
-    
-    df['Open_Time'] = pd.to_datetime(df['Open_Time'])
-    df = df.sort_values('Open_Time').set_index('Open_Time')
-    
-    # 2. Detección de Señales (Layer 3)
-    df = SignalDetector.detect_key_candles(df, volume_percentile_threshold=80)
-    t_events = df[df['is_key_candle']].index
-    
-    if len(t_events) < 10:
-        logger.error("Insuficientes eventos para entrenar.")
-        return
-
-    # 3. Etiquetado (Layer 3)
-    labels = get_atr_labels(df, t_events, tp_factor=2.0, sl_factor=1.0, time_limit=24)
-    
-    # 4. Extracción de Features (Layer 4)
-    features = FeatureEngineer.extract_features(df, t_events)
+    # Solo el FeatureStore excluye los eventos pendientes (reentrenamiento incremental)
+    from_store = False
+    extra_features = config.get("Oracle.features")
+    if config.get("Oracle.use_feature_store", True) and not extra_features:
+        # 2-4. Señales, etiquetas y features desde el FeatureStore (solo velas nuevas)
+        store = FeatureStore(db_path, detector_params=DETECTOR_PARAMS, label_params=LABEL_PARAMS)
+        symbol = config.get("Oracle.symbol", "BTCUSDT")
+        interval = config.get("Oracle.interval", "1h")
+        store.sync(table_name, symbol, interval)
+        dataset = store.load_training_set(symbol, interval)
+        if len(dataset) < 10:
+            logger.error("Insuficientes eventos para entrenar.")
+            return
+        from_store = True
+        features = dataset[list(FeatureStore.FEATURE_COLUMNS)]
+        labels = dataset['label'].astype(int)
+    else:
+        features, labels = build_training_set(
+            db_path, table_name, DETECTOR_PARAMS, LABEL_PARAMS, extra_features,
+            cache_dir=config.get("Oracle.feature_cache_dir", "oracle/cache/features")
+        )
+        if features is None:
+            logger.error("Insuficientes eventos para entrenar.")
+            return
     
     # Unir features y labels
     data = features.copy()
@@ -64,11 +146,16 @@ def train_oracle():
 
     X = data.drop(columns=['target'])
     y = data['target']
+
+    # 5b. Reentrenamiento incremental: solo eventos resueltos desde el último entrenamiento
+    if config.get("Oracle.incremental", False) and from_store:
+        if _train_incremental(config, X, y, model_path):
+            return
     
     # 5. Split y Entrenamiento
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
-    oracle = OracleEngine()
+    oracle = OracleEngine.from_config(config, memory=MemoryManager())
     oracle.train(X_train, y_train)
     
     # 6. Evaluación
@@ -79,6 +166,7 @@ def train_oracle():
     
     # 7. Guardado
     oracle.save(model_path)
+    _save_trained_events(config, model_path, X_train.index)
     logger.info("Proceso de entrenamiento completado.")
 
 if __name__ == "__main__":
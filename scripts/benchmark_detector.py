@@ -0,0 +1,100 @@
+"""
+Benchmark del detector de velas clave (SignalDetector).
+Compara el percentil móvil de volumen original (rolling.apply + np.percentile)
+con el kernel de ventana ordenada `rolling_percentile` sobre velas sintéticas,
+y mide el pico de RSS de detect_key_candles frente al modo compacto.
+
+Uso:
+    python scripts/benchmark_detector.py --bars 1000000
+    python scripts/benchmark_detector.py --memory --bars 5000000
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import os
+import time
+
+import numpy as np
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.benchmark_labeling import make_synthetic_klines
+from trading_manager.building_blocks.detectors.key_candle_detector import SignalDetector
+from trading_manager.building_blocks.detectors.rolling_quantile import rolling_percentile
+
+
+def bench_rolling_percentile(volume, window: int, q: float, legacy: bool):
+    """Devuelve (segundos_legacy, segundos_kernel) y verifica que coinciden."""
+    start = time.perf_counter()
+    kernel = rolling_percentile(volume.to_numpy(), window, q)
+    kernel_elapsed = time.perf_counter() - start
+
+    legacy_elapsed = None
+    if legacy:
+        start = time.perf_counter()
+        expected = volume.rolling(window=window).apply(lambda x: np.percentile(x, q)).to_numpy()
+        legacy_elapsed = time.perf_counter() - start
+        if not np.array_equal(expected, kernel, equal_nan=True):
+            raise AssertionError("rolling_percentile no coincide con rolling.apply(np.percentile)")
+    return legacy_elapsed, kernel_elapsed
+
+
+def _peak_rss_mb() -> float:
+    """Pico de RSS del proceso actual en MB (ru_maxrss está en KB en Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_memory_child(mode: str, n_bars: int):
+    """Ejecuta una sola detección y muestra el pico de RSS antes y después."""
+    prices = make_synthetic_klines(n_bars)
+    before = _peak_rss_mb()
+    if mode == "inplace":
+        SignalDetector.detect_key_candles(prices)
+    elif mode == "compact":
+        SignalDetector.detect_key_candles_compact(prices)
+    else:
+        SignalDetector.detect_key_candles_compact(prices, return_indicators=True)
+    print(f"{before:.1f} {_peak_rss_mb():.1f}")
+
+
+def bench_memory(n_bars: int):
+    """Mide cada modo en un proceso nuevo para que el pico de RSS sea independiente."""
+    for mode in ("inplace", "compact", "compact+indicators"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--memory-child", mode, "--bars", str(n_bars)],
+            check=True, capture_output=True, text=True
+        ).stdout.split()
+        before, after = float(output[-2]), float(output[-1])
+        print(f"{mode:>20}: pico RSS {after:,.1f} MB (datos {before:,.1f} MB, +{after - before:,.1f} MB detección)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=1_000_000)
+    parser.add_argument("--window", type=int, default=50)
+    parser.add_argument("--q", type=float, default=80)
+    parser.add_argument("--skip-legacy", action="store_true", help="No medir la implementación original")
+    parser.add_argument("--memory", action="store_true", help="Medir el pico de RSS de cada modo de salida")
+    parser.add_argument("--memory-child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.memory_child:
+        run_memory_child(args.memory_child, args.bars)
+        return
+    if args.memory:
+        bench_memory(args.bars)
+        return
+
+    prices = make_synthetic_klines(args.bars)
+    legacy, kernel = bench_rolling_percentile(prices["Volume"], args.window, args.q, not args.skip_legacy)
+
+    print(f"rolling_percentile: {args.bars} velas, ventana={args.window} -> {kernel:.3f}s "
+          f"({args.bars / kernel:,.0f} velas/seg)")
+    if legacy is not None:
+        print(f"rolling.apply(np.percentile): {legacy:.3f}s -> aceleración {legacy / kernel:.1f}x (resultados idénticos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark del parseo de los CSV de klines de Binance Vision.
+Genera un mes de archivos diarios de 1m (1440 filas por día) y compara el
+parseo tolerante original (inferencia + conversiones columna a columna) con
+el parseo tipado usando los motores 'c' y 'pyarrow'. Muestra tiempo total y
+pico de memoria (tracemalloc) por parser.
+
+Uso:
+    python scripts/benchmark_klines_parse.py
+    python scripts/benchmark_klines_parse.py --days 31 --repeat 5
+"""
+import argparse
+import io
+import sys
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_processor.data_system.fetcher import PYARROW_AVAILABLE, BinanceKlinesFetcher
+
+
+def make_day_csv(day_index: int, rows: int = 1440, seed: int = 42) -> bytes:
+    """CSV sintético de un día de velas de 1m con el formato de Binance Vision."""
+    rng = np.random.default_rng(seed + day_index)
+    open_time = 1_704_067_200_000 + day_index * 86_400_000 + np.arange(rows, dtype=np.int64) * 60_000
+    close = 42_000 + np.cumsum(rng.normal(0, 5, rows))
+    frame = pd.DataFrame({
+        "open_time": open_time,
+        "open": np.round(close + rng.normal(0, 2, rows), 2),
+        "high": np.round(close + 10, 2),
+        "low": np.round(close - 10, 2),
+        "close": np.round(close, 2),
+        "volume": np.round(rng.uniform(1, 50, rows), 5),
+        "close_time": open_time + 59_999,
+        "quote": np.round(rng.uniform(1e4, 2e6, rows), 5),
+        "trades": rng.integers(100, 5000, rows),
+        "taker_base": np.round(rng.uniform(0, 25, rows), 5),
+        "taker_quote": np.round(rng.uniform(0, 1e6, rows), 5),
+        "ignore": 0,
+    })
+    return frame.to_csv(header=False, index=False).encode()
+
+
+def measure(parse, files, repeat: int):
+    """Devuelve (mejor tiempo en s, pico de memoria en MB) de parsear todos los archivos."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = [parse(io.BytesIO(raw)) for raw in files]
+        pd.concat(frames, ignore_index=True)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    frames = [parse(io.BytesIO(raw)) for raw in files]
+    pd.concat(frames, ignore_index=True)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    files = [make_day_csv(i) for i in range(args.days)]
+    total_mb = sum(len(raw) for raw in files) / 1e6
+    print(f"{args.days} archivos diarios de 1m, {args.days * 1440} filas, {total_mb:.1f} MB de CSV")
+
+    parsers = {
+        "tolerante (original)": BinanceKlinesFetcher._parse_klines_dataframe_tolerant,
+        "tipado c": lambda f: BinanceKlinesFetcher._parse_klines_dataframe_from_file(f, engine="c"),
+        "tipado c float32": lambda f: BinanceKlinesFetcher._parse_klines_dataframe_from_file(
+            f, engine="c", price_dtype="float32"
+        ),
+    }
+    if PYARROW_AVAILABLE:
+        parsers["tipado pyarrow"] = lambda f: BinanceKlinesFetcher._parse_klines_dataframe_from_file(f, engine="pyarrow")
+
+    baseline = None
+    for name, parse in parsers.items():
+        seconds, peak_mb = measure(parse, files, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:<22} {seconds * 1000:8.1f} ms  {total_mb / seconds:7.1f} MB/s  "
+              f"pico {peak_mb:7.1f} MB  x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark de carga de velas desde DuckDB.
+Crea una tabla de varios años de velas de 1m y compara la carga original de
+los scripts (`SELECT *` + `pd.to_datetime` + `sort_values` en pandas) con
+`load_klines` (rango, proyección y ORDER BY en DuckDB, transferencia vía
+Arrow) para el histórico completo y para un mes, y el coste de abrir el
+archivo en cada consulta frente a la conexión compartida del proceso.
+Muestra tiempo y pico de memoria (tracemalloc) de cada variante.
+
+Uso:
+    python scripts/benchmark_market_data_loader.py
+    python scripts/benchmark_market_data_loader.py --years 3
+"""
+import argparse
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_processor.data_system.market_data import OHLCV_COLUMNS, load_klines
+from data_processor.data_system.storage import get_connection_manager
+
+
+def create_table(db_path: str, years: int, seed: int = 42) -> int:
+    """Tabla sintética con el esquema de Binance (12 columnas) de `years` años de velas de 1m."""
+    rng = np.random.default_rng(seed)
+    open_time = pd.date_range("2021-01-01", periods=years * 365 * 1440, freq="min")
+    n = len(open_time)
+    close = 30_000 + np.cumsum(rng.normal(0, 5, n))
+    df = pd.DataFrame({
+        "Open_Time": open_time, "Open": close, "High": close + 10, "Low": close - 10, "Close": close,
+        "Volume": rng.uniform(1, 50, n), "Close_Time": open_time + pd.Timedelta(seconds=59.999),
+        "Quote_Asset_Volume": rng.uniform(1e4, 2e6, n), "Number_of_Trades": rng.integers(100, 5000, n),
+        "Taker_Buy_Base_Asset_Volume": rng.uniform(0, 25, n), "Taker_Buy_Quote_Asset_Volume": rng.uniform(0, 1e6, n),
+    })
+    with duckdb.connect(db_path) as conn:
+        conn.execute("CREATE TABLE btc_1m_data AS SELECT * FROM df")
+    return n
+
+
+def legacy_load(db_path: str, table_name: str) -> pd.DataFrame:
+    conn = duckdb.connect(db_path)
+    df = conn.execute(f"SELECT * FROM {table_name}").df()
+    conn.close()
+    df['Open_Time'] = pd.to_datetime(df['Open_Time'])
+    return df.sort_values('Open_Time').set_index('Open_Time')
+
+
+def measure(load):
+    start = time.perf_counter()
+    df = load()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1e6, len(df)
+
+
+def report(name: str, load) -> None:
+    seconds, peak_mb, rows = measure(load)
+    print(f"{name:<42} {seconds * 1000:9.1f} ms  pico {peak_mb:8.1f} MB  {rows:>10,} filas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.duckdb")
+        n = create_table(db_path, args.years)
+        print(f"Tabla de {n:,} velas de 1m ({args.years} años)")
+
+        variants = {
+            "SELECT * + sort (original)": lambda: legacy_load(db_path, "btc_1m_data"),
+            "load_klines OHLCV completo": lambda: load_klines(db_path, "btc_1m_data", columns=OHLCV_COLUMNS),
+            "load_klines OHLCV un mes": lambda: load_klines(
+                db_path, "btc_1m_data", columns=OHLCV_COLUMNS, start="2022-03-01", end="2022-04-01"
+            ),
+        }
+        for name, load in variants.items():
+            report(name, load)
+
+        # Misma consulta cerrando la conexión compartida antes de cada carga (apertura por consulta)
+        manager = get_connection_manager(db_path)
+
+        def reopen_and_load():
+            manager.close()
+            return load_klines(db_path, "btc_1m_data", columns=OHLCV_COLUMNS, start="2022-03-01", end="2022-04-01")
+
+        report("load_klines un mes, apertura por consulta", reopen_and_load)
+        manager.close()
+
+if __name__ == "__main__":
+    main()
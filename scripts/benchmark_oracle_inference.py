@@ -0,0 +1,134 @@
+"""
+Benchmark de latencia de inferencia del Oráculo.
+Compara `predict_proba` de sklearn con el bosque compilado (FlatForest) para
+lotes de 1, 16 y 1024 filas y muestra las latencias p50/p99 por llamada.
+Después carga el modelo desde `ModelRegistry` en varios procesos a la vez y
+muestra, por proceso, cuánta memoria del `.flat` proyectado es compartida
+(/proc/self/smaps, solo Linux) y si se llegó a deserializar sklearn.
+
+Uso:
+    python scripts/benchmark_oracle_inference.py
+    python scripts/benchmark_oracle_inference.py --trees 300 --calls 500
+"""
+import argparse
+import multiprocessing
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.ensemble import RandomForestClassifier
+from oracle.building_blocks.oracles.model_registry import ModelRegistry
+from oracle.building_blocks.oracles.oracle_engine import OracleEngine
+
+
+def make_training_set(n_samples: int, n_features: int, seed: int = 42):
+    """Dataset sintético con la forma de las features del Oráculo."""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n_samples, n_features)), columns=[f"f{i}" for i in range(n_features)])
+    noise = rng.normal(0, 1.0, n_samples)
+    y = ((X.iloc[:, 0] + 0.5 * X.iloc[:, 1] * X.iloc[:, 2] + noise) > 0).astype(int)
+    return X, y
+
+
+def latency_percentiles(score, batch: pd.DataFrame, calls: int):
+    """Devuelve (p50, p99) en microsegundos de `calls` llamadas a `score(batch)`."""
+    score(batch)  # Calentamiento
+    samples = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        score(batch)
+        samples[i] = time.perf_counter() - start
+    p50, p99 = np.percentile(samples, [50, 99]) * 1e6
+    return p50, p99
+
+
+def mapped_memory_kb(path: str):
+    """(Rss, Shared) en kB de las proyecciones de `path` en este proceso."""
+    rss = shared = 0
+    in_path = False
+    with open("/proc/self/smaps") as smaps:
+        for line in smaps:
+            fields = line.split()
+            if "-" in fields[0] and not fields[0].endswith(":"):
+                in_path = fields[-1] == path
+            elif in_path and fields[0] == "Rss:":
+                rss += int(fields[1])
+            elif in_path and fields[0] in ("Shared_Clean:", "Shared_Dirty:"):
+                shared += int(fields[1])
+    return rss, shared
+
+
+def score_from_registry(model_path: str, batch: np.ndarray, barrier, results) -> None:
+    """Proceso de inferencia: carga desde el registro y puntúa lotes pequeños."""
+    engine = ModelRegistry(engine_kwargs={"n_jobs": 1}).get(model_path)
+    engine.predict_proba(batch)
+    # Todos los procesos tienen el bosque proyectado antes de medir
+    barrier.wait()
+    rss, shared = mapped_memory_kb(os.path.realpath(model_path + ModelRegistry.FLAT_SUFFIX))
+    results.put((os.getpid(), rss, shared, engine.model_loaded))
+    barrier.wait()
+
+
+def shared_pages_report(oracle: OracleEngine, batch: np.ndarray, processes: int) -> None:
+    if not os.path.exists("/proc/self/smaps"):
+        print("Memoria compartida: /proc/self/smaps no disponible, se omite.")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, "oracle.joblib")
+        oracle.save(model_path)
+        ModelRegistry().get(model_path)  # Exporta el .flat una vez
+        flat_kb = os.path.getsize(model_path + ModelRegistry.FLAT_SUFFIX) // 1024
+
+        ctx = multiprocessing.get_context("spawn")
+        barrier, results = ctx.Barrier(processes), ctx.Queue()
+        workers = [
+            ctx.Process(target=score_from_registry, args=(model_path, batch, barrier, results))
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        rows = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+    print(f"Memoria del .flat ({flat_kb} kB en disco) en {processes} procesos:")
+    for pid, rss, shared, loaded in rows:
+        print(f"  pid={pid}  rss={rss:7d} kB  compartida={shared:7d} kB  sklearn cargado={loaded}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--features", type=int, default=4)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--n-jobs", type=int, default=1, help="n_jobs del modelo sklearn al puntuar")
+    parser.add_argument("--processes", type=int, default=3, help="Procesos para medir la memoria compartida")
+    args = parser.parse_args()
+
+    X, y = make_training_set(args.samples, args.features)
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=args.trees, random_state=42), n_jobs=args.n_jobs)
+    oracle.train(X, y)
+    flat = oracle.export_flat()
+    print(f"Bosque: {flat.n_trees} árboles, {flat.n_nodes} nodos, profundidad {flat.max_depth}")
+
+    for batch_size in (1, 16, 1024):
+        batch = X.iloc[:batch_size]
+        assert np.array_equal(flat.predict_proba(batch), oracle.model.predict_proba(batch)) or args.n_jobs != 1
+        sk_p50, sk_p99 = latency_percentiles(oracle.model.predict_proba, batch, args.calls)
+        fl_p50, fl_p99 = latency_percentiles(flat.predict_proba, batch, args.calls)
+        print(f"batch={batch_size:>5}  sklearn p50={sk_p50:9.1f}us p99={sk_p99:9.1f}us | "
+              f"flat p50={fl_p50:9.1f}us p99={fl_p99:9.1f}us | speedup p50 x{sk_p50 / fl_p50:.1f}")
+
+    shared_pages_report(oracle, X.iloc[:16].to_numpy(), args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Tests para los validadores de configuración."""
+
+import sys
+import os
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.config_manager import ConfigManager
+from core.config_validators import ConfigValidator
+
+
+def test_default_config_declares_every_oracle_key(tmp_path):
+    config = ConfigManager(tmp_path / "config.json")
+    is_valid, errors = ConfigValidator.validate_full_config(config._config)
+    assert is_valid, errors
+    for key, value in config._config["Oracle"].items():
+        assert key in ConfigValidator.RANGE_DEFINITIONS["Oracle"]
+        if value is not None:
+            assert ConfigValidator.validate_parameter("Oracle", key, value) == (True, "")
+
+
+def test_oracle_feature_settings():
+    features = {"volatility": {"window": 72}, "returns": {}}
+    assert ConfigValidator.validate_full_config({"Oracle": {"features": features}})[0]
+    assert ConfigValidator.validate_parameter("Oracle", "features", ["returns"])[0]
+    assert not ConfigValidator.validate_parameter("Oracle", "features", "returns")[0]
+    assert not ConfigValidator.validate_parameter("Oracle", "use_feature_store", "yes")[0]
+    assert not ConfigValidator.validate_full_config({"Oracle": {"symbol": ""}})[0]
+
+
+def test_n_jobs_rejects_zero():
+    for n_jobs in (-1, 1, 8):
+        assert ConfigValidator.validate_full_config({"Oracle": {"n_jobs": n_jobs}})[0]
+        assert ConfigValidator.validate_parameter("Oracle", "n_jobs", n_jobs)[0]
+    is_valid, errors = ConfigValidator.validate_full_config({"Oracle": {"n_jobs": 0}})
+    assert not is_valid and errors[0].startswith("Oracle.n_jobs")
+    assert not ConfigValidator.validate_parameter("Oracle", "n_jobs", 0)[0]
+    assert not ConfigValidator.validate_parameter("Oracle", "n_jobs", -2)[0]
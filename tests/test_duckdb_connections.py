@@ -0,0 +1,201 @@
+"""Tests para el gestor de conexiones DuckDB compartidas por proceso."""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_processor.data_system import (
+    DuckDBConnectionManager, get_connection_manager, load_klines, upsert_klines_to_duckdb
+)
+from data_processor.data_system.storage import get_duckdb_connection
+
+OTHER_PROCESS_WRITE = """
+import duckdb, sys
+conn = duckdb.connect(sys.argv[1])
+conn.execute("INSERT INTO btc_1h_data SELECT * FROM btc_1h_data LIMIT 1")
+conn.close()
+print("ok", flush=True)
+"""
+
+
+def make_klines(start="2024-01-01", periods=24 * 30):
+    close = 100 + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        "Open_Time": pd.date_range(start, periods=periods, freq="h"),
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+        "Volume": np.ones(periods),
+    })
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "shared.duckdb")
+    with duckdb.connect(path) as conn:
+        df = make_klines()
+        conn.execute("CREATE TABLE btc_1h_data AS SELECT * FROM df")
+    yield path
+    get_connection_manager(path).close()
+
+
+def test_one_read_connection_and_one_cursor_per_thread(db_path):
+    manager = get_connection_manager(db_path)
+    assert get_connection_manager(os.path.join(os.path.dirname(db_path), ".", "shared.duckdb")) is manager
+
+    for _ in range(20):
+        assert len(load_klines(db_path, "btc_1h_data")) == 24 * 30
+    assert manager.connects == 1 and manager.is_open
+    with manager.reader() as first, manager.reader() as nested:
+        assert first is nested
+
+    cursors, errors = [], []
+
+    def read():
+        try:
+            with manager.reader() as cursor:
+                cursors.append(cursor)
+            for _ in range(10):
+                load_klines(db_path, "btc_1h_data", start="2024-01-10", end="2024-01-11")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert len({id(c) for c in cursors}) == 4
+    assert manager.connects == 1
+
+
+def test_reads_continue_while_another_thread_writes(db_path):
+    manager = get_connection_manager(db_path)
+    errors, reads = [], []
+    done = threading.Event()
+
+    def ingest():
+        try:
+            for i in range(6):
+                frame = make_klines(start=f"2024-{i + 2:02d}-01", periods=24)
+                upsert_klines_to_duckdb([frame], "btc_1h_data", "BTCUSDT", "1h", db_path=db_path)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                reads.append(len(load_klines(db_path, "btc_1h_data", end="2024-01-02")))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(2)] + [threading.Thread(target=ingest)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert reads and set(reads) == {24}
+    assert len(load_klines(db_path, "btc_1h_data")) == 24 * 30 + 6 * 24
+
+
+def test_write_releases_the_file_for_other_processes(db_path):
+    manager = DuckDBConnectionManager(db_path, idle_timeout=0.0)
+    with manager.writer() as conn:
+        conn.execute("DELETE FROM btc_1h_data WHERE Open_Time >= '2024-01-30'")
+        # Lectura dentro de la escritura: ve los cambios de la propia conexión
+        with manager.reader() as cursor:
+            assert cursor.execute("SELECT count(*) FROM btc_1h_data").fetchone()[0] == 24 * 29
+    assert not manager.is_open
+
+    with manager.reader() as cursor:
+        assert cursor.execute("SELECT count(*) FROM btc_1h_data").fetchone()[0] == 24 * 29
+    # Sin lectores (idle_timeout=0) el archivo queda libre para que otro proceso escriba
+    assert not manager.is_open
+    result = subprocess.run([sys.executable, "-c", OTHER_PROCESS_WRITE, db_path], capture_output=True, text=True)
+    assert result.stdout.strip() == "ok", result.stderr
+
+    with manager.reader() as cursor:
+        assert cursor.execute("SELECT count(*) FROM btc_1h_data").fetchone()[0] == 24 * 29 + 1
+    with manager.reader():
+        with pytest.raises(RuntimeError):
+            with manager.writer():
+                pass
+
+
+def test_idle_read_connection_is_released(db_path):
+    manager = DuckDBConnectionManager(db_path, idle_timeout=0.2)
+    with manager.reader() as cursor:
+        cursor.execute("SELECT 1").fetchone()
+        time.sleep(0.3)
+        assert manager.is_open
+    for _ in range(50):
+        if not manager.is_open:
+            break
+        time.sleep(0.05)
+    assert not manager.is_open
+
+
+def test_pragmas_come_from_config(tmp_path):
+    class Config:
+        values = {"Data.duckdb_threads": 2, "Data.duckdb_memory_limit": "256MB", "Data.lock_timeout": 5.0}
+
+        def get(self, key, default=None):
+            return self.values.get(key, default)
+
+    manager = DuckDBConnectionManager.from_config(str(tmp_path / "pragmas.duckdb"), Config())
+    with manager.writer() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    with manager.reader() as conn:
+        threads, memory = conn.execute(
+            "SELECT current_setting('threads'), current_setting('memory_limit')"
+        ).fetchone()
+    assert threads == 2 and memory.startswith("244")
+    assert manager.lock_timeout == 5.0 and manager.idle_timeout == 5.0
+    manager.close()
+
+
+def test_waits_for_lock_held_by_another_process(db_path):
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import duckdb, sys, time; c = duckdb.connect(sys.argv[1]); print('ok', flush=True); time.sleep(1.0)",
+         db_path],
+        stdout=subprocess.PIPE, text=True
+    )
+    try:
+        assert holder.stdout.readline().strip() == "ok"
+        with pytest.raises(duckdb.IOException):
+            with DuckDBConnectionManager(db_path, lock_timeout=0.0).reader():
+                pass
+
+        manager = DuckDBConnectionManager(db_path, lock_timeout=30.0)
+        start = time.monotonic()
+        with manager.writer() as conn:
+            assert conn.execute("SELECT count(*) FROM btc_1h_data").fetchone()[0] == 24 * 30
+        assert time.monotonic() - start > 0.3
+        manager.close()
+    finally:
+        holder.wait()
+
+
+def test_get_duckdb_connection_returns_a_read_write_connection(tmp_path):
+    path = str(tmp_path / "plain.duckdb")
+    conn = get_duckdb_connection(path)
+    assert isinstance(conn, duckdb.DuckDBPyConnection)
+    conn.execute("CREATE TABLE t AS SELECT 1 AS x")
+    conn.close()
+    with get_connection_manager(path).reader() as cursor:
+        assert cursor.execute("SELECT x FROM t").fetchone() == (1,)
+    get_connection_manager(path).close()
@@ -0,0 +1,80 @@
+"""Tests para el upsert masivo e idempotente de klines en DuckDB."""
+
+import duckdb
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_processor.data_system import (
+    bulk_upsert_to_duckdb, save_results_to_duckdb, upsert_klines_to_duckdb
+)
+
+
+def make_klines(start, periods, close=1.0):
+    open_time = pd.date_range(start, periods=periods, freq="h")
+    return pd.DataFrame({
+        "Open_Time": open_time,
+        "Close": np.full(periods, close),
+        "Number_of_Trades": np.arange(periods, dtype=np.int32),
+    })
+
+
+def test_klines_upsert_is_idempotent(tmp_path):
+    db_path = str(tmp_path / "klines.duckdb")
+    days = [make_klines(pd.Timestamp("2024-01-01") + pd.Timedelta(days=i), 24) for i in range(10)]
+
+    stats = upsert_klines_to_duckdb(days, "klines", "btcusdt", "1h", db_path=db_path)
+    assert stats["batches"] == 10 and stats["rows"] == 240 and stats["rows_per_s"] > 0
+    # Repetir la carga (y solaparla con otro símbolo) no duplica filas
+    upsert_klines_to_duckdb(days, "klines", "btcusdt", "1h", db_path=db_path)
+    upsert_klines_to_duckdb(days[:2], "klines", "ethusdt", "1h", db_path=db_path)
+
+    with duckdb.connect(db_path) as conn:
+        columns = [row[0] for row in conn.execute("DESCRIBE klines").fetchall()]
+        counts = dict(conn.execute("SELECT symbol, count(*) FROM klines GROUP BY symbol").fetchall())
+    assert columns[:3] == ["symbol", "interval", "Open_Time"]
+    assert counts == {"BTCUSDT": 240, "ETHUSDT": 48}
+
+
+def test_upsert_replaces_rows_with_same_key(tmp_path):
+    db_path = str(tmp_path / "klines.duckdb")
+    upsert_klines_to_duckdb([make_klines("2024-01-01", 48, close=1.0)], "klines", "BTCUSDT", "1h", db_path=db_path)
+    # Un lote posterior corrige las últimas 24 velas; dentro de un lote gana la última fila
+    fix = pd.concat([make_klines("2024-01-02", 24, close=2.0), make_klines("2024-01-02", 24, close=3.0)])
+    with duckdb.connect(db_path) as conn:
+        upsert_klines_to_duckdb([fix], "klines", "BTCUSDT", "1h", conn=conn)
+        closes = conn.execute("SELECT Close, count(*) FROM klines GROUP BY Close ORDER BY Close").fetchall()
+    assert closes == [(1.0, 24), (3.0, 24)]
+
+
+def test_failed_batch_rolls_back_whole_transaction(tmp_path):
+    db_path = str(tmp_path / "klines.duckdb")
+    good = make_klines("2024-01-01", 24)
+    bad = make_klines("2024-01-02", 24).assign(Close="not a number")
+    with pytest.raises(Exception):
+        bulk_upsert_to_duckdb([good, bad], "klines", ["Open_Time"], db_path=db_path)
+    with duckdb.connect(db_path) as conn:
+        tables = conn.execute("SELECT count(*) FROM information_schema.tables WHERE table_name = 'klines'").fetchone()
+    assert tables == (0,)
+
+
+def test_legacy_table_without_key_uses_anti_join(tmp_path):
+    db_path = str(tmp_path / "legacy.duckdb")
+    save_results_to_duckdb(make_klines("2024-01-01", 24), "btc_1h_data", db_path=db_path)
+
+    upsert_klines_to_duckdb([make_klines("2024-01-01 12:00", 24, close=5.0)], "btc_1h_data", "BTCUSDT", "1h", db_path=db_path)
+    save_results_to_duckdb(make_klines("2024-01-01 12:00", 24, close=5.0), "btc_1h_data", db_path=db_path,
+                           key_columns=["Open_Time"])
+
+    with duckdb.connect(db_path) as conn:
+        columns = [row[0] for row in conn.execute("DESCRIBE btc_1h_data").fetchall()]
+        total, distinct, replaced = conn.execute(
+            "SELECT count(*), count(DISTINCT Open_Time), count(*) FILTER (WHERE Close = 5.0) FROM btc_1h_data"
+        ).fetchone()
+    assert "symbol" not in columns
+    assert (total, distinct, replaced) == (36, 36, 24)
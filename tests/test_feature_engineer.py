@@ -0,0 +1,82 @@
+"""Tests para FeatureEngineer (extracción vectorizada de características)."""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from oracle.building_blocks.features.feature_engineer import FeatureEngineer
+from trading_manager.building_blocks.detectors.key_candle_detector import SignalDetector
+
+
+def _reference_features(df, t_events):
+    """Implementación original (un diccionario por evento) usada como referencia."""
+    features_list = []
+    for timestamp in t_events:
+        row = df.loc[timestamp]
+        features_list.append({
+            'body_percentage': row.get('body_percentage', 0),
+            'volume_ratio': row['Volume'] / row['volume_threshold'] if 'volume_threshold' in row and row['volume_threshold'] > 0 else 1.0,
+            'relative_range': (row['High'] - row['Low']) / row['Close'] if row['Close'] > 0 else 0,
+            'hour_of_day': timestamp.hour
+        })
+    return pd.DataFrame(features_list, index=t_events)
+
+
+@pytest.fixture
+def detected():
+    rng = np.random.default_rng(8)
+    n = 800
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.4, n)
+    df = pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + rng.uniform(0, 1, n),
+        "Low": np.minimum(open_, close) - rng.uniform(0, 1, n),
+        "Close": close,
+        "Volume": rng.lognormal(3, 1, n),
+    }, index=pd.date_range("2025-01-01", periods=n, freq="h"))
+    df = SignalDetector.detect_key_candles(df, volume_lookback=20, ema_period=50)
+    # Incluir eventos durante el warm-up (umbral de volumen NaN)
+    t_events = df.index[df['is_key_candle']].append(df.index[[0, 3, 10]]).sort_values()
+    return df, t_events
+
+
+class TestFeatureEngineer:
+
+    def test_matches_reference(self, detected):
+        df, t_events = detected
+
+        features = FeatureEngineer.extract_features(df, t_events)
+
+        pd.testing.assert_frame_equal(features, _reference_features(df, t_events))
+
+    def test_precomputed_positions(self, detected):
+        """Con posiciones precalculadas el resultado es idéntico."""
+        df, t_events = detected
+        positions = FeatureEngineer.locate_events(df, t_events)
+
+        features = FeatureEngineer.extract_features(df, t_events, positions=positions)
+
+        pd.testing.assert_frame_equal(features, FeatureEngineer.extract_features(df, t_events))
+
+    def test_without_detector_columns(self, detected):
+        """Sin columnas del detector se usan los valores por defecto."""
+        df, t_events = detected
+        raw = df[['Open', 'High', 'Low', 'Close', 'Volume']]
+
+        features = FeatureEngineer.extract_features(raw, t_events)
+
+        pd.testing.assert_frame_equal(features, _reference_features(raw, t_events))
+
+    def test_missing_events_are_skipped(self, detected):
+        df, t_events = detected
+        events = t_events[:3].append(pd.DatetimeIndex([pd.Timestamp("2030-01-01")]))
+
+        features = FeatureEngineer.extract_features(df, events)
+
+        assert list(features.index) == list(t_events[:3])
@@ -0,0 +1,149 @@
+"""Tests para el registro de características del Oráculo."""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import tempfile
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from oracle.building_blocks.features.feature_engineer import FeatureEngineer
+from oracle.building_blocks.features.feature_registry import default_registry
+from trading_manager.building_blocks.detectors.key_candle_detector import SignalDetector
+
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(4)
+    n = 500
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.4, n)
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + rng.uniform(0, 1, n),
+        "Low": np.minimum(open_, close) - rng.uniform(0, 1, n),
+        "Close": close,
+        "Volume": rng.lognormal(3, 1, n),
+    }, index=pd.date_range("2025-01-01", periods=n, freq="h"))
+
+
+@pytest.fixture
+def registry():
+    """Registro aislado con una característica que cuenta sus ejecuciones."""
+    reg = default_registry.copy()
+    reg.calls = 0
+
+    @reg.register("close_sma", inputs=("Close",), window=10)
+    def _close_sma(df, window):
+        reg.calls += 1
+        return df['Close'].rolling(window).mean()
+
+    return reg
+
+
+class TestFeatureRegistry:
+
+    def test_lazy_and_memoized(self, ohlcv, registry):
+        """Solo se calcula lo pedido y una segunda petición usa la caché."""
+        registry.compute(ohlcv, ["returns"])
+        assert registry.calls == 0
+
+        first = registry.compute(ohlcv, ["close_sma"])
+        second = registry.compute(ohlcv.assign(extra=1.0), ["close_sma"])
+
+        assert registry.calls == 1
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_params_create_new_entries(self, ohlcv, registry):
+        """Parámetros distintos generan columnas y entradas de caché distintas."""
+        result = registry.compute(ohlcv, {"close_sma": {}, "returns": {"window": 5}})
+
+        assert list(result.columns) == ["close_sma", "returns_5"]
+        np.testing.assert_allclose(result["returns_5"], np.log(ohlcv['Close']).diff(5))
+        registry.compute(ohlcv, {"close_sma": {"window": 20}})
+        assert registry.calls == 2
+
+    def test_data_change_invalidates_cache(self, ohlcv, registry):
+        registry.compute(ohlcv, ["close_sma"])
+        changed = ohlcv.copy()
+        changed.iloc[-1, changed.columns.get_loc('Close')] += 1.0
+
+        registry.compute(changed, ["close_sma"])
+
+        assert registry.calls == 2
+
+    def test_disk_cache_shared_between_registries(self, ohlcv, registry):
+        """Con cache_dir, un registro nuevo reutiliza lo calculado en otra ejecución."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            registry.cache_dir = tmpdir
+            expected = registry.compute(ohlcv, ["close_sma"])
+
+            other = registry.copy(cache_dir=tmpdir)
+            other.calls = registry.calls
+            result = other.compute(ohlcv, ["close_sma"])
+
+        assert registry.calls == 1
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_disk_cache_is_versioned(self, ohlcv, registry):
+        """Una definición nueva de la característica no reutiliza la caché en disco."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            registry.cache_dir = tmpdir
+            registry.compute(ohlcv, ["close_sma"])
+
+            bumped = registry.copy(cache_dir=tmpdir)
+
+            @bumped.register("close_sma", inputs=("Close",), window=10, version=2)
+            def _close_sma(df, window):
+                return df['Close'].rolling(window).mean() * 2
+
+            result = bumped.compute(ohlcv, ["close_sma"])
+            assert len(os.listdir(os.path.join(tmpdir, os.listdir(tmpdir)[0]))) == 2
+
+        np.testing.assert_allclose(result["close_sma"], ohlcv['Close'].rolling(10).mean() * 2)
+        assert registry.get("close_sma").cache_tag() != bumped.get("close_sma").cache_tag()
+
+    def test_memory_cache_is_bounded_lru(self, ohlcv, registry):
+        """La caché en memoria expulsa los resultados usados hace más tiempo."""
+        row_bytes = len(ohlcv) * 8
+        registry.max_cache_bytes = 2 * row_bytes
+        registry.compute(ohlcv, {"close_sma": {"window": 5}})
+        registry.compute(ohlcv, {"close_sma": {"window": 10}})
+        registry.compute(ohlcv, {"close_sma": {"window": 5}})  # pasa a ser el más reciente
+        registry.compute(ohlcv, {"close_sma": {"window": 20}})
+        assert registry.cache_bytes == 2 * row_bytes and registry.calls == 3
+
+        registry.compute(ohlcv, {"close_sma": {"window": 5}})
+        assert registry.calls == 3
+        registry.compute(ohlcv, {"close_sma": {"window": 10}})
+        assert registry.calls == 4
+
+        registry.clear_cache()
+        assert registry.cache_bytes == 0
+
+    def test_unknown_feature_and_params(self, ohlcv, registry):
+        with pytest.raises(KeyError):
+            registry.compute(ohlcv, ["does_not_exist"])
+        with pytest.raises(ValueError):
+            registry.compute(ohlcv, {"returns": {"span": 3}})
+
+    def test_max_lookback(self, registry):
+        assert registry.max_lookback({"volatility": {"window": 72}, "returns": {}}) == 72
+
+    def test_extract_registered_features_for_events(self, ohlcv):
+        """Las características por evento coinciden con las del FeatureEngineer base."""
+        t_events = ohlcv.index[[50, 120, 300]]
+
+        registered = FeatureEngineer.extract_registered_features(
+            ohlcv, t_events, ["body_percentage", "relative_range", "hour_of_day"]
+        )
+        detected = SignalDetector.detect_key_candles(ohlcv.copy(), volume_lookback=10, ema_period=20)
+        base = FeatureEngineer.extract_features(detected, t_events)
+
+        np.testing.assert_allclose(registered['body_percentage'], base['body_percentage'])
+        np.testing.assert_allclose(registered['relative_range'], base['relative_range'])
+        np.testing.assert_array_equal(registered['hour_of_day'], base['hour_of_day'])
+
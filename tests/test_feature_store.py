@@ -0,0 +1,133 @@
+"""Tests para el almacén de características en DuckDB."""
+
+import pytest
+import pandas as pd
+import numpy as np
+import duckdb
+import sys
+import os
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from oracle.building_blocks.features.feature_engineer import FeatureEngineer
+from oracle.building_blocks.features.feature_store import FeatureStore, build_training_set
+from trading_manager.building_blocks.detectors.key_candle_detector import SignalDetector
+from trading_manager.building_blocks.labelers.potential_capture_engine import get_atr_labels
+
+DETECTOR = {'volume_lookback': 20, 'volume_percentile_threshold': 70, 'body_percentile_threshold': 40, 'ema_period': 50}
+LABELS = {'tp_factor': 1.5, 'sl_factor': 1.0, 'time_limit': 12}
+
+
+def make_klines(n, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    return pd.DataFrame({
+        "Open_Time": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "Open": open_,
+        "High": np.maximum(open_, close) + rng.uniform(0, 1, n),
+        "Low": np.minimum(open_, close) - rng.uniform(0, 1, n),
+        "Close": close,
+        "Volume": rng.lognormal(3, 1, n),
+    })
+
+
+def write_klines(db_path, df):
+    with duckdb.connect(db_path) as conn:
+        conn.register("df_tmp", df)
+        conn.execute("CREATE TABLE IF NOT EXISTS klines AS SELECT * FROM df_tmp WHERE 1=0")
+        conn.execute("INSERT INTO klines SELECT * FROM df_tmp")
+        conn.unregister("df_tmp")
+
+
+def batch_reference(klines):
+    """Pipeline completo de los scripts de entrenamiento (sin almacén)."""
+    df = SignalDetector.detect_key_candles(klines.set_index("Open_Time"), reversal_mode=True, **DETECTOR)
+    mask = df['is_key_candle'].to_numpy()
+    t_events = df.index[mask]
+    features = FeatureEngineer.extract_features(df, t_events, positions=np.flatnonzero(mask))
+    labels = get_atr_labels(df, t_events, sides=df.loc[t_events, 'signal_side'], **LABELS)
+    return features, labels
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "store.duckdb")
+
+
+def test_incremental_sync_matches_full_recompute(db_path):
+    klines = make_klines(600)
+    store = FeatureStore(db_path, detector_params=DETECTOR, label_params=LABELS)
+
+    # Carga inicial y tres lotes de velas nuevas
+    write_klines(db_path, klines.iloc[:300])
+    store.sync("klines", "BTCUSDT", "1h")
+    for start, end in [(300, 301), (301, 450), (450, 600)]:
+        write_klines(db_path, klines.iloc[start:end])
+        stats = store.sync("klines", "BTCUSDT", "1h")
+        assert stats['new_bars'] == end - start
+
+    stored = store.load_training_set("BTCUSDT", "1h")
+    features, labels = batch_reference(klines)
+
+    # Los eventos de las últimas velas sin barrera tocada siguen pendientes
+    final = labels.index[labels.index <= klines['Open_Time'].iloc[-1 - LABELS['time_limit']]]
+    resolved = labels[(labels != 0) | labels.index.isin(final)]
+    assert list(stored.index) == list(resolved.index)
+    np.testing.assert_array_equal(stored['label'].to_numpy(), resolved.to_numpy())
+    for column in FeatureStore.FEATURE_COLUMNS:
+        np.testing.assert_array_equal(stored[column].to_numpy(dtype=np.float64),
+                                      features.loc[resolved.index, column].to_numpy(dtype=np.float64))
+
+    pending = store.load_training_set("BTCUSDT", "1h", include_pending=True)
+    assert list(pending.index) == list(labels.index)
+    assert pending['label'].isna().sum() == len(labels) - len(resolved)
+
+
+def test_build_training_set_recomputes_the_full_history(db_path, tmp_path):
+    klines = make_klines(600)
+    write_klines(db_path, klines)
+    expected_features, expected_labels = batch_reference(klines)
+
+    features, labels = build_training_set(db_path, "klines", dict(DETECTOR, reversal_mode=True), LABELS)
+    pd.testing.assert_frame_equal(features, expected_features)
+    pd.testing.assert_series_equal(labels, expected_labels)
+
+    # Sin lados todos los eventos se etiquetan como Long; features del registro cacheadas en disco
+    features, labels = build_training_set(
+        db_path, "klines", DETECTOR, dict(LABELS, use_sides=False), ["returns"], cache_dir=str(tmp_path / "cache")
+    )
+    assert list(features.columns) == list(expected_features.columns) + ["returns"]
+    df = klines.set_index("Open_Time")
+    pd.testing.assert_series_equal(labels, get_atr_labels(df, labels.index, **LABELS))
+    assert os.listdir(tmp_path / "cache")
+
+    assert build_training_set(db_path, "klines", DETECTOR, LABELS, min_events=10_000) == (None, None)
+
+
+def test_sync_without_new_bars_is_noop(db_path):
+    write_klines(db_path, make_klines(200))
+    store = FeatureStore(db_path, detector_params=DETECTOR, label_params=LABELS)
+    store.sync("klines", "BTCUSDT", "1h")
+    before = store.load_training_set("BTCUSDT", "1h", include_pending=True)
+    assert store.sync("klines", "BTCUSDT", "1h")['new_bars'] == 0
+    pd.testing.assert_frame_equal(before, store.load_training_set("BTCUSDT", "1h", include_pending=True))
+
+
+def test_versions_are_isolated(db_path):
+    write_klines(db_path, make_klines(200))
+    a = FeatureStore(db_path, detector_params=DETECTOR, label_params=LABELS)
+    b = FeatureStore(db_path, detector_params=DETECTOR, label_params={**LABELS, 'tp_factor': 3.0})
+    assert a.feature_version != b.feature_version
+    assert a.feature_version == FeatureStore(db_path, detector_params=DETECTOR, label_params=LABELS).feature_version
+
+    a.sync("klines", "BTCUSDT", "1h")
+    assert not a.load_training_set("BTCUSDT", "1h").empty
+    assert b.load_training_set("BTCUSDT", "1h").empty
+    assert a.load_training_set("ETHUSDT", "1h").empty
+
+
+def test_unknown_params_rejected(db_path):
+    with pytest.raises(ValueError):
+        FeatureStore(db_path, label_params={'tp': 2.0})
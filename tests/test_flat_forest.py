@@ -0,0 +1,80 @@
+"""Tests para el bosque aplanado (inferencia NumPy del Oráculo)."""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.linear_model import LogisticRegression
+from oracle.building_blocks.oracles.flat_forest import FlatForest
+from oracle.building_blocks.oracles.oracle_engine import OracleEngine
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(7)
+    X = pd.DataFrame(rng.normal(size=(2000, 5)), columns=list("abcde"))
+    y = np.where(X["a"] > 0.8, 1, np.where(X["b"] + rng.normal(0, 0.5, len(X)) > 0, 0, -1))
+    return X, y
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=25, random_state=0, n_jobs=1),
+    ExtraTreesClassifier(n_estimators=15, random_state=0, n_jobs=1),
+    RandomForestClassifier(n_estimators=10, max_depth=4, random_state=1, n_jobs=1),
+    DecisionTreeClassifier(random_state=0),
+])
+def test_probabilities_are_identical(dataset, model):
+    X, y = dataset
+    model.fit(X, y)
+    flat = FlatForest.from_sklearn(model)
+    rows = pd.DataFrame(np.random.default_rng(1).normal(size=(300, 5)), columns=list("abcde"))
+
+    np.testing.assert_array_equal(flat.predict_proba(rows), model.predict_proba(rows))
+    np.testing.assert_array_equal(flat.predict(rows), model.predict(rows))
+    # Una sola fila, como array 1-D
+    np.testing.assert_array_equal(flat.predict_proba(rows.to_numpy()[0]), model.predict_proba(rows.iloc[:1]))
+
+
+def test_column_order_follows_training_names(dataset):
+    X, y = dataset
+    model = RandomForestClassifier(n_estimators=5, random_state=0, n_jobs=1).fit(X, y)
+    flat = FlatForest.from_sklearn(model)
+    shuffled = X.iloc[:50][list("edcba")]
+    np.testing.assert_array_equal(flat.predict_proba(shuffled), model.predict_proba(X.iloc[:50]))
+
+
+def test_missing_values_follow_learned_direction(dataset):
+    X, y = dataset
+    rng = np.random.default_rng(3)
+    X = X.mask(rng.random(X.shape) < 0.15)
+    model = RandomForestClassifier(n_estimators=10, random_state=0, n_jobs=1).fit(X, y)
+    flat = FlatForest.from_sklearn(model)
+    np.testing.assert_array_equal(flat.predict_proba(X.iloc[:400]), model.predict_proba(X.iloc[:400]))
+
+
+def test_unsupported_model_rejected(dataset):
+    X, y = dataset
+    with pytest.raises(TypeError):
+        FlatForest.from_sklearn(LogisticRegression().fit(X, y))
+
+
+def test_engine_uses_compiled_forest_for_small_batches(dataset):
+    X, y = dataset
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=10, random_state=0), n_jobs=1)
+    oracle.train(X, y)
+    expected = oracle.predict_proba(X.iloc[:10])
+
+    oracle.compile()
+    assert oracle.flat_model is not None
+    np.testing.assert_array_equal(oracle.predict_proba(X.iloc[:10]), expected)
+
+    # Reentrenar invalida el bosque compilado
+    oracle.train(X, y)
+    assert oracle.flat_model is None
@@ -0,0 +1,153 @@
+"""Tests para el detector de velas clave (batch y streaming)."""
+
+import json
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_manager.building_blocks.detectors.key_candle_detector import (
+    SignalDetector, StreamingKeyCandleDetector
+)
+
+
+@pytest.fixture
+def ohlcv():
+    """Velas OHLCV sintéticas con tendencia alterna y volumen log-normal."""
+    rng = np.random.default_rng(21)
+    n = 1500
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.4, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 1, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 1, n)
+    volume = rng.lognormal(3, 1, n)
+    dates = pd.date_range("2025-01-01", periods=n, freq="h")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=dates)
+
+
+DETECTOR_PARAMS = dict(volume_lookback=50, volume_percentile_threshold=80,
+                       body_percentile_threshold=30, ema_period=200)
+
+
+class TestStreamingKeyCandleDetector:
+
+    @pytest.mark.parametrize("reversal_mode", [True, False])
+    def test_matches_batch_detector(self, ohlcv, reversal_mode):
+        """Vela a vela produce las mismas señales e indicadores que el detector batch."""
+        batch = SignalDetector.detect_key_candles(ohlcv.copy(), reversal_mode=reversal_mode, **DETECTOR_PARAMS)
+        detector = StreamingKeyCandleDetector(reversal_mode=reversal_mode, **DETECTOR_PARAMS)
+
+        results = pd.DataFrame([detector.update(bar) for bar in ohlcv.to_dict('records')], index=ohlcv.index)
+
+        assert batch['is_key_candle'].sum() > 0
+        np.testing.assert_array_equal(results['is_key_candle'], batch['is_key_candle'])
+        np.testing.assert_array_equal(results['signal_side'], batch['signal_side'])
+        np.testing.assert_array_equal(results['ema'], batch['ema'])
+        np.testing.assert_array_equal(results['volume_threshold'], batch['volume_threshold'])
+
+    def test_matches_batch_detector_with_missing_closes(self, ohlcv):
+        """Las velas sin cierre (NaN) hacen decaer la EMA igual que pandas ewm."""
+        ohlcv.iloc[[0, 300, 301, 302, 900], ohlcv.columns.get_loc("Close")] = np.nan
+        batch = SignalDetector.detect_key_candles(ohlcv.copy(), **DETECTOR_PARAMS)
+
+        bars = ohlcv.to_dict('records')
+        detector = StreamingKeyCandleDetector(**DETECTOR_PARAMS)
+        results = [detector.update(bar) for bar in bars[:301]]
+        # Reinicio dentro del hueco: el peso acumulado forma parte del estado
+        detector = StreamingKeyCandleDetector.from_state(json.loads(json.dumps(detector.get_state())))
+        results = pd.DataFrame(results + [detector.update(bar) for bar in bars[301:]], index=ohlcv.index)
+
+        np.testing.assert_array_equal(results['ema'], batch['ema'])
+        np.testing.assert_array_equal(results['is_key_candle'], batch['is_key_candle'])
+
+    def test_restore_from_snapshot(self, ohlcv):
+        """Un detector restaurado desde un snapshot JSON continúa sin diferencias."""
+        bars = ohlcv.to_dict('records')
+        reference = StreamingKeyCandleDetector(**DETECTOR_PARAMS)
+        expected = [reference.update(bar) for bar in bars]
+
+        detector = StreamingKeyCandleDetector(**DETECTOR_PARAMS)
+        for bar in bars[:700]:
+            detector.update(bar)
+        snapshot = json.loads(json.dumps(detector.get_state()))
+        restored = StreamingKeyCandleDetector.from_state(snapshot)
+
+        assert restored.is_warm
+        assert [restored.update(bar) for bar in bars[700:]] == expected[700:]
+
+
+class TestCompactDetection:
+
+    def test_compact_matches_and_does_not_mutate(self, ohlcv):
+        """El modo compacto da la misma máscara y lado sin añadir columnas a la entrada."""
+        original_columns = list(ohlcv.columns)
+        batch = SignalDetector.detect_key_candles(ohlcv.copy(), **DETECTOR_PARAMS)
+
+        signals = SignalDetector.detect_key_candles_compact(ohlcv, **DETECTOR_PARAMS)
+
+        assert list(ohlcv.columns) == original_columns
+        assert signals.indicators is None
+        assert signals.signal_side.dtype == np.int8
+        np.testing.assert_array_equal(signals.is_key_candle, batch['is_key_candle'])
+        np.testing.assert_array_equal(signals.signal_side, batch['signal_side'])
+        pd.testing.assert_index_equal(signals.t_events, batch.index[batch['is_key_candle']])
+        np.testing.assert_array_equal(signals.sides, batch.loc[batch['is_key_candle'], 'signal_side'])
+
+    def test_compact_indicators_are_float32(self, ohlcv):
+        """Los indicadores opcionales se devuelven en un DataFrame float32 separado."""
+        signals = SignalDetector.detect_key_candles_compact(ohlcv, return_indicators=True, **DETECTOR_PARAMS)
+
+        indicators = signals.indicators
+        assert list(indicators.columns) == ['volume_threshold', 'body_percentage', 'ema', 'is_uptrend']
+        assert indicators['ema'].dtype == np.float32
+        assert indicators['is_uptrend'].dtype == bool
+        pd.testing.assert_index_equal(indicators.index, ohlcv.index)
+
+    def test_compact_missing_columns(self, ohlcv):
+        assert SignalDetector.detect_key_candles_compact(ohlcv.drop(columns=['Volume'])) is None
+
+
+class TestPanelDetection:
+
+    @pytest.fixture
+    def panel(self, ohlcv):
+        """Tres símbolos con series distintas (desplazadas y reescaladas)."""
+        frames = {}
+        for k, symbol in enumerate(["BTCUSDT", "ETHUSDT", "SOLUSDT"]):
+            frame = ohlcv.iloc[k * 100:].copy()
+            frame[["Open", "High", "Low", "Close"]] *= (k + 1)
+            frames[symbol] = frame
+        return frames
+
+    def _expected(self, panel):
+        rows = []
+        for symbol, frame in sorted(panel.items()):
+            signals = SignalDetector.detect_key_candles_compact(frame, **DETECTOR_PARAMS)
+            rows += [(symbol, t, s) for t, s in zip(signals.t_events, signals.sides)]
+        return rows
+
+    def test_dict_of_frames(self, panel):
+        events = SignalDetector.detect_key_candles_panel(panel, **DETECTOR_PARAMS)
+
+        assert list(events.columns) == ['symbol', 'Open_Time', 'signal_side']
+        assert list(events.itertuples(index=False, name=None)) == self._expected(panel)
+
+    def test_long_format_frame(self, panel):
+        """Acepta un panel largo desordenado con columnas symbol y Open_Time."""
+        long = pd.concat(
+            [frame.rename_axis('Open_Time').reset_index().assign(symbol=symbol) for symbol, frame in panel.items()],
+            ignore_index=True
+        ).sample(frac=1.0, random_state=0)
+
+        events = SignalDetector.detect_key_candles_panel(long, **DETECTOR_PARAMS)
+
+        assert list(events.itertuples(index=False, name=None)) == self._expected(panel)
+
+    def test_process_pool(self, panel):
+        events = SignalDetector.detect_key_candles_panel(panel, max_workers=2, **DETECTOR_PARAMS)
+
+        assert list(events.itertuples(index=False, name=None)) == self._expected(panel)
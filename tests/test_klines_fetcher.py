@@ -0,0 +1,216 @@
+"""Tests para la descarga de klines contra un servidor HTTP local que imita Binance Vision."""
+
+import functools
+import io
+import threading
+import zipfile
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+from datetime import date, datetime, timedelta, timezone
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_processor.data_system import ApiClient, BinanceKlinesFetcher, KlinesDataRequestTemplate
+
+SYMBOL = "BTCUSDT"
+INTERVAL = "1h"
+
+
+def klines_csv(day: date) -> str:
+    """CSV diario con el formato de Binance (sin cabecera, tiempos en ms)."""
+    start = int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() * 1000)
+    rng = np.random.default_rng(day.toordinal())
+    rows = []
+    for hour in range(24):
+        open_time = start + hour * 3_600_000
+        price = 40000 + rng.normal(0, 50)
+        rows.append(
+            f"{open_time},{price:.2f},{price + 10:.2f},{price - 10:.2f},{price + 1:.2f},{rng.uniform(1, 100):.5f},"
+            f"{open_time + 3_599_999},{rng.uniform(1e4, 1e6):.5f},{rng.integers(10, 1000)},1.0,40000.0,0"
+        )
+    return "\n".join(rows) + "\n"
+
+
+def write_zip(root: str, period: str, label: str, days) -> None:
+    name = f"{SYMBOL}-{INTERVAL}-{label}"
+    directory = os.path.join(root, "data", "spot", period, "klines", SYMBOL, INTERVAL)
+    os.makedirs(directory, exist_ok=True)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"{name}.csv", "".join(klines_csv(day) for day in days))
+    with open(os.path.join(directory, f"{name}.zip"), "wb") as f:
+        f.write(buffer.getvalue())
+
+
+def write_day_zip(root: str, day: date) -> None:
+    write_zip(root, "daily", day.isoformat(), [day])
+
+
+def serve(root):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=root))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        QuietHandler.requests_seen.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Servidor de archivos local con los ZIP diarios de enero de 2024 (falta el día 10)."""
+    root = str(tmp_path / "www")
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(31)]
+    for day in days:
+        if day != date(2024, 1, 10):
+            write_day_zip(root, day)
+
+    httpd = serve(root)
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_fetcher(base_url, download_dir, **kwargs):
+    return BinanceKlinesFetcher(
+        ApiClient(timeout=10), download_dir=str(download_dir), base_url=f"{base_url}/data/spot", **kwargs
+    )
+
+
+@pytest.fixture
+def template():
+    return KlinesDataRequestTemplate(
+        name="jan", symbol=SYMBOL, interval=INTERVAL,
+        start_date=date(2024, 1, 1), end_date=date(2024, 1, 31)
+    )
+
+
+def test_concurrent_fetch_matches_sequential(server, template, tmp_path):
+    sequential = make_fetcher(server, tmp_path / "seq", max_workers=1).fetch_klines_by_template(template)
+
+    fetcher = make_fetcher(server, tmp_path / "par", max_workers=8)
+    concurrent = fetcher.fetch_klines_by_template(template)
+
+    pd.testing.assert_frame_equal(concurrent, sequential)
+    assert concurrent["Open_Time"].is_monotonic_increasing
+    assert len(concurrent) == 30 * 24  # el día que falta se omite
+
+    stats = fetcher.last_fetch_stats
+    assert stats["days"] == 31 and stats["days_loaded"] == 30
+    assert stats["downloaded_bytes"] > 0 and stats["mb_per_s"] > 0
+    assert stats["workers"] == 8
+
+    # Segunda pasada: todo sale de la caché local
+    fetcher.fetch_klines_by_template(template)
+    assert fetcher.last_fetch_stats["downloaded_bytes"] == 0
+
+
+def test_process_pool_parsing(server, template, tmp_path):
+    fetcher = make_fetcher(server, tmp_path / "proc")
+    expected = make_fetcher(server, tmp_path / "seq", max_workers=1).fetch_klines_by_template(template)
+    result = fetcher.fetch_klines_by_template(template, max_workers=4, parse_workers=2)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_pool_size_grows_with_workers():
+    client = ApiClient()
+    client.ensure_pool_size(32)
+    assert client._session.get_adapter("https://example.com")._pool_maxsize == 32
+    client.ensure_pool_size(4)  # nunca se reduce
+    assert client._session.get_adapter("http://example.com")._pool_maxsize == 32
+
+
+def test_plan_uses_monthly_archives_for_closed_months(tmp_path):
+    fetcher = BinanceKlinesFetcher(ApiClient(), download_dir=str(tmp_path))
+    days = [date(2023, 12, 30) + timedelta(days=i) for i in range(80)]  # 30/12/2023 .. 18/03/2024
+    plan = fetcher.plan_archives(days, today=date(2024, 3, 20))
+
+    monthly = [a.start for a in plan if a.is_monthly]
+    assert monthly == [date(2024, 1, 1), date(2024, 2, 1)]
+    # Diciembre (parcial) y marzo (mes en curso) van día a día
+    assert len(plan) == 2 + 2 + 18
+    assert [d for a in plan for d in a.days()] == days
+
+    assert fetcher._build_monthly_download_url("btcusdt", "1m", 2024, 2).endswith(
+        "/monthly/klines/BTCUSDT/1m/BTCUSDT-1m-2024-02.zip"
+    )
+
+
+@pytest.fixture
+def archive_server(tmp_path):
+    """Archivos diarios del 15/12/2023 al 10/03/2024 y mensual solo de enero."""
+    root = str(tmp_path / "archive")
+    days = [date(2023, 12, 15) + timedelta(days=i) for i in range(87)]
+    for day in days:
+        write_day_zip(root, day)
+    write_zip(root, "monthly", "2024-01", [d for d in days if d.month == 1 and d.year == 2024])
+    httpd = serve(root)
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", days
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_monthly_archives_with_daily_fallback(archive_server, tmp_path):
+    base_url, days = archive_server
+    template = KlinesDataRequestTemplate(
+        name="backfill", symbol=SYMBOL, interval=INTERVAL, start_date=days[0], end_date=days[-1]
+    )
+    daily = make_fetcher(base_url, tmp_path / "daily")
+    expected = daily.fetch_klines_by_template(template, prefer_monthly=False)
+    assert daily.last_fetch_stats["requests"] == len(days)
+
+    QuietHandler.requests_seen.clear()
+    fetcher = make_fetcher(base_url, tmp_path / "monthly")
+    result = fetcher.fetch_klines_by_template(template)
+    pd.testing.assert_frame_equal(result, expected)
+
+    # Enero sale del mensual; febrero no existe y se descarga día a día
+    stats = fetcher.last_fetch_stats
+    assert stats["monthly_files"] == 1
+    assert stats["daily_files"] == 17 + 29 + 10
+    assert stats["requests"] == len(QuietHandler.requests_seen) == 17 + 1 + 1 + 29 + 10
+    assert not any("2024-01-0" in path for path in QuietHandler.requests_seen if "/daily/" in path)
+
+
+def test_typed_parser_matches_tolerant_parser():
+    raw = klines_csv(date(2024, 1, 5)).encode()
+    legacy = BinanceKlinesFetcher._parse_klines_dataframe_tolerant(io.BytesIO(raw))
+    for engine in ("c", "pyarrow"):
+        typed = BinanceKlinesFetcher._parse_klines_dataframe_from_file(io.BytesIO(raw), engine=engine)
+        assert typed["Number_of_Trades"].dtype == np.int32
+        assert "Ignore" not in typed.columns
+        pd.testing.assert_frame_equal(typed, legacy, check_dtype=False)
+
+    single = BinanceKlinesFetcher._parse_klines_dataframe_from_file(io.BytesIO(raw), price_dtype="float32")
+    assert single["Close"].dtype == np.float32
+
+
+def test_parser_handles_microsecond_epochs_and_bad_values():
+    ms_rows = klines_csv(date(2025, 1, 1)).splitlines()
+    # Desde 2025 Binance publica los tiempos spot en microsegundos
+    us_rows = []
+    for row in ms_rows:
+        fields = row.split(",")
+        fields[0] += "000"
+        fields[6] += "999"
+        us_rows.append(",".join(fields))
+    df = BinanceKlinesFetcher._parse_klines_dataframe_from_file(io.BytesIO("\n".join(us_rows).encode()))
+    assert df["Open_Time"].iloc[0] == pd.Timestamp("2025-01-01")
+    assert df["Close_Time"].iloc[0] == pd.Timestamp("2025-01-01 00:59:59.999999")
+
+    # Un valor no numérico recurre al parseo tolerante (se convierte en nulo)
+    bad = ("\n".join(ms_rows).replace(",1.0,", ",n/a,", 1)).encode()
+    df = BinanceKlinesFetcher._parse_klines_dataframe_from_file(io.BytesIO(bad))
+    assert len(df) == 24 and df["Taker_Buy_Base_Asset_Volume"].isna().sum() == 1
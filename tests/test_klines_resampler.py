@@ -0,0 +1,152 @@
+"""Tests para el remuestreo de velas de 1m a timeframes mayores en DuckDB."""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_processor.data_system import KlinesResampler, load_klines, save_results_to_duckdb, upsert_klines_to_duckdb
+from data_processor.data_system.resample import resampled_table_name
+from data_processor.data_system.storage import get_connection_manager, table_columns
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Number_of_Trades"]
+
+
+def make_minutes(start="2024-01-01", periods=2 * 1440 + 90, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, periods))
+    open_ = np.r_[100.0, close[:-1]]
+    return pd.DataFrame({
+        "Open_Time": pd.date_range(start, periods=periods, freq="min"),
+        "Open": open_,
+        "High": np.maximum(open_, close) + rng.uniform(0, 1, periods),
+        "Low": np.minimum(open_, close) - rng.uniform(0, 1, periods),
+        "Close": close,
+        "Volume": rng.uniform(1, 10, periods),
+        "Number_of_Trades": rng.integers(1, 100, periods).astype(np.int32),
+    })
+
+
+def expected_bars(minutes, rule):
+    """Velas de referencia calculadas con pandas (solo buckets cerrados)."""
+    df = minutes.set_index("Open_Time")
+    bars = df.resample(rule).agg({
+        "Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum", "Number_of_Trades": "sum",
+    })
+    last_complete = (df.index[-1] + pd.Timedelta("1min")).floor(rule)
+    bars = bars[bars.index < last_complete]
+    bars["Number_of_Trades"] = bars["Number_of_Trades"].astype(np.int64)
+    return bars
+
+
+def assert_bars(df, expected):
+    df = df[COLUMNS].copy()
+    df["Number_of_Trades"] = df["Number_of_Trades"].astype(np.int64)
+    pd.testing.assert_frame_equal(df, expected, check_freq=False, check_names=False)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "minutes.duckdb")
+    yield path
+    get_connection_manager(path).close()
+
+
+def write_minutes(db_path, minutes):
+    with get_connection_manager(db_path).writer() as conn:
+        conn.register("minutes", minutes)
+        conn.execute("CREATE TABLE IF NOT EXISTS btc_1m_data AS SELECT * FROM minutes WHERE FALSE")
+        conn.execute("INSERT INTO btc_1m_data SELECT * FROM minutes")
+        conn.unregister("minutes")
+
+
+def test_table_names_and_invalid_timeframes(db_path):
+    assert resampled_table_name("btc_1m_data", "1m", "4h") == "btc_4h_data"
+    assert resampled_table_name("minutes", "1m", "1d") == "minutes_1d"
+    for interval in ("1m", "7m", "1w"):
+        with pytest.raises(ValueError):
+            KlinesResampler(db_path, "btc_1m_data", intervals=[interval])
+
+
+def test_closed_buckets_match_pandas(db_path):
+    minutes = make_minutes()
+    write_minutes(db_path, minutes)
+
+    stats = KlinesResampler(db_path, "btc_1m_data").refresh()
+    assert {s["table"] for s in stats.values()} == {f"btc_{i}_data" for i in ("5m", "15m", "1h", "4h", "1d")}
+    # 2 días + 90 minutos: el bucket de 1h de la 01:00 y el de 4h de las 00:00 aún no han cerrado
+    assert stats["1h"]["rows"] == 49 and stats["4h"]["rows"] == 12 and stats["1d"]["rows"] == 2
+
+    for interval, rule in (("5m", "5min"), ("15m", "15min"), ("1h", "h"), ("4h", "4h"), ("1d", "D")):
+        df = load_klines(db_path, f"btc_{interval}_data", columns=COLUMNS)
+        assert_bars(df, expected_bars(minutes, rule))
+
+
+def test_refresh_is_incremental_and_backfills_from_since(db_path):
+    minutes = make_minutes(periods=3 * 1440)
+    write_minutes(db_path, minutes.iloc[:1440 + 30])
+    resampler = KlinesResampler(db_path, "btc_1m_data", intervals=["1h", "1d"])
+    resampler.refresh()
+
+    write_minutes(db_path, minutes.iloc[1440 + 30:])
+    stats = resampler.refresh()
+    assert stats["1h"]["rows"] == 48 and stats["1d"]["rows"] == 2
+    assert resampler.refresh()["1h"]["rows"] == 0
+
+    # Corrección de un minuto antiguo: solo se recalcula desde `since`
+    with get_connection_manager(db_path).writer() as conn:
+        conn.execute("UPDATE btc_1m_data SET High = 10000 WHERE Open_Time = '2024-01-02 10:17:00'")
+    minutes.loc[minutes["Open_Time"] == pd.Timestamp("2024-01-02 10:17"), "High"] = 10000
+    stats = resampler.refresh(since="2024-01-02 10:17")
+    assert stats["1h"]["rows"] == 38 and stats["1d"]["rows"] == 2
+
+    assert_bars(load_klines(db_path, "btc_1h_data", columns=COLUMNS), expected_bars(minutes, "h"))
+    assert_bars(load_klines(db_path, "btc_1d_data", columns=COLUMNS), expected_bars(minutes, "D"))
+
+
+def test_keyed_table_gets_timeframes_per_symbol(db_path):
+    btc, eth = make_minutes(seed=1), make_minutes(seed=2).iloc[:1440]
+    upsert_klines_to_duckdb([btc], "klines", "BTCUSDT", "1m", db_path=db_path)
+    upsert_klines_to_duckdb([eth], "klines", "ETHUSDT", "1m", db_path=db_path)
+
+    resampler = KlinesResampler(db_path, "klines", intervals=["15m", "4h"])
+    stats = resampler.refresh()
+    assert stats["4h"]["table"] == "klines" and stats["4h"]["rows"] == 12 + 6
+    assert resampler.refresh()["15m"]["rows"] == 0
+
+    assert_bars(load_klines(db_path, "klines", columns=COLUMNS, symbol="ETHUSDT", interval="4h"),
+                expected_bars(eth, "4h"))
+    assert_bars(load_klines(db_path, "klines", columns=COLUMNS, symbol="BTCUSDT", interval="15m"),
+                expected_bars(btc, "15min"))
+    assert len(load_klines(db_path, "klines", symbol="BTCUSDT", interval="1m")) == len(btc)
+
+
+def test_legacy_target_without_symbol_keeps_its_schema(db_path):
+    minutes = make_minutes()
+    upsert_klines_to_duckdb([minutes], "btc_1m_data", "BTCUSDT", "1m", db_path=db_path)
+    # Tabla de 1h antigua (save_results_to_duckdb): sin symbol/interval ni Number_of_Trades
+    legacy = expected_bars(minutes, "h").reset_index().drop(columns="Number_of_Trades")
+    save_results_to_duckdb(legacy.iloc[:10], "btc_1h_data", db_path=db_path)
+
+    resampler = KlinesResampler(db_path, "btc_1m_data", intervals=["1h", "4h"])
+    stats = resampler.refresh(since="2024-01-01")
+    assert stats["1h"] == {**stats["1h"], "table": "btc_1h_data", "rows": 49}
+    with get_connection_manager(db_path).reader() as conn:
+        assert "symbol" not in table_columns(conn, "btc_1h_data")
+        assert "Number_of_Trades" not in table_columns(conn, "btc_1h_data")
+        assert "symbol" in table_columns(conn, "btc_4h_data")
+
+    df = load_klines(db_path, "btc_1h_data", columns=COLUMNS[:-1])
+    pd.testing.assert_frame_equal(
+        df[COLUMNS[:-1]], expected_bars(minutes, "h")[COLUMNS[:-1]], check_freq=False, check_names=False
+    )
+    assert resampler.refresh()["1h"]["rows"] == 0
+
+    upsert_klines_to_duckdb([minutes], "btc_1m_data", "ETHUSDT", "1m", db_path=db_path)
+    with pytest.raises(ValueError):
+        resampler.refresh()
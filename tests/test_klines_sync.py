@@ -0,0 +1,135 @@
+"""Tests para la sincronización incremental de klines con DuckDB."""
+
+import duckdb
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+from datetime import date, timedelta
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_processor.data_system import (
+    ApiClient, BinanceKlinesFetcher, KlinesDataRequestTemplate, sync_klines_to_duckdb, upsert_klines_to_duckdb
+)
+from data_processor.data_system.sync import bars_per_day, find_missing_days
+from test_klines_fetcher import INTERVAL, SYMBOL, QuietHandler, make_fetcher, serve, write_day_zip
+
+FIRST_DAY = date(2024, 1, 1)
+DAYS = [FIRST_DAY + timedelta(days=i) for i in range(45)]
+
+
+@pytest.fixture
+def server(tmp_path):
+    root = str(tmp_path / "www")
+    for day in DAYS:
+        write_day_zip(root, day)
+    httpd = serve(root)
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_template(start=DAYS[0], end=DAYS[-1]):
+    return KlinesDataRequestTemplate(name="sync", symbol=SYMBOL, interval=INTERVAL, start_date=start, end_date=end)
+
+
+def count_rows(db_path, where="TRUE"):
+    with duckdb.connect(db_path) as conn:
+        return conn.execute(
+            f"SELECT count(*), count(DISTINCT Open_Time) FROM btc_1h_data WHERE {where}"
+        ).fetchone()
+
+
+def test_bars_per_day_and_missing_days():
+    assert bars_per_day("1m") == 1440 and bars_per_day("4h") == 6 and bars_per_day("1d") == 1
+    with pytest.raises(ValueError):
+        bars_per_day("1w")
+
+    coverage = {DAYS[0]: 24, DAYS[1]: 10}
+    assert find_missing_days(DAYS[:3], coverage, 24) == [DAYS[2]]
+    assert find_missing_days(DAYS[:3], coverage, 24, refetch_partial=True) == [DAYS[1], DAYS[2]]
+
+
+def test_sync_fetches_only_missing_days(server, tmp_path):
+    db_path = str(tmp_path / "sync.duckdb")
+    fetcher = make_fetcher(server, tmp_path / "cache")
+
+    stats = sync_klines_to_duckdb(fetcher, make_template(), "btc_1h_data", db_path=db_path)
+    assert stats["missing_days"] == 45 and stats["inserted_rows"] == 45 * 24
+    assert count_rows(db_path) == (45 * 24, 45 * 24)
+
+    # Se borran dos días intermedios y se deja uno a medias
+    with duckdb.connect(db_path) as conn:
+        conn.execute("DELETE FROM btc_1h_data WHERE CAST(Open_Time AS DATE) IN ('2024-01-10', '2024-01-11')")
+        conn.execute("DELETE FROM btc_1h_data WHERE Open_Time >= '2024-01-20 12:00:00' AND Open_Time < '2024-01-21'")
+
+    QuietHandler.requests_seen.clear()
+    fresh = make_fetcher(server, tmp_path / "cache2")
+    stats = sync_klines_to_duckdb(fresh, make_template(), "btc_1h_data", db_path=db_path)
+    assert stats["missing_days"] == 2 and stats["fetched_days"] == 2
+    assert sorted(path.rsplit("-", 3)[-1] for path in QuietHandler.requests_seen) == ["10.zip", "11.zip"]
+    assert count_rows(db_path) == (45 * 24 - 12, 45 * 24 - 12)
+
+    # El día incompleto solo se re-descarga si se pide, sin duplicar filas
+    stats = sync_klines_to_duckdb(fresh, make_template(), "btc_1h_data", db_path=db_path, refetch_partial=True)
+    assert stats["missing_days"] == 1
+    assert count_rows(db_path) == (45 * 24, 45 * 24)
+    with duckdb.connect(db_path) as conn:
+        first = conn.execute("SELECT min(Open_Time), max(Open_Time) FROM btc_1h_data").fetchone()
+    assert first == (pd.Timestamp("2024-01-01").to_pydatetime(), pd.Timestamp("2024-02-14 23:00").to_pydatetime())
+
+
+def test_days_not_yet_published_are_skipped(server, tmp_path):
+    db_path = str(tmp_path / "sync.duckdb")
+    fetcher = make_fetcher(server, tmp_path / "cache")
+    stats = sync_klines_to_duckdb(
+        fetcher, make_template(DAYS[0], DAYS[-1] + timedelta(days=5)), "btc_1h_data",
+        db_path=db_path, today=DAYS[-1] + timedelta(days=1)
+    )
+    assert stats["days"] == 45 and stats["fetched_days"] == 45
+
+
+def test_up_to_date_year_is_a_fast_noop(tmp_path):
+    db_path = str(tmp_path / "year.duckdb")
+    open_time = pd.date_range("2023-01-01", "2023-12-31 23:00", freq="h")
+    with duckdb.connect(db_path) as conn:
+        df = pd.DataFrame({"Open_Time": open_time, "Close": np.ones(len(open_time))})
+        conn.execute("CREATE TABLE btc_1h_data AS SELECT * FROM df")
+
+    # Servidor inexistente: cualquier descarga fallaría
+    fetcher = BinanceKlinesFetcher(ApiClient(timeout=1), download_dir=str(tmp_path / "cache"), base_url="http://127.0.0.1:9")
+    template = KlinesDataRequestTemplate(
+        name="year", symbol=SYMBOL, interval=INTERVAL, start_date=date(2023, 1, 1), end_date=date(2023, 12, 31)
+    )
+    stats = sync_klines_to_duckdb(fetcher, template, "btc_1h_data", db_path=db_path)
+    assert stats["missing_days"] == 0 and stats["inserted_rows"] == 0
+    assert stats["first_day"] == date(2023, 1, 1) and stats["last_day"] == date(2023, 12, 31)
+    assert stats["seconds"] < 1.0
+
+
+def test_full_then_sync_share_the_keyed_schema(server, tmp_path):
+    db_path = str(tmp_path / "mixed.duckdb")
+    fetcher = make_fetcher(server, tmp_path / "cache")
+
+    # --mode full: upsert de los primeros 30 días en una tabla con clave (symbol, interval, Open_Time)
+    first = fetcher.fetch_klines_by_template(make_template(DAYS[0], DAYS[29]))
+    upsert_klines_to_duckdb([first], "btc_1h_data", SYMBOL, INTERVAL, db_path=db_path)
+    # Otro par en la misma tabla no cuenta como cobertura de BTCUSDT
+    upsert_klines_to_duckdb([first], "btc_1h_data", "ETHUSDT", INTERVAL, db_path=db_path)
+
+    # --mode sync sobre el mismo archivo: solo los 15 días restantes
+    stats = sync_klines_to_duckdb(fetcher, make_template(), "btc_1h_data", db_path=db_path)
+    assert stats["missing_days"] == 15 and stats["inserted_rows"] == 15 * 24
+    assert count_rows(db_path, f"symbol = '{SYMBOL}'") == (45 * 24, 45 * 24)
+    assert count_rows(db_path, "symbol = 'ETHUSDT'") == (30 * 24, 30 * 24)
+    assert count_rows(db_path, f"\"interval\" = '{INTERVAL}' AND symbol IS NOT NULL")[0] == 75 * 24
+
+    # Y al revés: una tabla creada por sync admite después una descarga completa
+    other = str(tmp_path / "sync_first.duckdb")
+    sync_klines_to_duckdb(fetcher, make_template(DAYS[0], DAYS[9]), "btc_1h_data", db_path=other)
+    everything = fetcher.fetch_klines_by_template(make_template())
+    upsert_klines_to_duckdb([everything], "btc_1h_data", SYMBOL, INTERVAL, db_path=other)
+    assert count_rows(other) == (45 * 24, 45 * 24)
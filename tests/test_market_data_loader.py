@@ -0,0 +1,72 @@
+"""Tests para el cargador de velas con rango y proyección en DuckDB."""
+
+import os
+import sys
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_processor.data_system import OHLCV_COLUMNS, ParquetKlinesLake, load_klines, upsert_klines_to_duckdb
+
+
+def make_klines(start="2024-01-01", periods=24 * 90):
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, periods))
+    return pd.DataFrame({
+        "Open_Time": pd.date_range(start, periods=periods, freq="h"),
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+        "Volume": rng.uniform(1, 10, periods),
+        "Number_of_Trades": np.arange(periods, dtype=np.int32),
+    })
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "market.duckdb")
+    shuffled = make_klines().sample(frac=1, random_state=1)
+    with duckdb.connect(path) as conn:
+        conn.execute("CREATE TABLE btc_1h_data AS SELECT * FROM shuffled")
+    return path
+
+
+def test_range_and_projection_are_pushed_down(db_path):
+    df = load_klines(db_path, "btc_1h_data", start="2024-02-01", end="2024-03-01")
+    expected = make_klines().set_index("Open_Time").loc["2024-02"]
+
+    assert list(df.columns) == list(OHLCV_COLUMNS)
+    assert df.index.name == "Open_Time" and df.index.dtype == "datetime64[ns]"
+    assert df.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(df, expected[list(OHLCV_COLUMNS)], check_freq=False)
+
+    everything = load_klines(db_path, "btc_1h_data", columns=None)
+    assert len(everything) == 24 * 90 and "Number_of_Trades" in everything.columns
+
+    with pytest.raises(ValueError):
+        load_klines(db_path, "btc_1h_data", columns=["Open", "Spread"])
+    with pytest.raises(ValueError):
+        load_klines(db_path, "missing_table")
+
+
+def test_symbol_filter_on_keyed_table(tmp_path):
+    path = str(tmp_path / "keyed.duckdb")
+    upsert_klines_to_duckdb([make_klines()], "klines", "BTCUSDT", "1h", db_path=path)
+    upsert_klines_to_duckdb([make_klines().assign(Close=1.0)], "klines", "ETHUSDT", "1h", db_path=path)
+
+    # Misma conexión del proceso que usó el upsert (un read_only=True aparte chocaría con ella)
+    eth = load_klines(path, "klines", columns=["Close"], symbol="ethusdt", interval="1h", end="2024-01-02")
+    assert len(eth) == 24 and (eth["Close"] == 1.0).all()
+
+
+def test_lake_views_prune_by_month(tmp_path):
+    lake = ParquetKlinesLake(str(tmp_path / "lake"))
+    lake.write([make_klines()], "BTCUSDT", "1h")
+    with lake.connect() as conn:
+        df = load_klines(conn, "klines_lake", columns=["Close"], symbol="BTCUSDT", interval="1h",
+                         start="2024-02-10", end="2024-02-12")
+    assert len(df) == 48
+    assert df.index[0] == pd.Timestamp("2024-02-10")
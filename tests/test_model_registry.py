@@ -0,0 +1,119 @@
+"""Tests para el registro de modelos (LRU, mmap) y el intercambio en caliente."""
+
+import json
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.ensemble import RandomForestClassifier
+from core.config_manager import ConfigManager
+from oracle.building_blocks.oracles.flat_forest import FlatForest
+from oracle.building_blocks.oracles.model_registry import ModelRegistry
+from oracle.building_blocks.oracles.oracle_engine import OracleEngine
+from oracle.oracle_manager import OracleManagerWithHealthCheck
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(5)
+    X = pd.DataFrame(rng.normal(size=(500, 3)), columns=["a", "b", "c"])
+    y = (X["a"] + rng.normal(0, 0.5, len(X)) > 0).astype(int)
+    return X, y
+
+
+def train_model(path, dataset, seed):
+    X, y = dataset
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=5, random_state=seed), n_jobs=1)
+    oracle.train(X, y)
+    oracle.save(str(path))
+    return oracle
+
+
+def test_lru_eviction(dataset, tmp_path):
+    paths = [tmp_path / f"oracle_reversal_v{i}.joblib" for i in range(3)]
+    for i, path in enumerate(paths):
+        train_model(path, dataset, seed=i)
+
+    registry = ModelRegistry(capacity=2)
+    first = registry.get(str(paths[0]))
+    registry.get(str(paths[1]))
+    assert registry.get(str(paths[0])) is first  # acierto, pasa a ser el más reciente
+    registry.get(str(paths[2]))
+
+    assert str(paths[1]) not in registry
+    assert registry.cached_paths() == [str(paths[0]), str(paths[2])]
+    assert (registry.hits, registry.misses) == (1, 3)
+
+
+def test_compiled_forest_is_memory_mapped(dataset, tmp_path):
+    X, _ = dataset
+    path = tmp_path / "model.joblib"
+    original = train_model(path, dataset, seed=0)
+
+    engine = ModelRegistry().get(str(path))
+    assert os.path.exists(str(path) + ModelRegistry.FLAT_SUFFIX)
+    assert isinstance(engine.flat_model.threshold, np.memmap)
+    np.testing.assert_array_equal(engine.predict_proba(X.iloc[:20]), original.model.predict_proba(X.iloc[:20]))
+
+    reloaded = FlatForest.load(str(path) + ModelRegistry.FLAT_SUFFIX, mmap_mode=None)
+    np.testing.assert_array_equal(reloaded.predict_proba(X), original.model.predict_proba(X))
+
+
+def test_current_flat_file_defers_sklearn_load(dataset, tmp_path):
+    X, _ = dataset
+    path = tmp_path / "model.joblib"
+    original = train_model(path, dataset, seed=0)
+    assert ModelRegistry().get(str(path)).model_loaded  # primera carga: exporta el .flat
+
+    # Otro proceso con el .flat al día: solo se proyecta el bosque compilado
+    engine = ModelRegistry(engine_kwargs={"n_jobs": 1}).get(str(path))
+    assert not engine.model_loaded
+    np.testing.assert_array_equal(engine.predict_proba(X.iloc[:20]), original.model.predict_proba(X.iloc[:20]))
+    assert not engine.model_loaded
+
+    large = X.iloc[:OracleEngine.FLAT_MAX_ROWS + 1]
+    np.testing.assert_array_equal(engine.predict_proba(large), original.model.predict_proba(large))
+    assert engine.model_loaded and engine.model.n_jobs == 1
+
+
+def test_rewritten_file_is_reloaded(dataset, tmp_path):
+    X, _ = dataset
+    path = tmp_path / "model.joblib"
+    train_model(path, dataset, seed=0)
+    registry = ModelRegistry()
+    first = registry.get(str(path))
+
+    retrained = train_model(path, dataset, seed=1)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    second = registry.get(str(path))
+    assert second is not first
+    np.testing.assert_array_equal(second.predict_proba(X), retrained.model.predict_proba(X))
+
+
+def test_manager_hot_swaps_on_model_path_change(dataset, tmp_path):
+    X, _ = dataset
+    v1, v2 = tmp_path / "oracle_reversal_v1.joblib", tmp_path / "oracle_reversal_v2.joblib"
+    train_model(v1, dataset, seed=0)
+    model_v2 = train_model(v2, dataset, seed=1)
+
+    config_path = tmp_path / "aipha_config.json"
+    config_path.write_text(json.dumps({"Oracle": {"model_path": str(v1)}}))
+    manager = OracleManagerWithHealthCheck(config=ConfigManager(config_path), check_interval=0)
+    assert manager.health_check()
+    assert manager.model_path == str(v1)
+
+    # Otro proceso (el entrenamiento) actualiza la configuración
+    other = ConfigManager(config_path)
+    other.set("Oracle.model_path", str(v2))
+    np.testing.assert_array_equal(manager.predict_proba(X), model_v2.model.predict_proba(X))
+    assert manager.model_path == str(v2)
+
+    # Una ruta inválida no tumba el modelo activo
+    other.set("Oracle.model_path", str(tmp_path / "missing.joblib"))
+    assert manager.refresh() is False
+    assert manager.model_path == str(v2)
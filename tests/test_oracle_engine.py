@@ -0,0 +1,224 @@
+"""Tests para el motor del Oráculo (entrenamiento paralelo e inferencia por lotes)."""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import threading
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.ensemble import RandomForestClassifier
+from core.config_manager import ConfigManager
+from oracle.building_blocks.oracles.oracle_engine import OracleEngine
+from oracle.strategies.train_proof_oracle import _load_trained_events, _save_trained_events, _train_incremental
+
+
+class RecordingMemory:
+    """Sustituto de MemoryManager que guarda las métricas registradas."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def record_metric(self, component, metric_name, value, metadata=None):
+        self.metrics.append((component, metric_name, value, metadata))
+
+
+class DictConfig:
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key_path, default=None):
+        return self.values.get(key_path, default)
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(3000, 4)), columns=["a", "b", "c", "d"])
+    y = ((X["a"] + 0.5 * X["b"] + rng.normal(0, 0.5, len(X))) > 0).astype(int)
+    return X, y
+
+
+def test_default_model_uses_all_cores():
+    assert OracleEngine().model.n_jobs == -1
+    assert OracleEngine(n_jobs=2).model.n_jobs == 2
+
+
+def test_chunked_inference_matches_single_pass(dataset):
+    X, y = dataset
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=20, random_state=42), n_jobs=1)
+    oracle.train(X, y)
+    expected = oracle.predict_proba(X)
+
+    chunked = OracleEngine(model=oracle.model, n_jobs=4, batch_size=257)
+    np.testing.assert_allclose(chunked.predict_proba(X), expected)
+    np.testing.assert_allclose(chunked.predict_proba(X.to_numpy()), expected)
+    np.testing.assert_array_equal(chunked.predict(X), oracle.predict(X))
+    # Puntuar por bloques no modifica el paralelismo interno del modelo
+    assert chunked.model.n_jobs == 4
+
+
+def test_concurrent_chunked_scoring_leaves_shared_model_untouched(dataset):
+    X, y = dataset
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=10, random_state=0), n_jobs=3, batch_size=200)
+    oracle.train(X, y)
+    expected = oracle.predict_proba(X)
+    seen_n_jobs, errors = set(), []
+
+    def score():
+        try:
+            for _ in range(5):
+                np.testing.assert_allclose(oracle.predict_proba(X), expected)
+                seen_n_jobs.add(oracle.model.n_jobs)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=score) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert seen_n_jobs == {3}
+
+
+def test_timings_are_recorded(dataset):
+    X, y = dataset
+    memory = RecordingMemory()
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=5, random_state=0), memory=memory)
+    oracle.train(X, y)
+    oracle.predict_proba(X)
+
+    names = [m[1] for m in memory.metrics]
+    assert names == ["fit_seconds", "predict_proba_seconds"]
+    assert all(m[0] == "Oracle" and m[2] >= 0 for m in memory.metrics)
+    assert memory.metrics[0][3]["samples"] == len(X)
+    assert set(oracle.last_timings) == {"fit_seconds", "predict_proba_seconds"}
+
+
+def test_from_config():
+    config = DictConfig({"Oracle.n_jobs": 3, "Oracle.batch_size": 1000, "Oracle.n_estimators": 7})
+    oracle = OracleEngine.from_config(config)
+    assert oracle.n_jobs == 3
+    assert oracle.batch_size == 1000
+    assert oracle.model.n_estimators == 7
+    assert oracle.model.n_jobs == 3
+
+
+def test_load_applies_settings(dataset, tmp_path):
+    X, y = dataset
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=5, random_state=0))
+    oracle.train(X, y)
+    path = str(tmp_path / "model.joblib")
+    oracle.save(path)
+
+    loaded = OracleEngine.load(path, n_jobs=2, batch_size=500)
+    assert loaded.model.n_jobs == 2
+    np.testing.assert_allclose(loaded.predict_proba(X), oracle.predict_proba(X))
+
+
+def test_incremental_training_adds_and_retires_trees(dataset):
+    X, y = dataset
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=10, random_state=42), n_jobs=1)
+    oracle.train(X.iloc[:1000], y.iloc[:1000])
+    original_trees = list(oracle.model.estimators_)
+    oracle.compile()
+
+    assert oracle.train_incremental(X.iloc[1000:2000], y.iloc[1000:2000], n_new_trees=5) == 5
+    assert len(oracle.model.estimators_) == 15
+    assert oracle.model.estimators_[:10] == original_trees
+    assert oracle.flat_model is None
+    assert "fit_incremental_seconds" in oracle.last_timings
+
+    # Con tope de árboles se retiran los más antiguos
+    oracle.train_incremental(X.iloc[2000:], y.iloc[2000:], n_new_trees=5, max_trees=12)
+    assert len(oracle.model.estimators_) == oracle.model.n_estimators == 12
+    assert original_trees[-2] is oracle.model.estimators_[0]
+    assert oracle.predict_proba(X).shape == (len(X), 2)
+
+    # Una clase que el modelo no conoce no se puede añadir
+    assert oracle.train_incremental(X.iloc[2000:], y.iloc[2000:] + 5) == 0
+    assert len(oracle.model.estimators_) == 12
+
+
+def test_incremental_training_with_a_missing_class(dataset):
+    X, _ = dataset
+    # Etiquetas TP/SL/tiempo (1/-1/0) como las del etiquetado por barreras
+    y = pd.Series(np.select([X["a"] > 0.5, X["a"] < -0.5], [1, -1], 0), index=X.index)
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=10, random_state=42), n_jobs=1)
+    oracle.train(X.iloc[:2000], y.iloc[:2000])
+    before = oracle.predict_proba(X.iloc[2000:])
+
+    increment = y.iloc[2000:][y.iloc[2000:] != -1].index
+    assert oracle.train_incremental(X.loc[increment], y.loc[increment], n_new_trees=5) == 5
+    assert len(oracle.model.estimators_) == 15
+
+    proba = oracle.predict_proba(X.iloc[2000:])
+    assert proba.shape == (1000, 3)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    new_trees = np.mean([t.predict_proba(X.iloc[2000:].to_numpy()) for t in oracle.model.estimators_[10:]], axis=0)
+    assert np.all(new_trees[:, 0] == 0)  # los árboles nuevos no predicen la clase -1
+    np.testing.assert_allclose(proba, (10 * before + 5 * new_trees) / 15)
+    np.testing.assert_allclose(oracle.compile().predict_proba(X.iloc[2000:]), proba)
+
+
+def test_incremental_training_skips_when_max_trees_has_no_room(dataset):
+    X, y = dataset
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=10, random_state=42), n_jobs=1)
+    oracle.train(X.iloc[:1000], y.iloc[:1000])
+    assert oracle.train_incremental(X.iloc[1000:], y.iloc[1000:], n_new_trees=20, max_trees=15) == 0
+    assert len(oracle.model.estimators_) == oracle.model.n_estimators == 10
+
+
+def test_incremental_training_uses_only_untrained_events(dataset, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    X, y = dataset
+    X.index = pd.date_range("2024-01-01", periods=len(X), freq="h")
+    y.index = X.index
+    model_path = str(tmp_path / "oracle.joblib")
+    config = ConfigManager(tmp_path / "config.json")
+    assert not _train_incremental(config, X, y, model_path)  # sin modelo previo
+
+    # Ejecución anterior: los eventos 990-999 aún estaban pendientes
+    trained = X.index[:990]
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=10, random_state=42), n_jobs=1)
+    oracle.train(X.loc[trained], y.loc[trained])
+    oracle.save(model_path)
+    _save_trained_events(config, model_path, trained)
+    saved = os.path.getmtime(model_path)
+    assert config.get("Oracle.trained_until") == X.index[989].isoformat()
+
+    batches = []
+    original = OracleEngine.train_incremental
+
+    def recording(self, features, targets, **kwargs):
+        batches.append(features.index)
+        return original(self, features, targets, **kwargs)
+
+    monkeypatch.setattr(OracleEngine, "train_incremental", recording)
+    config.set("Oracle.incremental_trees", 20)
+    config.set("Oracle.max_trees", 15)
+    # Sin hueco bajo el tope: no se guarda el modelo ni los eventos, toca reentrenar
+    assert not _train_incremental(config, X, y, model_path)
+    assert os.path.getmtime(model_path) == saved
+    assert _load_trained_events(model_path).equals(trained)
+
+    config.set("Oracle.max_trees", 500)
+    assert _train_incremental(config, X, y, model_path)
+    # Los pendientes entran aunque sean anteriores a otros entrenados; ninguno se repite
+    assert batches[-1].equals(X.index[990:])
+    assert _load_trained_events(model_path).equals(X.index)
+    assert config.get("Oracle.trained_until") == X.index[-1].isoformat()
+    assert len(OracleEngine.load(model_path).model.estimators_) == 30
+
+    assert _train_incremental(config, X, y, model_path)
+    assert len(batches) == 2
+
+
+def test_incremental_training_on_unfitted_model_trains_normally(dataset):
+    X, y = dataset
+    oracle = OracleEngine(model=RandomForestClassifier(n_estimators=4, random_state=0), n_jobs=1)
+    assert oracle.train_incremental(X, y) == 4
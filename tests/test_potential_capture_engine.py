@@ -9,7 +9,9 @@ import os
 # Añadir el directorio raíz al path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from trading_manager.building_blocks.labelers.potential_capture_engine import get_atr_labels
+from trading_manager.building_blocks.labelers.potential_capture_engine import (
+    get_atr_labels, get_barrier_outcomes, label_grid
+)
 
 class TestPotentialCaptureEngine:
     
@@ -71,3 +73,220 @@ class TestPotentialCaptureEngine:
         assert not labels.empty
         # No afirmamos el resultado exacto (1 o -1), solo que no falle la ejecución
         assert all(isinstance(l, (int, np.integer)) for l in labels)
+
+
+def _reference_atr_labels(prices, t_events, sides, atr_period, tp_factor, sl_factor, time_limit):
+    """Bucle original (vela a vela) usado como referencia de compatibilidad."""
+    high_low = prices['High'] - prices['Low']
+    high_close = abs(prices['High'] - prices['Close'].shift())
+    low_close = abs(prices['Low'] - prices['Close'].shift())
+    atr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1).rolling(atr_period).mean()
+
+    labels = []
+    for start_time in t_events:
+        side = sides.loc[start_time] if sides is not None else 1
+        idx = prices.index.get_loc(start_time)
+        future = prices.iloc[idx: idx + time_limit + 1]
+        current_atr = atr.loc[start_time]
+        if len(future) < 2 or pd.isna(current_atr):
+            labels.append(0)
+            continue
+        entry = future.iloc[0]['Close']
+        if side == 1:
+            tp, sl = entry + current_atr * tp_factor, entry - current_atr * sl_factor
+        else:
+            tp, sl = entry - current_atr * tp_factor, entry + current_atr * sl_factor
+        label = 0
+        for i in range(1, len(future)):
+            high, low = future.iloc[i]['High'], future.iloc[i]['Low']
+            if side == 1:
+                if high >= tp:
+                    label = 1
+                    break
+                if low <= sl:
+                    label = -1
+                    break
+            else:
+                if low <= tp:
+                    label = 1
+                    break
+                if high >= sl:
+                    label = -1
+                    break
+        labels.append(label)
+    return pd.Series(labels, index=t_events)
+
+
+class TestVectorizedLabeling:
+
+    @pytest.fixture
+    def random_walk(self):
+        """Serie aleatoria de 500 velas con eventos Long y Short."""
+        rng = np.random.default_rng(7)
+        dates = pd.date_range(start="2025-01-01", periods=500, freq="h")
+        close = 100 + np.cumsum(rng.normal(0, 1, 500))
+        high = close + rng.uniform(0, 1.5, 500)
+        low = close - rng.uniform(0, 1.5, 500)
+        df = pd.DataFrame({"Open": close, "High": high, "Low": low, "Close": close}, index=dates)
+
+        positions = np.sort(rng.choice(500, size=120, replace=False))
+        t_events = dates[positions]
+        sides = pd.Series(rng.choice([1, -1], size=120), index=t_events)
+        return df, t_events, sides
+
+    @pytest.mark.parametrize("engine", ["window", "sparse"])
+    @pytest.mark.parametrize("tp_factor,sl_factor,time_limit", [
+        (2.0, 1.0, 24),
+        (1.0, 2.0, 48),
+        (0.5, 0.5, 1),
+        (3.0, 3.0, 240),
+    ])
+    def test_matches_reference_loop(self, random_walk, tp_factor, sl_factor, time_limit, engine):
+        """Ambos motores vectorizados deben reproducir exactamente el bucle original."""
+        df, t_events, sides = random_walk
+        expected = _reference_atr_labels(df, t_events, sides, 14, tp_factor, sl_factor, time_limit)
+        labels = get_atr_labels(df, t_events, sides=sides, atr_period=14, tp_factor=tp_factor,
+                                sl_factor=sl_factor, time_limit=time_limit, engine=engine)
+
+        pd.testing.assert_series_equal(labels, expected)
+
+    def test_events_without_atr_or_future_are_neutral(self, random_walk):
+        """Eventos durante el warm-up del ATR o en la última vela se etiquetan 0."""
+        df, _, _ = random_walk
+        t_events = df.index[[0, 5, len(df) - 1]]
+
+        labels = get_atr_labels(df, t_events, atr_period=14)
+
+        assert labels.tolist() == [0, 0, 0]
+        assert labels.dtype == np.int64
+
+    def test_missing_events_are_skipped(self, random_walk):
+        """Los timestamps que no existen en los precios se omiten del resultado."""
+        df, t_events, sides = random_walk
+        ghost = pd.DatetimeIndex([pd.Timestamp("2030-01-01")])
+        mixed = t_events[:5].append(ghost)
+
+        labels = get_atr_labels(df, mixed, sides=sides)
+
+        assert list(labels.index) == list(t_events[:5])
+
+
+class TestBarrierOutcomes:
+
+    @pytest.fixture
+    def path_data(self):
+        """Camino de precios controlado con ATR constante de 1.0."""
+        dates = pd.date_range(start="2025-01-01", periods=10, freq="h")
+        close = np.full(10, 100.0)
+        high = close + 0.5
+        low = close - 0.5
+        # Tras el evento en la vela 4: sube a 101.8 y luego toca el TP (102.0)
+        high[5], high[6] = 101.8, 102.5
+        low[5] = 99.6
+        df = pd.DataFrame({"Open": close, "High": high, "Low": low, "Close": close}, index=dates)
+        return df
+
+    def test_labels_match_get_atr_labels(self, path_data):
+        """La columna label es idéntica a get_atr_labels."""
+        t_events = path_data.index[[3, 4, 8]]
+        outcomes = get_barrier_outcomes(path_data, t_events, atr_period=2, time_limit=3)
+        labels = get_atr_labels(path_data, t_events, atr_period=2, time_limit=3)
+
+        pd.testing.assert_series_equal(outcomes['label'], labels, check_names=False)
+
+    def test_take_profit_outcome(self, path_data):
+        """Se registran la vela de salida, el retorno y las excursiones."""
+        t_events = path_data.index[[4]]
+        out = get_barrier_outcomes(path_data, t_events, atr_period=2,
+                                   tp_factor=2.0, sl_factor=1.0, time_limit=5).iloc[0]
+
+        assert out['label'] == 1
+        assert out['bars_held'] == 2
+        assert out['exit_idx'] == 6
+        assert out['exit_time'] == path_data.index[6]
+        assert out['exit_price'] == pytest.approx(102.0)
+        assert out['realized_return'] == pytest.approx(0.02)
+        assert out['mfe'] == pytest.approx(0.025)
+        assert out['mae'] == pytest.approx(-0.005)
+
+    def test_time_limit_exit_at_last_available_close(self, path_data):
+        """Sin toques, la salida es el cierre de la última vela disponible."""
+        t_events = path_data.index[[8]]
+        out = get_barrier_outcomes(path_data, t_events, sides=pd.Series([-1], index=t_events),
+                                   atr_period=2, time_limit=5).iloc[0]
+
+        assert out['label'] == 0
+        assert out['bars_held'] == 1
+        assert out['exit_time'] == path_data.index[9]
+        assert out['realized_return'] == pytest.approx(0.0)
+
+    @pytest.mark.parametrize("engine", ["auto", "window", "sparse"])
+    def test_zero_time_limit_is_vertical_barrier(self, path_data, engine):
+        """Con time_limit=0 no hay velas futuras: etiqueta 0 y salida en la vela de entrada."""
+        t_events = path_data.index[[3, 4, 8]]
+        labels = get_atr_labels(path_data, t_events, atr_period=2, time_limit=0, engine=engine)
+        out = get_barrier_outcomes(path_data, t_events, atr_period=2, time_limit=0, engine=engine)
+
+        assert (labels == 0).all()
+        assert (out['label'] == 0).all() and (out['bars_held'] == 0).all()
+        assert list(out['exit_time']) == list(t_events)
+        assert (out['realized_return'] == 0.0).all()
+
+    def test_sparse_engine_matches_window_engine(self):
+        """El índice de extremos produce el mismo frame de resultados que las ventanas."""
+        rng = np.random.default_rng(3)
+        dates = pd.date_range(start="2025-01-01", periods=600, freq="h")
+        close = 100 + np.cumsum(rng.normal(0, 1, 600))
+        df = pd.DataFrame({"Open": close, "High": close + rng.uniform(0, 1, 600),
+                           "Low": close - rng.uniform(0, 1, 600), "Close": close}, index=dates)
+        t_events = dates[np.sort(rng.choice(600, size=100, replace=False))]
+        sides = pd.Series(rng.choice([1, -1], size=100), index=t_events)
+
+        window = get_barrier_outcomes(df, t_events, sides, time_limit=120, engine="window")
+        sparse = get_barrier_outcomes(df, t_events, sides, time_limit=120, engine="sparse")
+
+        pd.testing.assert_frame_equal(window, sparse)
+
+
+class TestLabelGrid:
+
+    @pytest.fixture
+    def random_walk(self):
+        rng = np.random.default_rng(11)
+        dates = pd.date_range(start="2025-01-01", periods=400, freq="h")
+        close = 100 + np.cumsum(rng.normal(0, 1, 400))
+        high = close + rng.uniform(0, 1.5, 400)
+        low = close - rng.uniform(0, 1.5, 400)
+        df = pd.DataFrame({"Open": close, "High": high, "Low": low, "Close": close}, index=dates)
+        t_events = dates[np.sort(rng.choice(400, size=80, replace=False))]
+        sides = pd.Series(rng.choice([1, -1], size=80), index=t_events)
+        return df, t_events, sides
+
+    def test_grid_matches_individual_runs(self, random_walk):
+        """Cada combinación de la rejilla coincide con get_atr_labels."""
+        df, t_events, sides = random_walk
+        tp_factors, sl_factors, time_limits = [0.5, 1.0, 2.5], [0.5, 1.5], [1, 12, 48]
+
+        grid = label_grid(df, t_events, sides, tp_factors=tp_factors, sl_factors=sl_factors,
+                          time_limits=time_limits, as_array=True)
+
+        assert grid.shape == (3, 2, 3, len(t_events))
+        for i, tp in enumerate(tp_factors):
+            for j, sl in enumerate(sl_factors):
+                for k, tl in enumerate(time_limits):
+                    expected = get_atr_labels(df, t_events, sides=sides, tp_factor=tp,
+                                              sl_factor=sl, time_limit=tl)
+                    np.testing.assert_array_equal(grid[i, j, k], expected.to_numpy())
+
+    def test_long_format(self, random_walk):
+        """El formato largo tiene una fila por (tp, sl, time_limit, evento)."""
+        df, t_events, sides = random_walk
+
+        result = label_grid(df, t_events, sides, tp_factors=[1.0, 2.0], sl_factors=[1.0],
+                            time_limits=[24])
+
+        assert list(result.columns) == ['tp_factor', 'sl_factor', 'time_limit', 'event', 'label']
+        assert len(result) == 2 * len(t_events)
+        subset = result[result['tp_factor'] == 2.0].set_index('event')['label']
+        expected = get_atr_labels(df, t_events, sides=sides, tp_factor=2.0, sl_factor=1.0)
+        np.testing.assert_array_equal(subset.to_numpy(), expected.to_numpy())
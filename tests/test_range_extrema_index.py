@@ -0,0 +1,71 @@
+"""Tests para RangeExtremaIndex (sparse table de extremos en rango)."""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_manager.building_blocks.labelers.range_extrema_index import RangeExtremaIndex
+
+
+def _brute_first(segment, start, predicate):
+    hits = np.flatnonzero(predicate(segment))
+    return start + hits[0] if len(hits) else -1
+
+
+class TestRangeExtremaIndex:
+
+    @pytest.fixture
+    def series(self):
+        rng = np.random.default_rng(5)
+        values = rng.normal(size=257)
+        values[rng.random(257) < 0.05] = np.nan
+        return values
+
+    @pytest.fixture
+    def queries(self, series):
+        rng = np.random.default_rng(6)
+        starts = rng.integers(0, len(series), 400)
+        ends = np.minimum(starts + rng.integers(0, 200, 400), len(series) - 1)
+        levels = rng.normal(size=400) * 1.5
+        return starts, ends, levels
+
+    def test_range_max_and_min(self, series, queries):
+        """Los extremos en rango coinciden con nanmax/nanmin del segmento."""
+        starts, ends, _ = queries
+        index = RangeExtremaIndex(series)
+
+        maxs = index.range_max(starts, ends)
+        mins = index.range_min(starts, ends)
+
+        for i, (s, e) in enumerate(zip(starts, ends)):
+            segment = series[s:e + 1]
+            if np.isnan(segment).all():
+                assert maxs[i] == -np.inf and mins[i] == np.inf
+            else:
+                assert maxs[i] == np.nanmax(segment)
+                assert mins[i] == np.nanmin(segment)
+
+    def test_first_reach(self, series, queries):
+        """La primera posición que alcanza el nivel coincide con la búsqueda lineal."""
+        starts, ends, levels = queries
+        index = RangeExtremaIndex(series)
+
+        above = index.first_at_or_above(starts, ends, levels)
+        below = index.first_at_or_below(starts, ends, levels)
+
+        for i, (s, e, level) in enumerate(zip(starts, ends, levels)):
+            segment = series[s:e + 1]
+            assert above[i] == _brute_first(segment, s, lambda x: x >= level)
+            assert below[i] == _brute_first(segment, s, lambda x: x <= level)
+
+    def test_empty_ranges_and_nan_levels(self):
+        """Rangos vacíos y niveles NaN nunca devuelven una posición."""
+        index = RangeExtremaIndex(np.array([1.0, 2.0, 3.0]))
+
+        assert index.first_at_or_above([2], [1], [0.0]).tolist() == [-1]
+        assert index.first_at_or_above([0], [2], [np.nan]).tolist() == [-1]
+        assert index.range_max([3], [2]).tolist() == [-np.inf]
@@ -0,0 +1,51 @@
+"""Tests para el percentil móvil exacto (RollingQuantile / rolling_percentile)."""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from trading_manager.building_blocks.detectors.rolling_quantile import RollingQuantile, rolling_percentile
+
+
+class TestRollingPercentile:
+
+    @pytest.fixture
+    def volume(self):
+        """Volumen log-normal con NaN sueltos y un tramo constante."""
+        rng = np.random.default_rng(1)
+        values = rng.lognormal(mean=3, sigma=1, size=2000)
+        values[rng.random(2000) < 0.01] = np.nan
+        values[300:380] = 42.0
+        return values
+
+    @pytest.mark.parametrize("window,q", [(50, 80), (50, 95), (7, 33), (1, 50), (10, 0), (10, 100)])
+    def test_matches_pandas_rolling_apply(self, volume, window, q):
+        """Resultado idéntico al rolling.apply con np.percentile original."""
+        expected = pd.Series(volume).rolling(window=window).apply(lambda x: np.percentile(x, q)).to_numpy()
+
+        result = rolling_percentile(volume, window, q)
+
+        np.testing.assert_array_equal(result, expected)
+
+    def test_incremental_update_and_state(self, volume):
+        """update() incremental y restauración desde snapshot dan los mismos valores."""
+        batch = rolling_percentile(volume, 20, 80)
+        rq = RollingQuantile(20, 80)
+        for value in volume[:1000]:
+            rq.update(value)
+
+        restored = RollingQuantile.from_state(rq.get_state())
+        tail = [restored.update(v) for v in volume[1000:]]
+
+        np.testing.assert_array_equal(np.array(tail), batch[1000:])
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            RollingQuantile(0, 50)
+        with pytest.raises(ValueError):
+            RollingQuantile(10, 150)
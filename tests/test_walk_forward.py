@@ -0,0 +1,78 @@
+"""Tests para la validación walk-forward / k-fold purgado del Oráculo."""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.ensemble import RandomForestClassifier
+from oracle.building_blocks.oracles.walk_forward import (
+    WalkForwardValidator, purged_kfold_splits, walk_forward_splits
+)
+
+
+@pytest.fixture
+def samples():
+    starts = pd.date_range("2024-01-01", periods=120, freq="h")
+    ends = starts + pd.Timedelta(hours=5)
+    return starts.to_numpy(), ends.to_numpy()
+
+
+def test_walk_forward_trains_only_on_resolved_past(samples):
+    starts, ends = samples
+    splits = walk_forward_splits(starts, ends, n_splits=4)
+    assert len(splits) == 4
+    for train_idx, test_idx in splits:
+        # Ninguna etiqueta de train termina después de que empiece el test
+        assert ends[train_idx].max() < starts[test_idx[0]]
+    # Ventana expansiva
+    assert [len(tr) for tr, _ in splits] == sorted(len(tr) for tr, _ in splits)
+
+    rolling = walk_forward_splits(starts, ends, n_splits=4, max_train_size=10)
+    assert all(len(tr) <= 10 for tr, _ in rolling)
+
+
+def test_purged_kfold_removes_overlap_and_embargo(samples):
+    starts, ends = samples
+    embargo = np.timedelta64(3, 'h')
+    splits = purged_kfold_splits(starts, ends, n_splits=4, embargo=embargo)
+    assert len(splits) == 4
+    covered = np.concatenate([te for _, te in splits])
+    np.testing.assert_array_equal(covered, np.arange(len(starts)))
+
+    for train_idx, test_idx in splits:
+        test_start, test_end = starts[test_idx[0]], ends[test_idx].max()
+        assert not np.any((starts[train_idx] <= test_end) & (ends[train_idx] >= test_start))
+        assert not np.any((starts[train_idx] > test_end) & (starts[train_idx] <= test_end + embargo))
+
+    # Fold intermedio: se purgan las 5 muestras previas y 5 + 3 posteriores
+    train_idx, test_idx = splits[1]
+    assert len(train_idx) == len(starts) - len(test_idx) - 5 - 8
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(2)
+    X = pd.DataFrame(rng.normal(size=(400, 4)), columns=list("abcd"))
+    y = (X["a"] + rng.normal(0, 0.7, len(X)) > 0).astype(int)
+    return X, y
+
+
+def test_parallel_run_matches_sequential(dataset):
+    X, y = dataset
+    idx = np.arange(len(X))
+    splits = walk_forward_splits(idx, idx + 3, n_splits=3)
+    estimator = RandomForestClassifier(n_estimators=10, random_state=0)
+
+    sequential = WalkForwardValidator(estimator, n_jobs=1).run(X, y, splits)
+    parallel = WalkForwardValidator(estimator, n_jobs=2).run(X, y, splits)
+
+    assert list(sequential.folds['fold']) == [0, 1, 2]
+    metrics = ['n_train', 'n_test', 'accuracy', 'balanced_accuracy', 'precision', 'recall', 'f1', 'roc_auc']
+    pd.testing.assert_frame_equal(sequential.folds[metrics], parallel.folds[metrics])
+    assert parallel.wall_seconds > 0
+    assert 'accuracy' in parallel.summary()
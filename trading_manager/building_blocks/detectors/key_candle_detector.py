@@ -1,12 +1,112 @@
 import pandas as pd
 import numpy as np
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple, Union
+
+from trading_manager.building_blocks.detectors.rolling_quantile import RollingQuantile, rolling_percentile
 
 logger = logging.getLogger(__name__)
 
+REQUIRED_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+@dataclass
+class KeyCandleSignals:
+    """
+    Resultado compacto de la detección, sin columnas auxiliares en el DataFrame.
+
+    Attributes:
+        index: Índice de las velas analizadas.
+        is_key_candle: Máscara booleana de velas clave.
+        signal_side: Lado de la señal por vela (int8: 1 Long, -1 Short).
+        indicators: DataFrame opcional (float32) con volume_threshold,
+            body_percentage y ema, más la columna booleana is_uptrend.
+    """
+    index: pd.Index
+    is_key_candle: np.ndarray
+    signal_side: np.ndarray
+    indicators: Optional[pd.DataFrame] = None
+
+    @property
+    def t_events(self) -> pd.Index:
+        """Timestamps de las velas clave."""
+        return self.index[self.is_key_candle]
+
+    @property
+    def sides(self) -> pd.Series:
+        """Lado de cada vela clave, indexado por timestamp."""
+        return pd.Series(self.signal_side[self.is_key_candle], index=self.t_events, name='signal_side')
+
+
 class SignalDetector:
     """Detecta señales basadas en características específicas de las velas."""
 
+    @staticmethod
+    def _has_required_columns(df: pd.DataFrame) -> bool:
+        for col in REQUIRED_COLUMNS:
+            if col not in df.columns:
+                logger.error(f"Columna faltante: {col}")
+                return False
+        return True
+
+    @staticmethod
+    def _compute_signals(
+        df: pd.DataFrame,
+        volume_lookback: int,
+        volume_percentile_threshold: int,
+        body_percentile_threshold: int,
+        ema_period: int,
+        reversal_mode: bool
+    ) -> Dict[str, np.ndarray]:
+        """Calcula indicadores y señales como arrays, sin modificar `df`."""
+        open_ = df['Open'].to_numpy(dtype=np.float64)
+        close = df['Close'].to_numpy(dtype=np.float64)
+        volume = df['Volume'].to_numpy(dtype=np.float64)
+
+        # 1. Calcular el umbral de volumen (percentil móvil, mismos valores que np.percentile)
+        volume_threshold = rolling_percentile(volume, volume_lookback, volume_percentile_threshold)
+
+        # 2. Cálculos de tamaño de vela
+        body_size = np.abs(close - open_)
+        candle_range = df['High'].to_numpy(dtype=np.float64) - df['Low'].to_numpy(dtype=np.float64)
+
+        # Evitar división por cero
+        with np.errstate(divide='ignore', invalid='ignore'):
+            body_percentage = np.where(candle_range > 0, (body_size / candle_range) * 100, 100)
+
+        # 3. Filtro de Tendencia (EMA)
+        ema = df['Close'].ewm(span=ema_period, adjust=False).mean().to_numpy()
+        is_uptrend = close > ema
+
+        # 4. Detección de la vela clave con alineación de tendencia (o reversión)
+        is_bullish = close >= open_
+
+        if reversal_mode:
+            # Lógica de Reversión: Bullish en Downtrend, Bearish en Uptrend
+            trend_alignment = (is_bullish != is_uptrend)
+        else:
+            # Lógica de Continuación: Bullish en Uptrend, Bearish en Downtrend
+            trend_alignment = (is_bullish == is_uptrend)
+
+        is_key_candle = (
+            (volume >= volume_threshold) &
+            (body_percentage <= body_percentile_threshold) &
+            trend_alignment
+        )
+
+        return {
+            'volume_threshold': volume_threshold,
+            'body_size': body_size,
+            'candle_range': candle_range,
+            'body_percentage': body_percentage,
+            'ema': ema,
+            'is_uptrend': is_uptrend,
+            'is_key_candle': is_key_candle,
+            'is_bullish': is_bullish,
+        }
+
     @staticmethod
     def detect_key_candles(
         df: pd.DataFrame,
@@ -18,7 +118,11 @@ class SignalDetector:
     ) -> pd.DataFrame:
         """
         Detecta 'velas clave' basadas en volumen inusual, cuerpo pequeño y tendencia.
-        
+
+        Añade al DataFrame recibido las columnas auxiliares del cálculo. Para
+        no modificar la entrada ni reservar esas columnas, usar
+        `detect_key_candles_compact`.
+
         Args:
             df: DataFrame con columnas Open, High, Low, Close, Volume.
             volume_lookback: Periodo para calcular el percentil de volumen.
@@ -27,7 +131,7 @@ class SignalDetector:
             ema_period: Periodo para la Media Móvil Exponencial (filtro de tendencia).
             reversal_mode: Si es True, busca reversiones (señal contra tendencia).
                            Si es False, busca continuación (señal a favor de tendencia).
-            
+
         Returns:
             DataFrame con la columna 'is_key_candle'.
         """
@@ -36,51 +140,271 @@ class SignalDetector:
             return df
 
         # Asegurar que las columnas necesarias existen
-        required_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-        for col in required_cols:
-            if col not in df.columns:
-                logger.error(f"Columna faltante: {col}")
-                return df
+        if not SignalDetector._has_required_columns(df):
+            return df
 
-        # 1. Calcular el umbral de volumen (percentil móvil)
-        df['volume_threshold'] = df['Volume'].rolling(window=volume_lookback).apply(
-            lambda x: np.percentile(x, volume_percentile_threshold)
+        signals = SignalDetector._compute_signals(
+            df, volume_lookback, volume_percentile_threshold,
+            body_percentile_threshold, ema_period, reversal_mode
         )
+        for col in ('volume_threshold', 'body_size', 'candle_range', 'body_percentage',
+                    'ema', 'is_uptrend', 'is_key_candle'):
+            df[col] = signals[col]
 
-        # 2. Cálculos de tamaño de vela
-        df['body_size'] = abs(df['Close'] - df['Open'])
-        df['candle_range'] = df['High'] - df['Low']
-        
-        # Evitar división por cero
-        df['body_percentage'] = np.where(
-            df['candle_range'] > 0,
-            (df['body_size'] / df['candle_range']) * 100,
-            100
+        # 5. Determinar el lado de la señal (1 = Long, -1 = Short)
+        df['signal_side'] = np.where(signals['is_bullish'], 1, -1)
+
+        mode_str = "REVERSIÓN" if reversal_mode else "CONTINUACIÓN"
+        logger.info(f"Detección completada ({mode_str}). Velas clave encontradas: {df['is_key_candle'].sum()}")
+        return df
+
+    @staticmethod
+    def detect_key_candles_compact(
+        df: pd.DataFrame,
+        volume_lookback: int = 50,
+        volume_percentile_threshold: int = 80,
+        body_percentile_threshold: int = 30,
+        ema_period: int = 200,
+        reversal_mode: bool = True,
+        return_indicators: bool = False
+    ) -> Optional[KeyCandleSignals]:
+        """
+        Igual que `detect_key_candles`, pero sin tocar el DataFrame de entrada.
+
+        Devuelve solo la máscara booleana y el lado (int8), y opcionalmente un
+        DataFrame separado de indicadores en float32, evitando que pandas
+        consolide y copie los bloques de un DataFrame grande.
+
+        Args:
+            return_indicators: Si es True incluye el DataFrame de indicadores.
+
+        Returns:
+            KeyCandleSignals, o None si faltan columnas.
+        """
+        if not SignalDetector._has_required_columns(df):
+            return None
+
+        signals = SignalDetector._compute_signals(
+            df, volume_lookback, volume_percentile_threshold,
+            body_percentile_threshold, ema_period, reversal_mode
         )
+        indicators = None
+        if return_indicators:
+            indicators = pd.DataFrame({
+                'volume_threshold': signals['volume_threshold'].astype(np.float32),
+                'body_percentage': signals['body_percentage'].astype(np.float32),
+                'ema': signals['ema'].astype(np.float32),
+                'is_uptrend': signals['is_uptrend'],
+            }, index=df.index)
 
-        # 3. Filtro de Tendencia (EMA)
-        df['ema'] = df['Close'].ewm(span=ema_period, adjust=False).mean()
-        df['is_uptrend'] = df['Close'] > df['ema']
+        result = KeyCandleSignals(
+            index=df.index,
+            is_key_candle=signals['is_key_candle'],
+            signal_side=np.where(signals['is_bullish'], 1, -1).astype(np.int8),
+            indicators=indicators,
+        )
+        mode_str = "REVERSIÓN" if reversal_mode else "CONTINUACIÓN"
+        logger.info(f"Detección completada ({mode_str}). Velas clave encontradas: {result.is_key_candle.sum()}")
+        return result
 
-        # 4. Detección de la vela clave con alineación de tendencia (o reversión)
-        is_bullish = df['Close'] >= df['Open']
-        
-        if reversal_mode:
-            # Lógica de Reversión: Bullish en Downtrend, Bearish en Uptrend
-            trend_alignment = (is_bullish != df['is_uptrend'])
+    @staticmethod
+    def detect_key_candles_panel(
+        data: Union[pd.DataFrame, Mapping[str, pd.DataFrame]],
+        volume_lookback: int = 50,
+        volume_percentile_threshold: int = 80,
+        body_percentile_threshold: int = 30,
+        ema_period: int = 200,
+        reversal_mode: bool = True,
+        symbol_col: str = 'symbol',
+        time_col: str = 'Open_Time',
+        max_workers: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Detecta velas clave en varios símbolos a la vez.
+
+        Args:
+            data: Panel en formato largo (columnas o MultiIndex `symbol_col` y
+                `time_col`) o diccionario {símbolo: DataFrame OHLCV}.
+            symbol_col: Nombre de la columna/nivel con el símbolo.
+            time_col: Nombre de la columna/nivel con el tiempo de apertura.
+            max_workers: Si es > 1, reparte los símbolos en un pool de procesos.
+            (El resto de parámetros son los de `detect_key_candles`.)
+
+        Returns:
+            Tabla de eventos con columnas `symbol_col`, `time_col` y
+            'signal_side', ordenada por símbolo y tiempo, lista para el labeler.
+        """
+        params = (volume_lookback, volume_percentile_threshold, body_percentile_threshold,
+                  ema_period, reversal_mode)
+        tasks = [(symbol, frame) + params for symbol, frame in _iter_panel_groups(data, symbol_col, time_col)]
+
+        if max_workers is not None and max_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_detect_panel_group, tasks))
         else:
-            # Lógica de Continuación: Bullish en Uptrend, Bearish en Downtrend
-            trend_alignment = (is_bullish == df['is_uptrend'])
+            results = [_detect_panel_group(task) for task in tasks]
 
-        df['is_key_candle'] = (
-            (df['Volume'] >= df['volume_threshold']) & 
-            (df['body_percentage'] <= body_percentile_threshold) &
-            trend_alignment
-        )
+        events = [
+            pd.DataFrame({symbol_col: symbol, time_col: t_events, 'signal_side': sides})
+            for symbol, t_events, sides in results if len(t_events)
+        ]
+        if not events:
+            return pd.DataFrame({symbol_col: pd.Series(dtype=object), time_col: pd.Series(dtype='datetime64[ns]'),
+                                 'signal_side': pd.Series(dtype=np.int8)})
+        table = pd.concat(events, ignore_index=True)
+        logger.info(f"Detección multi-símbolo completada: {len(table)} eventos en {len(tasks)} símbolos.")
+        return table
 
-        # 5. Determinar el lado de la señal (1 = Long, -1 = Short)
-        df['signal_side'] = np.where(is_bullish, 1, -1)
 
-        mode_str = "REVERSIÓN" if reversal_mode else "CONTINUACIÓN"
-        logger.info(f"Detección completada ({mode_str}). Velas clave encontradas: {df['is_key_candle'].sum()}")
-        return df
+def _iter_panel_groups(
+    data: Union[pd.DataFrame, Mapping[str, pd.DataFrame]],
+    symbol_col: str,
+    time_col: str
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """Recorre un panel devolviendo (símbolo, DataFrame indexado y ordenado por tiempo)."""
+    if isinstance(data, Mapping):
+        groups = data.items()
+    elif isinstance(data.index, pd.MultiIndex) and symbol_col in data.index.names:
+        groups = ((symbol, frame.droplevel(symbol_col)) for symbol, frame in data.groupby(level=symbol_col, sort=True))
+    else:
+        groups = data.groupby(symbol_col, sort=True)
+
+    for symbol, frame in groups:
+        if time_col in frame.columns:
+            frame = frame.set_index(time_col)
+        if not frame.index.is_monotonic_increasing:
+            frame = frame.sort_index()
+        yield symbol, frame
+
+
+def _detect_panel_group(task: tuple) -> Tuple[str, pd.Index, np.ndarray]:
+    """Trabajo por símbolo del modo panel (nivel de módulo para poder usarlo en un pool)."""
+    symbol, frame, *params = task
+    signals = SignalDetector.detect_key_candles_compact(frame, *params)
+    if signals is None:
+        return symbol, frame.index[:0], np.empty(0, dtype=np.int8)
+    return symbol, signals.t_events, signals.signal_side[signals.is_key_candle]
+
+
+class StreamingKeyCandleDetector:
+    """
+    Versión incremental de `SignalDetector.detect_key_candles` para uso en vivo.
+
+    Procesa una vela por llamada a `update`: la EMA avanza de forma recursiva
+    y el umbral de volumen se mantiene con una ventana ordenada, por lo que el
+    coste por vela es O(log w) en lugar de recalcular todo el histórico.
+    Los resultados coinciden con `detect_key_candles` sobre la misma serie.
+    El estado se puede guardar con `get_state` y restaurar con `from_state`
+    para que un reinicio no tenga que reprocesar el histórico.
+    """
+
+    def __init__(
+        self,
+        volume_lookback: int = 50,
+        volume_percentile_threshold: int = 80,
+        body_percentile_threshold: int = 30,
+        ema_period: int = 200,
+        reversal_mode: bool = True
+    ):
+        self.volume_lookback = volume_lookback
+        self.volume_percentile_threshold = volume_percentile_threshold
+        self.body_percentile_threshold = body_percentile_threshold
+        self.ema_period = ema_period
+        self.reversal_mode = reversal_mode
+
+        self._volume_window = RollingQuantile(volume_lookback, volume_percentile_threshold)
+        # Mismos coeficientes que pandas ewm(span=..., adjust=False)
+        com = (ema_period - 1) / 2.0
+        self._alpha = 1.0 / (1.0 + com)
+        self._ema = float('nan')
+        self._ema_weight = 1.0
+        self.bars_processed = 0
+
+    def _update_ema(self, close: float) -> float:
+        """Avanza la EMA replicando la recursión de pandas (adjust=False, ignore_na=False)."""
+        if self._ema != self._ema:
+            self._ema = close
+            return self._ema
+        # El peso de la EMA previa decae también en las velas sin cierre (NaN)
+        self._ema_weight *= 1.0 - self._alpha
+        if close == close:
+            if self._ema != close:
+                self._ema = (self._ema_weight * self._ema + self._alpha * close) / (self._ema_weight + self._alpha)
+            self._ema_weight = 1.0
+        return self._ema
+
+    def update(self, bar: Mapping[str, float]) -> Dict[str, Any]:
+        """
+        Procesa una nueva vela.
+
+        Args:
+            bar: Mapping (dict, Series) con Open, High, Low, Close y Volume.
+
+        Returns:
+            Diccionario con is_key_candle, signal_side y los indicadores
+            intermedios (volume_threshold, body_percentage, ema, is_uptrend).
+        """
+        open_, high, low = float(bar['Open']), float(bar['High']), float(bar['Low'])
+        close, volume = float(bar['Close']), float(bar['Volume'])
+
+        volume_threshold = self._volume_window.update(volume)
+        body_size = abs(close - open_)
+        candle_range = high - low
+        body_percentage = (body_size / candle_range) * 100 if candle_range > 0 else 100.0
+        ema = self._update_ema(close)
+        is_uptrend = close > ema
+        is_bullish = close >= open_
+
+        if self.reversal_mode:
+            trend_alignment = is_bullish != is_uptrend
+        else:
+            trend_alignment = is_bullish == is_uptrend
+
+        self.bars_processed += 1
+        return {
+            'is_key_candle': bool(
+                volume >= volume_threshold
+                and body_percentage <= self.body_percentile_threshold
+                and trend_alignment
+            ),
+            'signal_side': 1 if is_bullish else -1,
+            'volume_threshold': volume_threshold,
+            'body_percentage': body_percentage,
+            'ema': ema,
+            'is_uptrend': is_uptrend,
+        }
+
+    @property
+    def is_warm(self) -> bool:
+        """True cuando la ventana de volumen está completa."""
+        return self.bars_processed >= self.volume_lookback
+
+    def get_state(self) -> Dict[str, Any]:
+        """Snapshot serializable (JSON) de parámetros y estado interno."""
+        return {
+            'volume_lookback': self.volume_lookback,
+            'volume_percentile_threshold': self.volume_percentile_threshold,
+            'body_percentile_threshold': self.body_percentile_threshold,
+            'ema_period': self.ema_period,
+            'reversal_mode': self.reversal_mode,
+            'ema': None if self._ema != self._ema else self._ema,
+            'ema_weight': self._ema_weight,
+            'bars_processed': self.bars_processed,
+            'volume_window': self._volume_window.get_state(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'StreamingKeyCandleDetector':
+        """Restaura un detector desde `get_state` sin reprocesar el histórico."""
+        detector = cls(
+            volume_lookback=state['volume_lookback'],
+            volume_percentile_threshold=state['volume_percentile_threshold'],
+            body_percentile_threshold=state['body_percentile_threshold'],
+            ema_period=state['ema_period'],
+            reversal_mode=state['reversal_mode'],
+        )
+        detector._ema = float('nan') if state['ema'] is None else state['ema']
+        detector._ema_weight = state.get('ema_weight', 1.0)
+        detector.bars_processed = state['bars_processed']
+        detector._volume_window = RollingQuantile.from_state(state['volume_window'])
+        return detector
@@ -0,0 +1,122 @@
+import bisect
+import math
+import logging
+from collections import deque
+from typing import Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RollingQuantile:
+    """
+    Percentil móvil exacto sobre una ventana deslizante de tamaño fijo.
+
+    Mantiene la ventana ordenada: cada nuevo valor se inserta con búsqueda
+    binaria (O(log w)) y el valor que sale se localiza igual y se elimina.
+    Para los tamaños de ventana que usa el detector (decenas de velas) una
+    lista ordenada con `bisect` es más rápida en CPython que montículos o
+    skip lists, porque el desplazamiento de la inserción es un único memmove.
+
+    El resultado es idéntico bit a bit a `np.percentile(ventana, q)` con
+    interpolación lineal. Igual que `Series.rolling(window).apply`, devuelve
+    NaN hasta completar la ventana o mientras la ventana contenga algún NaN.
+    """
+
+    def __init__(self, window: int, q: float):
+        if window < 1:
+            raise ValueError("window debe ser >= 1.")
+        if not 0 <= q <= 100:
+            raise ValueError("q debe estar entre 0 y 100.")
+        self.window = int(window)
+        self.q = q
+        self._values: deque = deque()
+        self._sorted: list = []
+        self._nan_count = 0
+
+        # Índice virtual de np.percentile (método 'linear'): (n - 1) * q / 100
+        virtual_index = (self.window - 1) * (q / 100)
+        if virtual_index >= self.window - 1:
+            self._lower, self._gamma = self.window - 1, 0.0
+            self._upper = self.window - 1
+        else:
+            self._lower = int(math.floor(virtual_index))
+            self._gamma = virtual_index - self._lower
+            self._upper = self._lower + 1
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def update(self, value: float) -> float:
+        """Añade un valor a la ventana y devuelve el percentil actual."""
+        value = float(value)
+        self._values.append(value)
+        if value != value:  # NaN
+            self._nan_count += 1
+        else:
+            bisect.insort(self._sorted, value)
+
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if old != old:
+                self._nan_count -= 1
+            else:
+                del self._sorted[bisect.bisect_left(self._sorted, old)]
+
+        return self.value
+
+    @property
+    def value(self) -> float:
+        """Percentil de la ventana actual (NaN si está incompleta o tiene NaN)."""
+        if len(self._values) < self.window or self._nan_count:
+            return float('nan')
+        a = self._sorted[self._lower]
+        b = self._sorted[self._upper]
+        # Misma interpolación que numpy (_lerp) para resultados idénticos
+        diff = b - a
+        if self._gamma >= 0.5:
+            return b - diff * (1 - self._gamma)
+        return a + diff * self._gamma
+
+    def get_state(self) -> dict:
+        """Estado serializable (JSON) de la ventana."""
+        return {
+            "window": self.window,
+            "q": self.q,
+            "values": [None if v != v else v for v in self._values],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'RollingQuantile':
+        """Reconstruye la ventana desde `get_state` sin reprocesar el histórico."""
+        instance = cls(state["window"], state["q"])
+        for v in state["values"]:
+            instance.update(float('nan') if v is None else v)
+        return instance
+
+
+def rolling_percentile(values: Iterable[float], window: int, q: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Calcula el percentil móvil de una serie completa.
+
+    Equivale a `pd.Series(values).rolling(window).apply(lambda x: np.percentile(x, q))`
+    con los mismos valores, pero sin llamar a Python/NumPy una vez por ventana.
+
+    Args:
+        values: Serie de valores (array, lista o Series).
+        window: Tamaño de la ventana.
+        q: Percentil (0-100).
+        out: Array opcional donde escribir el resultado.
+
+    Returns:
+        Array float64 con el percentil de cada ventana (NaN durante el warm-up).
+    """
+    data = np.asarray(values, dtype=np.float64)
+    if out is None:
+        out = np.empty(len(data), dtype=np.float64)
+    rq = RollingQuantile(window, q)
+    update = rq.update
+    for i, value in enumerate(data.tolist()):
+        out[i] = update(value)
+    return out
@@ -1,10 +1,245 @@
 import pandas as pd
 import numpy as np
 import logging
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict, Any, Sequence, Union
+from numpy.lib.stride_tricks import sliding_window_view
+
+from trading_manager.building_blocks.labelers.range_extrema_index import RangeExtremaIndex
 
 logger = logging.getLogger(__name__)
 
+
+def _compute_atr(prices: pd.DataFrame, atr_period: int) -> np.ndarray:
+    """Calcula el ATR (media móvil simple del True Range) como array de NumPy."""
+    high_low = prices['High'] - prices['Low']
+    high_close = abs(prices['High'] - prices['Close'].shift())
+    low_close = abs(prices['Low'] - prices['Close'].shift())
+
+    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    return tr.rolling(window=atr_period).mean().to_numpy(dtype=np.float64)
+
+
+def _event_positions(index: pd.Index, t_events: pd.Index) -> np.ndarray:
+    """
+    Traduce timestamps de eventos a posiciones enteras en `index`.
+
+    Con índices duplicados se usa la primera aparición (igual que `get_loc`).
+    Los eventos que no existen en el índice reciben -1.
+    """
+    if index.is_unique:
+        return index.get_indexer(t_events)
+    first = ~index.duplicated(keep='first')
+    positions = np.flatnonzero(first)
+    lookup = index[first].get_indexer(t_events)
+    return np.where(lookup >= 0, positions[lookup], -1)
+
+
+def _locate_events(index: pd.Index, t_events: pd.Index) -> Tuple[pd.Index, np.ndarray]:
+    """Devuelve los eventos presentes en `index` y sus posiciones enteras."""
+    positions = _event_positions(index, t_events)
+    found = positions >= 0
+    if not found.all():
+        logger.warning(f"{(~found).sum()} eventos no encontrados en el índice de precios. Se omiten.")
+        t_events = t_events[found]
+        positions = positions[found]
+    return t_events, positions
+
+
+def _event_sides(sides: Optional[pd.Series], t_events: pd.Index) -> np.ndarray:
+    """Devuelve el lado (1 Long, -1 Short) de cada evento como array."""
+    if sides is None:
+        return np.ones(len(t_events), dtype=np.int64)
+    if not sides.index.is_unique:
+        sides = sides[~sides.index.duplicated(keep='first')]
+    values = sides.reindex(t_events).to_numpy()
+    # Cualquier valor distinto de 1 se trata como Short (igual que el bucle original)
+    return np.where(values == 1, 1, -1)
+
+
+def _forward_windows(values: np.ndarray, positions: np.ndarray, time_limit: int) -> np.ndarray:
+    """
+    Construye la matriz (eventos x time_limit) con los valores de las velas
+    posteriores a cada evento, usando una vista con strides sobre el array.
+
+    Las velas que caen fuera de la serie se rellenan con NaN, de modo que
+    nunca tocan ninguna barrera.
+    """
+    padded = np.concatenate([values, np.full(time_limit, np.nan)])
+    view = sliding_window_view(padded[1:], time_limit)
+    return view[positions]
+
+
+def _first_touch(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    sides: np.ndarray,
+    tp_barrier: np.ndarray,
+    sl_barrier: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula, para cada fila, el primer offset (1-based) en que se toca el TP y el SL.
+
+    Args:
+        highs, lows: Matrices (eventos x time_limit) de precios futuros.
+        sides: Lado de cada evento (1 Long, -1 Short).
+        tp_barrier, sl_barrier: Nivel de cada barrera por evento.
+
+    Returns:
+        Tupla (first_tp, first_sl). Un valor de time_limit + 1 indica que la
+        barrera no se tocó dentro de la ventana.
+    """
+    no_touch = highs.shape[1] + 1
+    if highs.shape[1] == 0:
+        # Ventana vacía (time_limit=0): ninguna barrera puede tocarse
+        untouched = np.full(highs.shape[0], no_touch, dtype=np.int64)
+        return untouched, untouched.copy()
+
+    is_long = (sides == 1)[:, None]
+    tp_col = tp_barrier[:, None]
+    sl_col = sl_barrier[:, None]
+
+    # En Long el TP está arriba y el SL abajo; en Short al revés.
+    tp_hit = np.where(is_long, highs >= tp_col, lows <= tp_col)
+    sl_hit = np.where(is_long, lows <= sl_col, highs >= sl_col)
+
+    first_tp = np.where(tp_hit.any(axis=1), tp_hit.argmax(axis=1) + 1, no_touch)
+    first_sl = np.where(sl_hit.any(axis=1), sl_hit.argmax(axis=1) + 1, no_touch)
+    return first_tp, first_sl
+
+
+def _first_touch_indexed(
+    high_index: RangeExtremaIndex,
+    low_index: RangeExtremaIndex,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    sides: np.ndarray,
+    tp_barrier: np.ndarray,
+    sl_barrier: np.ndarray,
+    window: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Equivalente a `_first_touch` usando índices de extremos en rango, con un
+    coste O(log n) por evento independiente del tamaño de la ventana.
+    Devuelve los mismos offsets (1-based, window + 1 si no hay toque).
+    """
+    no_touch = window + 1
+    first_tp = np.full(len(starts), no_touch, dtype=np.int64)
+    first_sl = np.full(len(starts), no_touch, dtype=np.int64)
+
+    for mask, tp_search, sl_search in (
+        (sides == 1, high_index.first_at_or_above, low_index.first_at_or_below),
+        (sides != 1, low_index.first_at_or_below, high_index.first_at_or_above),
+    ):
+        if not mask.any():
+            continue
+        s, e = starts[mask], ends[mask]
+        tp_hit = tp_search(s, e, tp_barrier[mask])
+        sl_hit = sl_search(s, e, sl_barrier[mask])
+        first_tp[mask] = np.where(tp_hit >= 0, tp_hit - s + 1, no_touch)
+        first_sl[mask] = np.where(sl_hit >= 0, sl_hit - s + 1, no_touch)
+    return first_tp, first_sl
+
+
+def _use_sparse_index(n_events: int, window: int, span: int) -> bool:
+    """Elige el índice de extremos cuando las ventanas costarían más que construirlo."""
+    return n_events * window > span * max(int(span).bit_length(), 1)
+
+
+def _run_barriers(
+    prices: pd.DataFrame,
+    t_events: pd.Index,
+    sides: Optional[pd.Series],
+    atr_period: int,
+    tp_factor: float,
+    sl_factor: float,
+    time_limit: int,
+    engine: str = "auto"
+) -> Dict[str, Any]:
+    """
+    Pasada vectorizada común del Triple Barrier Method.
+
+    Args:
+        engine: "window" construye las ventanas (eventos x time_limit),
+            "sparse" usa `RangeExtremaIndex` (coste independiente del horizonte)
+            y "auto" elige el más barato según eventos, horizonte y velas.
+
+    Returns:
+        Diccionario con los eventos localizados, sus barreras, las ventanas
+        futuras de High/Low (o los índices de extremos), el primer toque de
+        cada barrera y la etiqueta.
+    """
+    if engine not in ("auto", "window", "sparse"):
+        raise ValueError(f"engine desconocido: {engine}")
+
+    # 1. Calcular ATR (Average True Range)
+    atr = _compute_atr(prices, atr_period)
+
+    # 2. Localizar eventos (los que no están en el índice se descartan)
+    t_events, positions = _locate_events(prices.index, t_events)
+    event_sides = _event_sides(sides, t_events)
+    window = max(int(time_limit), 0)
+
+    # 3. Definir barreras según el lado
+    entry_price = prices['Close'].to_numpy(dtype=np.float64)[positions]
+    current_atr = atr[positions]
+    tp_barrier = entry_price + event_sides * current_atr * tp_factor
+    sl_barrier = entry_price - event_sides * current_atr * sl_factor
+
+    # 4. Primer toque de cada barrera (ventanas futuras o índice de extremos)
+    highs = lows = high_index = low_index = None
+    span_start = 0
+    if len(positions) > 0 and window > 0:
+        span_start = int(positions.min())
+        span_end = min(int(positions.max()) + window, len(prices) - 1)
+        if engine == "auto":
+            engine = "sparse" if _use_sparse_index(len(positions), window, span_end - span_start + 1) else "window"
+    else:
+        engine = "window"
+
+    if engine == "sparse":
+        span = slice(span_start, span_end + 1)
+        high_index = RangeExtremaIndex(prices['High'].to_numpy(dtype=np.float64)[span])
+        low_index = RangeExtremaIndex(prices['Low'].to_numpy(dtype=np.float64)[span])
+        starts = positions + 1 - span_start
+        ends = np.minimum(positions + window, span_end) - span_start
+        first_tp, first_sl = _first_touch_indexed(
+            high_index, low_index, starts, ends, event_sides, tp_barrier, sl_barrier, window
+        )
+    else:
+        if window > 0:
+            highs = _forward_windows(prices['High'].to_numpy(dtype=np.float64), positions, window)
+            lows = _forward_windows(prices['Low'].to_numpy(dtype=np.float64), positions, window)
+        else:
+            highs = lows = np.empty((len(positions), 0))
+        first_tp, first_sl = _first_touch(highs, lows, event_sides, tp_barrier, sl_barrier)
+
+    # El TP se evalúa antes que el SL dentro de la misma vela
+    no_touch = window + 1
+    labels = np.zeros(len(positions), dtype=np.int64)
+    labels[(first_tp < no_touch) & (first_tp <= first_sl)] = 1
+    labels[(first_sl < no_touch) & (first_sl < first_tp)] = -1
+    # Sin ATR válido la posición no tiene barreras: límite de tiempo
+    labels[np.isnan(current_atr)] = 0
+
+    return {
+        "t_events": t_events,
+        "positions": positions,
+        "sides": event_sides,
+        "entry_price": entry_price,
+        "tp_barrier": tp_barrier,
+        "sl_barrier": sl_barrier,
+        "window": window,
+        "highs": highs,
+        "lows": lows,
+        "high_index": high_index,
+        "low_index": low_index,
+        "span_start": span_start,
+        "first_tp": first_tp,
+        "first_sl": first_sl,
+        "labels": labels,
+    }
+
+
 def get_atr_labels(
     prices: pd.DataFrame,
     t_events: pd.Index,
@@ -12,12 +247,17 @@ def get_atr_labels(
     atr_period: int = 14,
     tp_factor: float = 2.0,
     sl_factor: float = 1.0,
-    time_limit: int = 24
+    time_limit: int = 24,
+    engine: str = "auto"
 ) -> pd.Series:
     """
     Versión básica del Triple Barrier Method usando ATR para las barreras.
     Soporta posiciones Long (1) y Short (-1).
-    
+
+    El cálculo está vectorizado: se construyen las ventanas futuras de High/Low
+    de todos los eventos a la vez y se busca el primer toque de cada barrera
+    en una única pasada. Si TP y SL se tocan en la misma vela, gana el TP.
+
     Args:
         prices: DataFrame con columnas High, Low, Close.
         t_events: Índice de timestamps donde ocurrió una señal.
@@ -26,7 +266,10 @@ def get_atr_labels(
         tp_factor: Multiplicador del ATR para el Take Profit.
         sl_factor: Multiplicador del ATR para el Stop Loss.
         time_limit: Número máximo de velas para mantener la posición.
-        
+        engine: Motor de búsqueda del primer toque: "window" (ventanas con
+            strides), "sparse" (RangeExtremaIndex, no escala con time_limit)
+            o "auto" (elige el más barato).
+
     Returns:
         Serie de pandas con etiquetas (1, -1, 0) para cada evento.
         1: Éxito (TP tocado), -1: Fracaso (SL tocado), 0: Límite de tiempo.
@@ -34,77 +277,194 @@ def get_atr_labels(
     if t_events.empty:
         return pd.Series(dtype='int64')
 
-    # 1. Calcular ATR (Average True Range)
-    high_low = prices['High'] - prices['Low']
-    high_close = abs(prices['High'] - prices['Close'].shift())
-    low_close = abs(prices['Low'] - prices['Close'].shift())
-    
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    atr = tr.rolling(window=atr_period).mean()
+    result = _run_barriers(prices, t_events, sides, atr_period, tp_factor, sl_factor, time_limit, engine)
+    return pd.Series(result["labels"], index=result["t_events"])
 
-    labels = []
-    
-    for start_time in t_events:
-        if start_time not in prices.index:
-            continue
-            
-        # Determinar el lado (por defecto Long si no se provee)
-        side = sides.loc[start_time] if sides is not None else 1
-        if isinstance(side, pd.Series):
-            side = side.iloc[0]
-            
-        # Obtener datos desde el evento
-        idx = prices.index.get_loc(start_time)
-        if isinstance(idx, slice):
-            idx = idx.start
-        elif isinstance(idx, np.ndarray):
-            idx = np.where(idx)[0][0]
-            
-        future_prices = prices.iloc[idx : idx + time_limit + 1]
-        
-        if len(future_prices) < 2:
-            labels.append(0)
-            continue
-            
-        entry_price = future_prices.iloc[0]['Close']
-        current_atr = atr.loc[start_time]
-        if isinstance(current_atr, pd.Series):
-            current_atr = current_atr.iloc[0]
-        
-        if pd.isna(current_atr):
-            labels.append(0)
-            continue
 
-        # Definir barreras según el lado
-        if side == 1: # Long
-            tp_barrier = entry_price + (current_atr * tp_factor)
-            sl_barrier = entry_price - (current_atr * sl_factor)
-        else: # Short
-            tp_barrier = entry_price - (current_atr * tp_factor)
-            sl_barrier = entry_price + (current_atr * sl_factor)
-        
-        label = 0 # Default: Time limit reached
-        
-        # Recorrer el futuro para ver qué barrera se toca primero
-        for i in range(1, len(future_prices)):
-            high = future_prices.iloc[i]['High']
-            low = future_prices.iloc[i]['Low']
-            
-            if side == 1: # Lógica Long
-                if high >= tp_barrier:
-                    label = 1
-                    break
-                if low <= sl_barrier:
-                    label = -1
-                    break
-            else: # Lógica Short
-                if low <= tp_barrier: # En Short, TP está abajo
-                    label = 1
-                    break
-                if high >= sl_barrier: # En Short, SL está arriba
-                    label = -1
-                    break
-                
-        labels.append(label)
-
-    return pd.Series(labels, index=t_events)
+def get_barrier_outcomes(
+    prices: pd.DataFrame,
+    t_events: pd.Index,
+    sides: Optional[pd.Series] = None,
+    atr_period: int = 14,
+    tp_factor: float = 2.0,
+    sl_factor: float = 1.0,
+    time_limit: int = 24,
+    engine: str = "auto"
+) -> pd.DataFrame:
+    """
+    Igual que `get_atr_labels`, pero devuelve el resultado completo de cada evento
+    calculado en la misma pasada vectorizada, para que las métricas de PnL,
+    tiempo en posición o drawdown no tengan que recorrer de nuevo los precios.
+
+    La salida se produce en la vela del primer toque (al precio de la barrera)
+    o, si no se toca ninguna, al cierre de la última vela disponible dentro
+    del límite de tiempo.
+
+    Returns:
+        DataFrame indexado por evento con las columnas:
+        - label: 1 (TP), -1 (SL), 0 (límite de tiempo).
+        - side: 1 Long, -1 Short.
+        - entry_price, tp_barrier, sl_barrier: Niveles de la operación.
+        - exit_idx: Posición entera de la vela de salida en `prices`.
+        - exit_time: Timestamp de la vela de salida.
+        - bars_held: Velas transcurridas entre entrada y salida.
+        - exit_price: Precio de salida.
+        - realized_return: Retorno de la operación según el lado.
+        - mae: Máxima excursión adversa (retorno, <= 0).
+        - mfe: Máxima excursión favorable (retorno, >= 0).
+    """
+    columns = [
+        'label', 'side', 'entry_price', 'tp_barrier', 'sl_barrier', 'exit_idx',
+        'exit_time', 'bars_held', 'exit_price', 'realized_return', 'mae', 'mfe'
+    ]
+    if t_events.empty:
+        return pd.DataFrame(columns=columns)
+
+    result = _run_barriers(prices, t_events, sides, atr_period, tp_factor, sl_factor, time_limit, engine)
+    positions = result["positions"]
+    labels = result["labels"]
+    event_sides = result["sides"]
+    entry_price = result["entry_price"]
+    window = result["window"]
+
+    # Velas futuras realmente disponibles para cada evento
+    available = np.minimum(window, len(prices) - 1 - positions)
+    bars_held = np.where(
+        labels == 1, result["first_tp"],
+        np.where(labels == -1, result["first_sl"], available)
+    )
+    exit_idx = positions + bars_held
+
+    closes = prices['Close'].to_numpy(dtype=np.float64)
+    exit_price = np.where(
+        labels == 1, result["tp_barrier"],
+        np.where(labels == -1, result["sl_barrier"], closes[exit_idx])
+    )
+    realized_return = event_sides * (exit_price / entry_price - 1)
+
+    # Excursiones dentro de las velas mantenidas (1..bars_held)
+    if result["high_index"] is not None:
+        starts = positions + 1 - result["span_start"]
+        ends = exit_idx - result["span_start"]
+        max_high = result["high_index"].range_max(starts, ends)
+        min_low = result["low_index"].range_min(starts, ends)
+    else:
+        highs, lows = result["highs"], result["lows"]
+        held = np.arange(1, highs.shape[1] + 1)[None, :] <= bars_held[:, None]
+        max_high = np.where(held & ~np.isnan(highs), highs, -np.inf).max(axis=1, initial=-np.inf)
+        min_low = np.where(held & ~np.isnan(lows), lows, np.inf).min(axis=1, initial=np.inf)
+    max_high = np.where(np.isfinite(max_high), max_high, entry_price)
+    min_low = np.where(np.isfinite(min_low), min_low, entry_price)
+    is_long = event_sides == 1
+    favorable = np.where(is_long, max_high / entry_price - 1, 1 - min_low / entry_price)
+    adverse = np.where(is_long, min_low / entry_price - 1, 1 - max_high / entry_price)
+
+    return pd.DataFrame({
+        'label': labels,
+        'side': event_sides,
+        'entry_price': entry_price,
+        'tp_barrier': result["tp_barrier"],
+        'sl_barrier': result["sl_barrier"],
+        'exit_idx': exit_idx,
+        'exit_time': prices.index[exit_idx],
+        'bars_held': bars_held,
+        'exit_price': exit_price,
+        'realized_return': realized_return,
+        'mae': np.minimum(adverse, 0.0),
+        'mfe': np.maximum(favorable, 0.0),
+    }, index=result["t_events"], columns=columns)
+
+
+def label_grid(
+    prices: pd.DataFrame,
+    t_events: pd.Index,
+    sides: Optional[pd.Series] = None,
+    tp_factors: Sequence[float] = (2.0,),
+    sl_factors: Sequence[float] = (1.0,),
+    time_limits: Sequence[int] = (24,),
+    atr_period: int = 14,
+    as_array: bool = False
+) -> Union[pd.DataFrame, np.ndarray]:
+    """
+    Etiqueta los eventos para toda una rejilla de parámetros (tp, sl, time_limit).
+
+    El ATR y las ventanas futuras se calculan una sola vez con el mayor
+    time_limit. Sobre cada ventana se acumulan el máximo de High y el mínimo
+    de Low (monótonos), de modo que el primer toque de cualquier nivel es el
+    número de velas cuyo extremo acumulado aún no lo alcanza. Cada combinación
+    produce exactamente las mismas etiquetas que `get_atr_labels`.
+
+    Args:
+        prices: DataFrame con columnas High, Low, Close.
+        t_events: Índice de timestamps donde ocurrió una señal.
+        sides: Serie con el lado de la señal (1 o -1) para cada timestamp.
+        tp_factors: Multiplicadores del ATR para el Take Profit.
+        sl_factors: Multiplicadores del ATR para el Stop Loss.
+        time_limits: Límites de tiempo (velas) a evaluar.
+        atr_period: Periodo para el cálculo del ATR.
+        as_array: Si es True devuelve un array 4-D (tp, sl, time_limit, evento).
+
+    Returns:
+        DataFrame largo con columnas tp_factor, sl_factor, time_limit, event y
+        label, o el array de etiquetas si `as_array` es True.
+    """
+    tp_factors = np.asarray(tp_factors, dtype=np.float64)
+    sl_factors = np.asarray(sl_factors, dtype=np.float64)
+    time_limits = np.asarray(time_limits, dtype=np.int64)
+
+    atr = _compute_atr(prices, atr_period)
+    t_events, positions = _locate_events(prices.index, t_events)
+    event_sides = _event_sides(sides, t_events)
+    window = max(int(time_limits.max(initial=0)), 1)
+
+    entry_price = prices['Close'].to_numpy(dtype=np.float64)[positions]
+    current_atr = atr[positions]
+    valid = ~np.isnan(current_atr) & ~np.isnan(entry_price)
+
+    # Extremos acumulados en la ventana; los NaN nunca tocan una barrera
+    highs = _forward_windows(prices['High'].to_numpy(dtype=np.float64), positions, window)
+    lows = _forward_windows(prices['Low'].to_numpy(dtype=np.float64), positions, window)
+    run_max = np.maximum.accumulate(np.where(np.isnan(highs), -np.inf, highs), axis=1)
+    run_min = np.minimum.accumulate(np.where(np.isnan(lows), np.inf, lows), axis=1)
+
+    is_long = (event_sides == 1)[:, None]
+    # Mismo orden de operaciones que _run_barriers para obtener niveles idénticos
+    signed_atr = (event_sides * current_atr)[:, None]
+    tp_levels = entry_price[:, None] + signed_atr * tp_factors[None, :]
+    sl_levels = entry_price[:, None] - signed_atr * sl_factors[None, :]
+
+    def _first_reach(up: np.ndarray, levels: np.ndarray) -> np.ndarray:
+        """Offset (1-based) del primer toque; `up` indica barrera por arriba."""
+        not_yet = np.where(
+            up[:, :, None],
+            run_max[:, None, :] < levels[:, :, None],
+            run_min[:, None, :] > levels[:, :, None]
+        )
+        return not_yet.sum(axis=2) + 1
+
+    # (eventos, n_tp) y (eventos, n_sl)
+    first_tp = _first_reach(np.broadcast_to(is_long, tp_levels.shape), tp_levels)
+    first_sl = _first_reach(np.broadcast_to(~is_long, sl_levels.shape), sl_levels)
+
+    # Broadcast a (eventos, tp, sl, time_limit)
+    tp_b = first_tp[:, :, None, None]
+    sl_b = first_sl[:, None, :, None]
+    tl_b = time_limits[None, None, None, :]
+    tp_wins = (tp_b <= tl_b) & (tp_b <= sl_b)
+    sl_wins = (sl_b <= tl_b) & (sl_b < tp_b)
+    labels = tp_wins.astype(np.int8) - sl_wins.astype(np.int8)
+    labels[~valid] = 0
+
+    grid = np.moveaxis(labels, 0, -1).astype(np.int64)
+    if as_array:
+        return grid
+
+    n_tp, n_sl, n_tl, n_events = grid.shape
+    tp_idx, sl_idx, tl_idx, ev_idx = np.indices(grid.shape).reshape(4, -1)
+    return pd.DataFrame({
+        'tp_factor': tp_factors[tp_idx],
+        'sl_factor': sl_factors[sl_idx],
+        'time_limit': time_limits[tl_idx],
+        'event': t_events[ev_idx],
+        'label': grid.reshape(-1),
+    })
@@ -0,0 +1,105 @@
+import numpy as np
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RangeExtremaIndex:
+    """
+    Índice precalculado (sparse table) para consultas de extremos en rangos.
+
+    Para una serie de n valores guarda, en cada nivel k, el máximo/mínimo de
+    los bloques de longitud 2^k. Con ello:
+    - `range_max` / `range_min` sobre [start, end] se responden en O(1)
+      combinando dos bloques solapados.
+    - `first_at_or_above` / `first_at_or_below` encuentran la primera posición
+      que alcanza un nivel en O(log n) descendiendo por los niveles.
+
+    Todas las consultas aceptan arrays (consultas en lote) y los rangos son
+    inclusivos. Los NaN nunca alcanzan un nivel ni cuentan como extremo.
+    Cada tabla ocupa n * log2(n) valores y se construye solo cuando se usa.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self._values = np.asarray(values, dtype=np.float64)
+        self._max_table: Optional[np.ndarray] = None
+        self._min_table: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @staticmethod
+    def _build(values: np.ndarray, reducer: np.ufunc) -> np.ndarray:
+        """Construye la tabla (niveles x n); las celdas sin bloque completo quedan como relleno."""
+        n = len(values)
+        levels = max(int(n).bit_length(), 1)
+        fill = values[0] if n else 0.0
+        table = np.full((levels, n), fill, dtype=np.float64)
+        table[0] = values
+        for k in range(1, levels):
+            half = 1 << (k - 1)
+            span = n - (1 << k) + 1
+            if span <= 0:
+                break
+            table[k, :span] = reducer(table[k - 1, :span], table[k - 1, half:half + span])
+        return table
+
+    @property
+    def max_table(self) -> np.ndarray:
+        if self._max_table is None:
+            self._max_table = self._build(np.where(np.isnan(self._values), -np.inf, self._values), np.maximum)
+        return self._max_table
+
+    @property
+    def min_table(self) -> np.ndarray:
+        if self._min_table is None:
+            self._min_table = self._build(np.where(np.isnan(self._values), np.inf, self._values), np.minimum)
+        return self._min_table
+
+    def _range_query(self, table: np.ndarray, reducer: np.ufunc, empty: float, starts, ends) -> np.ndarray:
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        non_empty = ends >= starts
+        lo = np.where(non_empty, starts, 0)
+        hi = np.where(non_empty, ends, 0)
+        k = np.floor(np.log2(hi - lo + 1)).astype(np.int64)
+        result = reducer(table[k, lo], table[k, hi - (1 << k) + 1])
+        return np.where(non_empty, result, empty)
+
+    def range_max(self, starts, ends) -> np.ndarray:
+        """Máximo de cada rango [start, end]; -inf si el rango está vacío o es todo NaN."""
+        return self._range_query(self.max_table, np.maximum, -np.inf, starts, ends)
+
+    def range_min(self, starts, ends) -> np.ndarray:
+        """Mínimo de cada rango [start, end]; +inf si el rango está vacío o es todo NaN."""
+        return self._range_query(self.min_table, np.minimum, np.inf, starts, ends)
+
+    def _first_reach(self, table: np.ndarray, not_reached, starts, ends, levels) -> np.ndarray:
+        """
+        Desciende por los niveles saltando bloques que no alcanzan el nivel.
+        Tras el descenso `pos` es la primera posición que lo alcanza o end + 1.
+        """
+        pos = np.array(starts, dtype=np.int64, copy=True)
+        ends = np.asarray(ends, dtype=np.int64)
+        # Un nivel NaN nunca se alcanza
+        ends = np.where(np.isnan(levels), pos - 1, ends)
+        for k in range(table.shape[0] - 1, -1, -1):
+            step = 1 << k
+            inside = pos + step - 1 <= ends
+            if not inside.any():
+                continue
+            probe = np.where(inside, pos, 0)
+            jump = inside & not_reached(table[k, probe])
+            pos += np.where(jump, step, 0)
+        return np.where(pos <= ends, pos, -1)
+
+    def first_at_or_above(self, starts, ends, levels) -> np.ndarray:
+        """Primera posición en [start, end] con valor >= level, o -1 si no existe."""
+        levels = np.asarray(levels, dtype=np.float64)
+        return self._first_reach(self.max_table, lambda block: block < levels, starts, ends, levels)
+
+    def first_at_or_below(self, starts, ends, levels) -> np.ndarray:
+        """Primera posición en [start, end] con valor <= level, o -1 si no existe."""
+        levels = np.asarray(levels, dtype=np.float64)
+        return self._first_reach(self.min_table, lambda block: block > levels, starts, ends, levels)
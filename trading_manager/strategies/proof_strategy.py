@@ -1,5 +1,3 @@
-import pandas as pd
-import duckdb
 import logging
 import sys
 import os
@@ -7,8 +5,10 @@ import os
 # Añadir el directorio raíz al path para poder importar los building blocks
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from data_processor.data_system.market_data import OHLCV_COLUMNS, load_klines
+from data_processor.data_system.storage import get_connection_manager
 from trading_manager.building_blocks.detectors.key_candle_detector import SignalDetector
-from trading_manager.building_blocks.labelers.potential_capture_engine import get_atr_labels
+from trading_manager.building_blocks.labelers.potential_capture_engine import get_barrier_outcomes
 from core.config_manager import ConfigManager
 from core.memory_manager import MemoryManager
 
@@ -30,15 +30,12 @@ def run_proof_strategy():
     if not os.path.exists(db_path):
         logger.error(f"Base de datos no encontrada en {db_path}")
         return
+    # Conexión compartida del proceso con los pragmas de la sección 'Data'
+    get_connection_manager(db_path, config)
 
     try:
-        conn = duckdb.connect(db_path)
-        df = conn.execute(f"SELECT * FROM {table_name}").df()
-        conn.close()
-        
-        # Asegurar que el índice es el tiempo y está ordenado
-        df['Open_Time'] = pd.to_datetime(df['Open_Time'])
-        df = df.sort_values('Open_Time').set_index('Open_Time')
+        # OHLCV indexado por tiempo y ya ordenado por DuckDB
+        df = load_klines(db_path, table_name, columns=OHLCV_COLUMNS)
         
         logger.info(f"Datos cargados: {len(df)} velas de {df.index.min()} a {df.index.max()}")
     except Exception as e:
@@ -47,7 +44,7 @@ def run_proof_strategy():
 
     # 2. Detección de Señales (Usando Config)
     logger.info("Detectando velas clave...")
-    df = SignalDetector.detect_key_candles(
+    signals = SignalDetector.detect_key_candles_compact(
         df, 
         volume_lookback=50, 
         volume_percentile_threshold=config.get("Trading.volume_percentile_threshold", 90),
@@ -55,11 +52,12 @@ def run_proof_strategy():
         ema_period=config.get("Trading.ema_period", 200),
         reversal_mode=config.get("Trading.reversal_mode", True)
     )
+    if signals is None:
+        return
     
     # 3. Filtrado de Eventos
-    key_candles = df[df['is_key_candle']]
-    t_events = key_candles.index
-    sides = key_candles['signal_side']
+    t_events = signals.t_events
+    sides = signals.sides
     logger.info(f"Se detectaron {len(t_events)} eventos de señal.")
 
     if len(t_events) == 0:
@@ -68,7 +66,7 @@ def run_proof_strategy():
 
     # 4. Etiquetado (Triple Barrier Method - Usando Config)
     logger.info("Etiquetando eventos con Triple Barrier Method (ATR)...")
-    labels = get_atr_labels(
+    outcomes = get_barrier_outcomes(
         df, 
         t_events, 
         sides=sides,
@@ -77,6 +75,7 @@ def run_proof_strategy():
         sl_factor=config.get("Trading.sl_factor", 1.0), 
         time_limit=config.get("Trading.time_limit", 24)
     )
+    labels = outcomes['label']
 
     # 5. Resultados
     logger.info("--- RESULTADOS FINALES ---")
@@ -95,6 +94,9 @@ def run_proof_strategy():
     if len(labels) > 0:
         win_rate = (summary["Take Profit (1)"] / len(labels)) * 100
         print(f"Win Rate (TP vs Total): {win_rate:.2f}%")
+        print(f"Retorno medio por operación: {outcomes['realized_return'].mean() * 100:.3f}%")
+        print(f"Velas medias en posición: {outcomes['bars_held'].mean():.1f}")
+        print(f"MAE medio: {outcomes['mae'].mean() * 100:.3f}% | MFE medio: {outcomes['mfe'].mean() * 100:.3f}%")
         
         # REGISTRAR MÉTRICA EN CAPA 1
         memory.record_metric(